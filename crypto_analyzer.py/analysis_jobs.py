@@ -0,0 +1,166 @@
+"""Bounded worker pool that runs analyses as jobs outside the script thread"""
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from collectors import get_collector
+from engine import NO_PRICE, SCORING_SEED, cached_analysis
+from history_store import get_history_store
+from instrumentation import get_metrics, percentile
+from market_data import get_market_data
+
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", 4))
+ANALYSIS_MAX_QUEUE = int(os.environ.get("ANALYSIS_MAX_QUEUE", 100))
+# Finished jobs nobody collected (e.g. closed tabs) are dropped after this
+JOB_RETENTION = 600
+LATENCY_WINDOW = 500
+
+
+def gather_inputs(cryptos):
+    """Candle timing and collected signals per asset id, where there are any"""
+    collector = get_collector()
+    ids = list(dict.fromkeys(c["id"] for c in cryptos if c["id"] != "unknown"))
+    signals = collector.collect_many(ids) if collector and ids else {}
+    market_data = get_market_data()
+    return {asset_id: market_data.timing(asset_id) for asset_id in ids}, signals
+
+
+def run_analyses(cryptos, prices, seed=SCORING_SEED, store=True):
+    """Analyze cryptos from their prices, candles and collected signals
+
+    This is the whole pipeline behind a dashboard job or an API request.
+    Everything it reads is shared process state (score cache, candle files,
+    signal cache) or stored on disk, so callers need no state of their own.
+    """
+    timings, signals = gather_inputs(cryptos)
+    analyses = [
+        cached_analysis(crypto, prices.get(crypto["id"], NO_PRICE), timings.get(crypto["id"]),
+                        seed, signals.get(crypto["id"]))
+        for crypto in cryptos
+    ]
+    if store:
+        get_history_store().add_many(analyses)
+    return analyses
+
+
+class JobPool:
+    """Runs submitted callables on a fixed pool and tracks them by job id"""
+
+    def __init__(self, workers=ANALYSIS_WORKERS, max_queue=ANALYSIS_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="analysis"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue a job and return its id, or None if the queue is full"""
+        with self._lock:
+            self._prune()
+            if self._active() >= self.workers + self.max_queue:
+                self.rejected += 1
+                return None
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None
+            }
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                job["status"] = "failed"
+                job["error"] = e
+                job["finished_at"] = time.time()
+                self.failed += 1
+            return
+        with self._lock:
+            job["status"] = "done"
+            job["result"] = result
+            job["finished_at"] = time.time()
+            self.completed += 1
+            self._latencies.append(job["finished_at"] - job["submitted_at"])
+
+    def status(self, job_id):
+        """Return a job's status, or None for unknown ids"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job["status"] if job else None
+
+    def pop(self, job_id):
+        """Remove and return a finished job, or None while it is still pending"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in ("queued", "running"):
+                return None
+            return self._jobs.pop(job_id)
+
+    def _active(self):
+        return sum(1 for j in self._jobs.values() if j["status"] in ("queued", "running"))
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [k for k, j in self._jobs.items()
+                       if j["finished_at"] and j["finished_at"] < cutoff]:
+            del self._jobs[job_id]
+
+    def metrics(self):
+        """Snapshot of queue depth, worker count and job latency"""
+        with self._lock:
+            queued = sum(1 for j in self._jobs.values() if j["status"] == "queued")
+            running = sum(1 for j in self._jobs.values() if j["status"] == "running")
+            latencies = sorted(self._latencies)
+        return {
+            "workers": self.workers,
+            "queue_depth": queued,
+            "running": running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95)
+        }
+
+    def gauges(self):
+        metrics = self.metrics()
+        return {f"jobs_{key}": metrics[key] for key in ("queue_depth", "running", "completed", "failed", "rejected")}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_job_pool():
+    """Return the process-wide analysis job pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JobPool()
+            get_metrics().add_gauges(_pool.gauges)
+        return _pool
@@ -0,0 +1,288 @@
+"""Compact in-memory form of an analysis
+
+An AnalysisRecord packs the phase 1 checks, phase 2 team flags and phase 3
+metrics into one integer bitfield, the tokenomics ratings into 4-bit fields
+and market cap and volume into plain numbers. Repeated label strings are
+interned, so each record only holds references to them. Scores are computed
+once, when the record is built.
+
+``from_dict`` and ``to_dict`` convert losslessly to and from the nested dict
+shape that build_analysis() produces and the history store keeps as JSON.
+Anything that does not fit that shape raises ValueError.
+"""
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+
+from engine import CONFIDENCE_TIERS
+
+CHECK_KEYS = ("exchanges", "active6months", "volume", "no_breach", "has_mainnet", "active_community", "documentation")
+TEAM_KEYS = ("identifiable", "experience", "communication", "audited", "github_active", "open_source")
+METRIC_KEYS = ("active_addresses", "tx_volume", "tvl", "dev_activity", "nvt_ratio", "token_velocity", "whale_activity")
+TOKENOMICS_KEYS = ("supply", "distribution", "utility", "value_accrual", "vesting")
+
+# Bit positions inside AnalysisRecord.flags
+TEAM_SHIFT = len(CHECK_KEYS)
+METRIC_SHIFT = TEAM_SHIFT + len(TEAM_KEYS)
+HAS_PRODUCT_BIT = 1 << (METRIC_SHIFT + len(METRIC_KEYS))
+COMPETITIVE_ADVANTAGE_BIT = HAS_PRODUCT_BIT << 1
+CHECK_MASK = (1 << len(CHECK_KEYS)) - 1
+TEAM_MASK = ((1 << len(TEAM_KEYS)) - 1) << TEAM_SHIFT
+METRIC_MASK = ((1 << len(METRIC_KEYS)) - 1) << METRIC_SHIFT
+# Tokenomics ratings are 0-15, four bits each
+TOKENOMICS_BITS = 4
+
+ANALYSIS_KEYS = {"id", "name", "symbol", "crypto_id", "current_price", "price_change_24h", "timestamp",
+                 "phase1", "phase2", "phase3", "phase4", "phase5"}
+# Present only on analyses built from collected signals
+OPTIONAL_KEYS = {"missing_signals"}
+PHASE1_KEYS = {"market_cap", "market_cap_value", "exchanges", "active_months", "daily_volume", "has_product", "checks"}
+PHASE2_KEYS = {"tokenomics", "team"}
+PHASE3_KEYS = {"metrics", "competitive_advantage"}
+PHASE4_KEYS = {"rsi", "trend", "fear_greed", "macd", "volume"}
+
+MILLIONS = re.compile(r"\$(0|[1-9]\d*)M")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _check_keys(d, keys, where, optional=()):
+    if not isinstance(d, dict) or not set(keys) <= set(d) <= set(keys) | set(optional):
+        raise ValueError(f"{where} does not match the analysis shape")
+
+
+def _pack_bools(d, keys, where):
+    _check_keys(d, keys, where)
+    if tuple(d) != keys:
+        raise ValueError(f"{where} keys are out of order")
+    bits = 0
+    for i, key in enumerate(keys):
+        bits |= _bit(d[key], f"{where}.{key}") << i
+    return bits
+
+
+def _bit(value, where):
+    if value is not True and value is not False:
+        raise ValueError(f"{where} is not a bool")
+    return int(value)
+
+
+def _unpack_bools(bits, keys):
+    return {key: bool(bits >> i & 1) for i, key in enumerate(keys)}
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+def _parse_millions(text, where):
+    match = MILLIONS.fullmatch(text) if isinstance(text, str) else None
+    if match is None:
+        raise ValueError(f"{where} is not a '$<n>M' amount: {text!r}")
+    return int(match.group(1)) * 1_000_000
+
+
+def _format_millions(usd):
+    return f"${usd // 1_000_000}M"
+
+
+def _parse_timestamp(text):
+    """Naive ISO timestamp to integer microseconds since the epoch"""
+    try:
+        dt = datetime.fromisoformat(text)
+    except (TypeError, ValueError):
+        raise ValueError(f"timestamp is not ISO formatted: {text!r}")
+    if dt.tzinfo is not None or dt.isoformat() != text:
+        raise ValueError(f"timestamp does not round-trip: {text!r}")
+    return (dt - EPOCH) // MICROSECOND
+
+
+def _parse_missing(names):
+    if names is None:
+        return None
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError("missing_signals is not a list of signal names")
+    return names
+
+
+def _format_timestamp(micros):
+    return (EPOCH + micros * MICROSECOND).isoformat()
+
+
+class AnalysisRecord:
+    """One analysis with flags packed into bits and scores precomputed"""
+
+    __slots__ = (
+        "id", "name", "symbol", "crypto_id", "current_price", "price_change_24h", "created_us",
+        "market_cap", "market_cap_usd", "exchanges", "active_months", "daily_volume_usd",
+        "flags", "tokenomics", "rsi", "trend", "fear_greed", "macd", "volume", "tier",
+        "missing_signals", "phase1_pass", "tokenomics_score", "market_bullish", "market_score"
+    )
+
+    def __init__(self, id, name, symbol, crypto_id, current_price, price_change_24h, created_us,
+                 market_cap, market_cap_usd, exchanges, active_months, daily_volume_usd,
+                 flags, tokenomics, rsi, trend, fear_greed, macd, volume, tier, missing_signals=None):
+        self.id = id
+        self.name = sys.intern(name)
+        self.symbol = sys.intern(symbol)
+        self.crypto_id = sys.intern(crypto_id)
+        self.current_price = current_price
+        self.price_change_24h = price_change_24h
+        self.created_us = created_us
+        self.market_cap = sys.intern(market_cap)
+        self.market_cap_usd = market_cap_usd
+        self.exchanges = sys.intern(exchanges)
+        self.active_months = active_months
+        self.daily_volume_usd = daily_volume_usd
+        self.flags = flags
+        self.tokenomics = tokenomics
+        self.rsi = rsi
+        self.trend = sys.intern(trend)
+        self.fear_greed = fear_greed
+        self.macd = sys.intern(macd)
+        self.volume = sys.intern(volume)
+        self.tier = tier
+        self.missing_signals = None if missing_signals is None else tuple(sys.intern(s) for s in missing_signals)
+        self.phase1_pass = _popcount(flags & CHECK_MASK)
+        self.tokenomics_score = sum(self.tokenomics_ratings())
+        self.market_bullish = _popcount(flags & METRIC_MASK)
+        self.market_score = round(self.market_bullish / len(METRIC_KEYS) * 100)
+
+    @classmethod
+    def from_dict(cls, analysis):
+        """Pack a build_analysis() dict; raises ValueError if it cannot round-trip"""
+        _check_keys(analysis, ANALYSIS_KEYS, "analysis", OPTIONAL_KEYS)
+        phase1, phase2, phase3, phase4 = (analysis[f"phase{i}"] for i in range(1, 5))
+        _check_keys(phase1, PHASE1_KEYS, "phase1")
+        _check_keys(phase2, PHASE2_KEYS, "phase2")
+        _check_keys(phase3, PHASE3_KEYS, "phase3")
+        _check_keys(phase4, PHASE4_KEYS, "phase4")
+
+        metrics = phase3["metrics"]
+        _check_keys(metrics, METRIC_KEYS, "phase3.metrics")
+        if tuple(metrics) != METRIC_KEYS or not set(metrics.values()) <= {"bullish", "bearish"}:
+            raise ValueError("phase3.metrics must be 'bullish' or 'bearish' in the standard order")
+        flags = (
+            _pack_bools(phase1["checks"], CHECK_KEYS, "phase1.checks")
+            | _pack_bools(phase2["team"], TEAM_KEYS, "phase2.team") << TEAM_SHIFT
+            | _pack_bools({k: v == "bullish" for k, v in metrics.items()}, METRIC_KEYS, "phase3.metrics") << METRIC_SHIFT
+            | _bit(phase1["has_product"], "phase1.has_product") * HAS_PRODUCT_BIT
+            | _bit(phase3["competitive_advantage"], "phase3.competitive_advantage") * COMPETITIVE_ADVANTAGE_BIT
+        )
+
+        tokenomics = phase2["tokenomics"]
+        _check_keys(tokenomics, TOKENOMICS_KEYS, "phase2.tokenomics")
+        if tuple(tokenomics) != TOKENOMICS_KEYS:
+            raise ValueError("phase2.tokenomics keys are out of order")
+        packed = 0
+        for i, key in enumerate(TOKENOMICS_KEYS):
+            value = tokenomics[key]
+            if type(value) is not int or not 0 <= value < 1 << TOKENOMICS_BITS:
+                raise ValueError(f"phase2.tokenomics.{key} is not a 0-15 rating")
+            packed |= value << (i * TOKENOMICS_BITS)
+
+        try:
+            tier = CONFIDENCE_TIERS.index(analysis["phase5"])
+        except ValueError:
+            raise ValueError("phase5 does not match a confidence tier")
+
+        return cls(
+            analysis["id"], analysis["name"], analysis["symbol"], analysis["crypto_id"],
+            analysis["current_price"], analysis["price_change_24h"], _parse_timestamp(analysis["timestamp"]),
+            phase1["market_cap"], _parse_millions(phase1["market_cap_value"], "phase1.market_cap_value"),
+            phase1["exchanges"], phase1["active_months"],
+            _parse_millions(phase1["daily_volume"], "phase1.daily_volume"),
+            flags, packed,
+            phase4["rsi"], phase4["trend"], phase4["fear_greed"], phase4["macd"], phase4["volume"], tier,
+            _parse_missing(analysis.get("missing_signals"))
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_dict(json.loads(text))
+
+    @property
+    def timestamp(self):
+        return _format_timestamp(self.created_us)
+
+    @property
+    def confidence(self):
+        return CONFIDENCE_TIERS[self.tier]["confidence"]
+
+    @property
+    def allocation(self):
+        return CONFIDENCE_TIERS[self.tier]["allocation"]
+
+    @property
+    def recommendation(self):
+        return CONFIDENCE_TIERS[self.tier]["recommendation"]
+
+    @property
+    def recommendation_color(self):
+        return CONFIDENCE_TIERS[self.tier]["recommendation_color"]
+
+    def checks(self):
+        return _unpack_bools(self.flags, CHECK_KEYS)
+
+    def team(self):
+        return _unpack_bools(self.flags >> TEAM_SHIFT, TEAM_KEYS)
+
+    def metrics(self):
+        return {key: "bullish" if bullish else "bearish"
+                for key, bullish in _unpack_bools(self.flags >> METRIC_SHIFT, METRIC_KEYS).items()}
+
+    def tokenomics_ratings(self):
+        mask = (1 << TOKENOMICS_BITS) - 1
+        return [self.tokenomics >> (i * TOKENOMICS_BITS) & mask for i in range(len(TOKENOMICS_KEYS))]
+
+    def to_dict(self):
+        """Expand back into the nested build_analysis() shape"""
+        analysis = {
+            "id": self.id,
+            "name": self.name,
+            "symbol": self.symbol,
+            "crypto_id": self.crypto_id,
+            "current_price": self.current_price,
+            "price_change_24h": self.price_change_24h,
+            "timestamp": self.timestamp,
+            "phase1": {
+                "market_cap": self.market_cap,
+                "market_cap_value": _format_millions(self.market_cap_usd),
+                "exchanges": self.exchanges,
+                "active_months": self.active_months,
+                "daily_volume": _format_millions(self.daily_volume_usd),
+                "has_product": bool(self.flags & HAS_PRODUCT_BIT),
+                "checks": self.checks()
+            },
+            "phase2": {
+                "tokenomics": dict(zip(TOKENOMICS_KEYS, self.tokenomics_ratings())),
+                "team": self.team()
+            },
+            "phase3": {
+                "metrics": self.metrics(),
+                "competitive_advantage": bool(self.flags & COMPETITIVE_ADVANTAGE_BIT)
+            },
+            "phase4": {
+                "rsi": self.rsi,
+                "trend": self.trend,
+                "fear_greed": self.fear_greed,
+                "macd": self.macd,
+                "volume": self.volume
+            },
+            "phase5": dict(CONFIDENCE_TIERS[self.tier])
+        }
+        if self.missing_signals is not None:
+            analysis["missing_signals"] = list(self.missing_signals)
+        return analysis
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"AnalysisRecord({self.symbol} {self.timestamp} {self.confidence})"
@@ -0,0 +1,419 @@
+"""Headless JSON API over the 5-phase analysis for other services
+
+Endpoints (all JSON):
+- ``GET /analyze?q=BTC`` - analyze one project by symbol or name
+- ``POST /analyze/batch`` with ``{"symbols": ["BTC", "ETH"]}`` - analyze several at once
+- ``GET /prices?ids=bitcoin,ethereum`` - current prices (every tracked asset if ids is omitted)
+- ``GET /history?symbol=BTC&recommendation=BUY&since=<unix>&cursor=<c>&limit=10`` - stored analyses, newest first
+- ``GET /health`` and ``GET /metrics`` (Prometheus text for the worker that answers)
+
+Analyses take ``seed`` and ``store=0`` or ``store=false`` (don't record in
+the history). Malformed or non-finite parameters are rejected with 400.
+Requests keep no state between them: scoring is deterministic, the history
+is the shared SQLite store and candles are the shared candle files, so any
+worker process gives the same answer. With ``--workers N`` the server forks
+N processes accepting on one socket. The parent alone refreshes prices
+upstream and publishes each refresh to a snapshot file that every worker
+reads through a ``file:`` price provider.
+
+    python api_server.py --port 8080 --workers 4
+    curl 'http://127.0.0.1:8080/analyze?q=BTC'
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+
+from analysis_jobs import run_analyses
+from engine import CRYPTO_DATABASE, SCORING_SEED, resolve_crypto
+from history_store import PAGE_SIZE, get_history_store
+from instrumentation import get_metrics, span
+from price_cache import PriceCache, get_price_cache
+from price_providers import FileProvider
+
+# Loopback unless set otherwise; the API has no authentication
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", 8080))
+API_WORKERS = int(os.environ.get("API_WORKERS", 1))
+# Threads per worker running analyses and store queries off the event loop
+API_THREADS = int(os.environ.get("API_THREADS", 8))
+# Requests in flight per worker before new ones get 503
+API_MAX_PENDING = int(os.environ.get("API_MAX_PENDING", 256))
+API_MAX_BATCH = int(os.environ.get("API_MAX_BATCH", 100))
+MAX_HISTORY_PAGE = 100
+MAX_BODY = 1 << 20
+MAX_HEADER = 16 << 10
+KEEPALIVE_TIMEOUT = 15
+# Workers re-check the price snapshot this often; it is only re-read when it changes
+SNAPSHOT_TTL = 1.0
+
+
+class HTTPError(Exception):
+    """Turned into a JSON error response with the given status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Plain decimal numbers only: no whitespace, underscores, nan or inf
+_INT_RE = re.compile(r"-?[0-9]+")
+_FLOAT_RE = re.compile(r"-?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?")
+_BOOLS = {"1": True, "true": True, "0": False, "false": False}
+
+
+def _int_param(params, name, default=None):
+    value = params.get(name, [None])[0]
+    if value is None or value == "":
+        return default
+    if not _INT_RE.fullmatch(value):
+        raise HTTPError(400, f"{name} must be an integer")
+    return int(value)
+
+
+def _float_param(params, name):
+    value = params.get(name, [None])[0]
+    if not value:
+        return None
+    # Large exponents still overflow to inf
+    if not _FLOAT_RE.fullmatch(value) or not math.isfinite(float(value)):
+        raise HTTPError(400, f"{name} must be a finite number")
+    return float(value)
+
+
+def _bool_param(params, name, default):
+    value = params.get(name, [None])[0]
+    if value is None or value == "":
+        return default
+    if value.lower() not in _BOOLS:
+        raise HTTPError(400, f"{name} must be one of 1, 0, true or false")
+    return _BOOLS[value.lower()]
+
+
+def encode_cursor(cursor):
+    return f"{cursor[0]!r}:{cursor[1]}" if cursor else None
+
+
+def decode_cursor(value):
+    try:
+        created_at, row_id = value.split(":")
+        cursor = float(created_at), int(row_id)
+    except ValueError:
+        raise HTTPError(400, "invalid cursor")
+    if not math.isfinite(cursor[0]):
+        raise HTTPError(400, "invalid cursor")
+    return cursor
+
+
+class ApiApp:
+    """Routes requests to blocking handlers that run on a thread pool"""
+
+    def __init__(self, prices, history, threads=API_THREADS, max_pending=API_MAX_PENDING):
+        self.prices = prices
+        self.history = history
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api")
+        self.routes = {
+            ("GET", "/analyze"): self.analyze,
+            ("POST", "/analyze/batch"): self.analyze_batch,
+            ("GET", "/prices"): self.price_lookup,
+            ("GET", "/history"): self.history_lookup,
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics
+        }
+
+    async def dispatch(self, method, target, body):
+        """Return (status, body bytes, content type) for one request"""
+        url = urlparse(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                return self._error(405, f"{method} not allowed on {url.path}")
+            return self._error(404, f"no route for {url.path}")
+        if self.pending >= self.max_pending:
+            return self._error(503, "server is busy, retry shortly")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, handler, parse_qs(url.query), body)
+        finally:
+            self.pending -= 1
+
+    def _call(self, handler, params, body):
+        try:
+            with span(f"api_{handler.__name__}"):
+                result = handler(params, body)
+        except HTTPError as e:
+            return self._error(e.status, str(e))
+        except Exception:
+            # Details go to the server log only; they can leak paths and internals
+            traceback.print_exc()
+            return self._error(500, "internal error")
+        if isinstance(result, str):
+            return 200, result.encode(), "text/plain; version=0.0.4"
+        return 200, json.dumps(result).encode(), "application/json"
+
+    def _error(self, status, message):
+        return status, json.dumps({"error": message}).encode(), "application/json"
+
+    def _analyze(self, queries, params):
+        seed = _int_param(params, "seed", SCORING_SEED)
+        store = _bool_param(params, "store", True)
+        return run_analyses([resolve_crypto(q) for q in queries], self.prices.get(), seed, store)
+
+    def analyze(self, params, body):
+        query = params.get("q", [""])[0].strip()
+        if not query:
+            raise HTTPError(400, "q is required")
+        return self._analyze([query], params)[0]
+
+    def analyze_batch(self, params, body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be JSON")
+        symbols = request.get("symbols") if isinstance(request, dict) else None
+        if not isinstance(symbols, list) or not all(isinstance(s, str) and s.strip() for s in symbols):
+            raise HTTPError(400, "symbols must be a list of non-empty strings")
+        if len(symbols) > API_MAX_BATCH:
+            raise HTTPError(413, f"at most {API_MAX_BATCH} symbols per batch")
+        # Body fields work like the query string ones
+        for name in ("seed", "store"):
+            if name in request:
+                value = request[name]
+                params[name] = [str(value).lower() if isinstance(value, bool) else str(value)]
+        return {"analyses": self._analyze([s.strip() for s in symbols], params)}
+
+    def price_lookup(self, params, body):
+        prices = self.prices.get()
+        ids = [i for i in params.get("ids", [""])[0].split(",") if i]
+        if ids:
+            prices = {i: prices[i] for i in ids if i in prices}
+        return {"prices": prices, "age": min(self.prices.age(), 1e9)}
+
+    def history_lookup(self, params, body):
+        limit = _int_param(params, "limit", PAGE_SIZE)
+        if not 1 <= limit <= MAX_HISTORY_PAGE:
+            raise HTTPError(400, f"limit must be between 1 and {MAX_HISTORY_PAGE}")
+        cursor = params.get("cursor", [""])[0]
+        analyses, next_cursor = self.history.query(
+            symbol=params.get("symbol", [""])[0].strip() or None,
+            recommendation=params.get("recommendation", [""])[0] or None,
+            since=_float_param(params, "since"),
+            before=decode_cursor(cursor) if cursor else None,
+            limit=limit
+        )
+        return {"analyses": analyses, "cursor": encode_cursor(next_cursor)}
+
+    def health(self, params, body):
+        return {"status": "ok", "pid": os.getpid(), "price_age": min(self.prices.age(), 1e9)}
+
+    def metrics(self, params, body):
+        return get_metrics().prometheus()
+
+    def gauges(self):
+        return {"api_pending": self.pending}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+async def read_request(reader):
+    """Parse one HTTP/1.1 request; returns None when the client hung up"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        raise HTTPError(400, "invalid Content-Length")
+    if int(length) > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(int(length)) if int(length) else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+    return method, target, body, keep_alive
+
+
+def write_response(writer, status, body, content_type, keep_alive):
+    reason = HTTPStatus(status).phrase
+    head = [
+        f"HTTP/1.1 {status} {reason}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive" if keep_alive else "Connection: close"
+    ]
+    if status == 503:
+        head.append("Retry-After: 1")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+
+
+async def handle_connection(app, reader, writer):
+    """Serve requests on one keep-alive connection until it closes"""
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(read_request(reader), KEEPALIVE_TIMEOUT)
+            except HTTPError as e:
+                status, body, content_type = app._error(e.status, str(e))
+                write_response(writer, status, body, content_type, False)
+                break
+            except asyncio.TimeoutError:
+                break
+            if request is None:
+                break
+            method, target, body, keep_alive = request
+            status, body, content_type = await app.dispatch(method, target, body)
+            write_response(writer, status, body, content_type, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(app, sock):
+    """Accept connections on sock until SIGTERM or SIGINT"""
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(app, reader, writer), sock=sock, limit=MAX_HEADER
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    async with server:
+        await stop.wait()
+
+
+def listen(host, port):
+    return socket.create_server((host, port), backlog=1024)
+
+
+def run_worker(sock, prices):
+    """One server process: its own event loop and thread pool, shared stores"""
+    history = get_history_store()
+    app = ApiApp(prices, history)
+    get_metrics().add_gauges(app.gauges)
+    try:
+        asyncio.run(serve(app, sock))
+    finally:
+        app.shutdown()
+        # Don't drop analyses still waiting in the write batch
+        history.close()
+
+
+def write_snapshot(path, prices):
+    """Atomically replace the snapshot workers read prices from"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(prices, f)
+    os.replace(tmp_path, path)
+
+
+def run_prefork(sock, workers, snapshot):
+    """Fork workers sharing sock; the parent keeps prices fresh and restarts crashed workers"""
+    ids = [c["id"] for c in CRYPTO_DATABASE]
+    cache = PriceCache(ids)
+    cache.add_listener(lambda prices: write_snapshot(snapshot, prices))
+    # Fetch once before forking, so workers start with prices and without threads
+    cache.refresh()
+    if not cache.prices:
+        write_snapshot(snapshot, {})
+
+    def spawn():
+        pid = os.fork()
+        if pid:
+            return pid
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            worker_prices = PriceCache(ids, fetcher=FileProvider(snapshot).fetch, ttl=SNAPSHOT_TTL,
+                                       stale_ttl=SNAPSHOT_TTL, retry_after=SNAPSHOT_TTL)
+            run_worker(sock, worker_prices)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    children = {spawn() for _ in range(workers)}
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    cache.start()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, restarting", file=sys.stderr)
+            time.sleep(1)
+            children.add(spawn())
+    cache.stop()
+
+
+def main(argv=None):
+    """Serve the analysis API"""
+    parser = argparse.ArgumentParser(description="JSON HTTP API for the 5-phase analysis")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="server processes sharing the port")
+    parser.add_argument("--price-snapshot", help="file the parent publishes prices to (default: a temp file)")
+    args = parser.parse_args(argv)
+
+    sock = listen(args.host, args.port)
+    print(f"Serving the analysis API on http://{args.host}:{sock.getsockname()[1]} "
+          f"with {args.workers} worker(s)", file=sys.stderr)
+    if args.workers <= 1:
+        run_worker(sock, get_price_cache([c["id"] for c in CRYPTO_DATABASE]))
+        return 0
+    if not hasattr(os, "fork"):
+        print("--workers needs os.fork; run one process per port behind a proxy instead", file=sys.stderr)
+        return 1
+    snapshot = args.price_snapshot or os.path.join(tempfile.mkdtemp(prefix="crypto-api-"), "prices.json")
+    run_prefork(sock, args.workers, snapshot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Replay the phase 5 tier rules over stored daily candles
+
+Every day each asset is scored with the confidence rules, using its phase
+1-3 scores and the RSI from its candles up to that close. The portfolio then
+holds each asset at its tier's allocation until the next rebalance. Phase
+1-3 inputs have no history, so they are the seeded scores build_analysis()
+gives the asset and stay fixed over the replay; only RSI and prices move.
+
+    python backtest.py                          # every asset in OHLCV_DATA_DIR
+    python backtest.py --synthetic 500 --days 1095 --sweep --workers 8
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_analysis import assign_tiers, generate_columns
+from engine import (
+    CONFIDENCE_TIERS,
+    CRYPTO_DATABASE,
+    RSI_GATE,
+    SCORING_SEED,
+    TIER_THRESHOLDS,
+    build_analysis
+)
+from indicators import rsi_series
+from market_data import DAY, OHLCV_DATA_DIR
+from ohlcv_store import OHLCVStore
+
+TRADING_DAYS = 365
+COST_BPS = 10
+SWEEP_CHUNK = 16
+
+
+def allocation_weights(point="mid"):
+    """Portfolio fraction per tier from the "low-high%" allocation labels"""
+    weights = []
+    for tier in CONFIDENCE_TIERS:
+        low, high = (float(x) / 100 for x in re.findall(r"[\d.]+", tier["allocation"]))
+        weights.append({"low": low, "mid": (low + high) / 2, "high": high}[point])
+    return weights
+
+
+def default_params():
+    """The rules the dashboard uses today"""
+    return {
+        "thresholds": dict(TIER_THRESHOLDS),
+        "rsi_gate": RSI_GATE,
+        "allocations": allocation_weights(),
+        "rebalance_days": 1,
+        "cost_bps": COST_BPS
+    }
+
+
+class Universe:
+    """Aligned daily closes, RSI and phase 1-3 scores for a set of assets"""
+
+    def __init__(self, asset_ids, days, closes, phase1_pass, tokenomics_score, market_bullish):
+        self.asset_ids = list(asset_ids)
+        self.days = days
+        self.closes = closes
+        self.rsi = np.full_like(closes, np.nan)
+        for col in range(closes.shape[1]):
+            # Assets listed later (or with gaps) get RSI over the days they traded
+            listed = np.isfinite(closes[:, col])
+            self.rsi[listed, col] = rsi_series(closes[listed, col])
+        self.phase1_pass = phase1_pass
+        self.tokenomics_score = tokenomics_score
+        self.market_bullish = market_bullish
+        # Return earned from holding each asset from one close to the next
+        with np.errstate(divide="ignore", invalid="ignore"):
+            forward = closes[1:] / closes[:-1] - 1
+        self.tradable = np.isfinite(forward) & np.isfinite(self.rsi[:-1])
+        self.forward_returns = np.where(self.tradable, forward, 0.0)
+        # Equal weight across every tradable asset, for comparison
+        counts = self.tradable.sum(axis=1)
+        self.benchmark = np.cumprod(1 + self.forward_returns.sum(axis=1) / np.maximum(counts, 1))
+
+    def __len__(self):
+        return len(self.asset_ids)
+
+
+def phase_scores(asset_ids, seed=SCORING_SEED):
+    """Phase 1-3 scores build_analysis() gives each asset"""
+    by_id = {c["id"]: c for c in CRYPTO_DATABASE}
+    scores = []
+    for asset_id in asset_ids:
+        crypto = by_id.get(asset_id, {"name": asset_id, "symbol": asset_id[:4].upper(), "id": asset_id})
+        analysis = build_analysis(crypto, {}, seed=seed)
+        scores.append((
+            sum(analysis["phase1"]["checks"].values()),
+            sum(analysis["phase2"]["tokenomics"].values()),
+            sum(1 for v in analysis["phase3"]["metrics"].values() if v == "bullish")
+        ))
+    return [np.array(column, dtype=np.int16) for column in zip(*scores)] if scores else [np.empty(0, np.int16)] * 3
+
+
+def load_universe(directory=OHLCV_DATA_DIR, asset_ids=None, seed=SCORING_SEED):
+    """Align every stored candle file (or the given ones) on one daily grid"""
+    if asset_ids is None:
+        asset_ids = sorted(name[:-len(".ohlcv")] for name in os.listdir(directory) if name.endswith(".ohlcv"))
+    store = OHLCVStore(directory)
+    series = [(store.get(a).column("timestamp"), store.get(a).column("close")) for a in asset_ids]
+    days = np.unique(np.concatenate([ts for ts, _ in series])) if series else np.empty(0)
+    closes = np.full((len(days), len(asset_ids)), np.nan)
+    for col, (ts, close) in enumerate(series):
+        closes[np.searchsorted(days, ts), col] = close
+    return Universe(asset_ids, days, closes, *phase_scores(asset_ids, seed))
+
+
+def synthetic_universe(n_assets, days, seed=0):
+    """Random-walk closes and random phase scores for benchmarks and demos"""
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.0003, 0.001, n_assets)
+    volatility = rng.uniform(0.02, 0.06, n_assets)
+    closes = 100 * np.exp(np.cumsum(rng.normal(drift, volatility, (days, n_assets)), axis=0))
+    # Later listings have no candles before their first day
+    listed = rng.integers(0, days // 2, n_assets)
+    closes[np.arange(days)[:, None] < listed] = np.nan
+    columns = generate_columns(n_assets, rng)
+    return Universe(
+        [f"asset-{i}" for i in range(n_assets)],
+        np.arange(days) * float(DAY),
+        closes,
+        columns["checks"].sum(axis=1),
+        columns["tokenomics"].sum(axis=1, dtype=np.int16),
+        columns["bullish"].sum(axis=1)
+    )
+
+
+def max_drawdown(equity):
+    peaks = np.maximum.accumulate(np.concatenate([[1.0], equity]))
+    return float(np.max(1 - np.concatenate([[1.0], equity]) / peaks))
+
+
+def run_backtest(universe, params=None):
+    """Simulate the rules over the universe; returns summary statistics"""
+    params = {**default_params(), **(params or {})}
+    tiers = assign_tiers(
+        universe.phase1_pass, universe.tokenomics_score, universe.market_bullish, universe.rsi[:-1],
+        params["thresholds"], params["rsi_gate"]
+    )
+    weights = np.where(universe.tradable, np.asarray(params["allocations"])[tiers], 0.0)
+    # Never more than fully invested
+    exposure = weights.sum(axis=1)
+    weights /= np.maximum(exposure, 1.0)[:, None]
+    step = max(1, int(params["rebalance_days"]))
+    if step > 1:
+        # Weights only change on rebalance days; assets that stop trading drop out
+        weights = np.where(universe.tradable, weights[np.arange(len(weights)) // step * step], 0.0)
+
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0.0)).sum(axis=1)
+    returns = (weights * universe.forward_returns).sum(axis=1) - turnover * params["cost_bps"] / 10000
+    equity = np.cumprod(1 + returns)
+
+    years = len(returns) / TRADING_DAYS
+    volatility = float(returns.std() * np.sqrt(TRADING_DAYS)) if len(returns) else 0.0
+    total = float(equity[-1] - 1) if len(equity) else 0.0
+    held = tiers[universe.tradable]
+    tier_days = np.bincount(held, minlength=len(CONFIDENCE_TIERS))
+    tier_sums = np.bincount(held, weights=universe.forward_returns[universe.tradable], minlength=len(CONFIDENCE_TIERS))
+    return {
+        "days": len(returns),
+        "total_return": total,
+        "cagr": float((1 + total) ** (1 / years) - 1) if years and total > -1 else -1.0,
+        "volatility": volatility,
+        "sharpe": float(returns.mean() * TRADING_DAYS / volatility) if volatility else 0.0,
+        "max_drawdown": max_drawdown(equity) if len(equity) else 0.0,
+        "avg_exposure": float(weights.sum(axis=1).mean()) if len(weights) else 0.0,
+        "turnover": float(turnover.sum()),
+        "benchmark_return": float(universe.benchmark[-1] - 1) if len(universe.benchmark) else 0.0,
+        # Mean next-day return of assets while they sat in each tier
+        "tier_returns": {
+            tier["confidence"]: float(tier_sums[t] / tier_days[t]) if tier_days[t] else None
+            for t, tier in enumerate(CONFIDENCE_TIERS)
+        }
+    }
+
+
+def threshold_grid(checks=(-1, 0, 1), tokenomics=(-2, 0, 2), bullish=(-1, 0, 1), rsi_gates=(50, 60, 70)):
+    """Parameter sets shifting every tier's thresholds by the given offsets"""
+    grid = []
+    for dc, dt, db, gate in itertools.product(checks, tokenomics, bullish, rsi_gates):
+        grid.append({
+            "thresholds": {tier: (c + dc, t + dt, b + db) for tier, (c, t, b) in TIER_THRESHOLDS.items()},
+            "rsi_gate": gate
+        })
+    return grid
+
+
+_worker_universe = None
+
+
+def _init_worker(universe):
+    global _worker_universe
+    _worker_universe = universe
+
+
+def _run_in_worker(params):
+    return run_backtest(_worker_universe, params)
+
+
+def sweep(universe, grid, workers=None, base=None):
+    """Backtest every parameter set, in parallel processes; best Sharpe first"""
+    grid = [{**(base or {}), **params} for params in grid]
+    if workers == 1:
+        results = [run_backtest(universe, params) for params in grid]
+    else:
+        # The universe is shipped to each worker once, not with every task
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(universe,)) as pool:
+            results = list(pool.map(_run_in_worker, grid, chunksize=SWEEP_CHUNK))
+    ranked = sorted(zip(grid, results), key=lambda pair: pair[1]["sharpe"], reverse=True)
+    return [{"params": params, "result": result} for params, result in ranked]
+
+
+def main(argv=None):
+    """Backtest the current rules, or sweep thresholds around them"""
+    parser = argparse.ArgumentParser(description="Backtest the phase 5 confidence tiers over stored candles")
+    parser.add_argument("asset_ids", nargs="*", help="assets to include (default: every stored asset)")
+    parser.add_argument("--data-dir", default=OHLCV_DATA_DIR, help="where candle files are stored")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="use N random-walk assets instead of stored candles")
+    parser.add_argument("--days", type=int, default=3 * TRADING_DAYS, help="days of synthetic history")
+    parser.add_argument("--seed", type=int, default=SCORING_SEED, help="scoring seed for phase 1-3 scores")
+    parser.add_argument("--rebalance-days", type=int, default=1)
+    parser.add_argument("--cost-bps", type=float, default=COST_BPS, help="trading cost per unit of turnover")
+    parser.add_argument("--allocation", choices=["low", "mid", "high"], default="mid",
+                        help="point of each tier's allocation range to hold")
+    parser.add_argument("--sweep", action="store_true", help="sweep tier thresholds and the RSI gate")
+    parser.add_argument("--workers", type=int, help="sweep processes (default: one per core)")
+    parser.add_argument("--top", type=int, default=10, help="sweep results to print")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        universe = synthetic_universe(args.synthetic, args.days, args.seed)
+    else:
+        universe = load_universe(args.data_dir, args.asset_ids or None, args.seed)
+    if not len(universe) or len(universe.days) < 2:
+        print("No stored candles to backtest; ingest some with market_data.py first", file=sys.stderr)
+        return 1
+
+    base = {
+        "allocations": allocation_weights(args.allocation),
+        "rebalance_days": args.rebalance_days,
+        "cost_bps": args.cost_bps
+    }
+    if not args.sweep:
+        print(json.dumps(run_backtest(universe, base), indent=2))
+        return 0
+
+    grid = threshold_grid(range(-2, 3), range(-4, 5), range(-2, 3), range(40, 85, 5))
+    print(f"Sweeping {len(grid)} parameter sets over {len(universe)} assets x {len(universe.days)} days",
+          file=sys.stderr)
+    for entry in sweep(universe, grid, args.workers, base)[:args.top]:
+        print(json.dumps(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
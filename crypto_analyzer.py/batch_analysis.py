@@ -0,0 +1,180 @@
+"""5-phase scoring for a whole asset universe, ranked in one vectorized pass"""
+import hashlib
+
+import numpy as np
+
+from analysis_record import CHECK_KEYS, METRIC_KEYS, TEAM_KEYS, TOKENOMICS_KEYS
+from engine import (
+    CONFIDENCE_TIERS, DRAW_FIELDS, DRAW_SHIFT, DRAW_UNIT, DRAW_WORDS, FLAG_THRESHOLDS, INT_RANGES, NO_PRICE,
+    RSI_GATE, SCORING_SEED, TIER_THRESHOLDS, scoring_key
+)
+from signals import SIGNALS
+
+# Same thresholds as build_analysis(): a check passes when its draw is above
+CHECK_THRESHOLDS = np.array([FLAG_THRESHOLDS.get(f"checks.{key}", -1.0) for key in CHECK_KEYS])  # active6months always passes
+TEAM_THRESHOLDS = np.array([FLAG_THRESHOLDS[f"team.{key}"] for key in TEAM_KEYS])
+METRIC_COUNT = len(METRIC_KEYS)
+TOKENOMICS_COUNT = len(TOKENOMICS_KEYS)
+TIER_INDEX = {tier["confidence"]: idx for idx, tier in enumerate(CONFIDENCE_TIERS)}
+FIELD_INDEX = {field: idx for idx, field in enumerate(DRAW_FIELDS)}
+# Signals that land in a table column: (column, position) for the 2-D ones
+SIGNAL_GROUPS = {
+    ("phase1", "checks"): ("checks", CHECK_KEYS),
+    ("phase2", "tokenomics"): ("tokenomics", TOKENOMICS_KEYS),
+    ("phase3", "metrics"): ("bullish", METRIC_KEYS)
+}
+SIGNAL_MILLIONS = {("phase1", "market_cap_value"): "market_cap_musd", ("phase1", "daily_volume"): "daily_volume_musd"}
+
+def generate_columns(n, rng=None):
+    """Draw synthetic phase 1-4 inputs for n assets as column arrays
+
+    Distributed like build_analysis() draws, but not the same per-symbol
+    values; for backtests and benchmarks over made-up universes.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    return {
+        "checks": rng.random((n, len(CHECK_THRESHOLDS))) > CHECK_THRESHOLDS,
+        "tokenomics": rng.integers(3, 6, size=(n, TOKENOMICS_COUNT), dtype=np.int8),
+        "team": rng.random((n, len(TEAM_THRESHOLDS))) > TEAM_THRESHOLDS,
+        "bullish": rng.random((n, METRIC_COUNT)) > 0.5,
+        "market_cap_musd": rng.integers(100, 601, size=n, dtype=np.int32),
+        "daily_volume_musd": rng.integers(5, 56, size=n, dtype=np.int32),
+        "rsi": rng.integers(30, 71, size=n, dtype=np.int8)
+    }
+
+
+def assign_tiers(phase1_pass, tokenomics_score, market_bullish, rsi,
+                 thresholds=TIER_THRESHOLDS, rsi_gate=RSI_GATE):
+    """Vectorized score_confidence(); the arguments broadcast against each other"""
+    shape = np.broadcast(phase1_pass, tokenomics_score, market_bullish, rsi).shape
+    tier = np.zeros(shape, dtype=np.int8)
+    # Assigning in ascending order leaves the highest tier an asset qualifies for
+    for idx in sorted(thresholds):
+        checks, tokenomics, bullish = thresholds[idx]
+        mask = (phase1_pass >= checks) & (tokenomics_score >= tokenomics) & (market_bullish >= bullish)
+        if idx == max(thresholds):
+            mask = mask & (rsi < rsi_gate)
+        tier[np.broadcast_to(mask, shape)] = idx
+    return tier
+
+
+def draw_columns(cryptos, seed=SCORING_SEED):
+    """The scoring_draws() of every crypto as an (n, len(DRAW_FIELDS)) float array"""
+    digests = b"".join(hashlib.shake_256(scoring_key(c, seed)).digest(DRAW_WORDS.size) for c in cryptos)
+    words = np.frombuffer(digests, dtype="<u8").reshape(len(cryptos), len(DRAW_FIELDS))
+    return (words >> np.uint64(DRAW_SHIFT)).astype(np.float64) * DRAW_UNIT
+
+
+def _flags(draws, prefix, keys):
+    """Simulated flags under one prefix, one column per key"""
+    fields = [f"{prefix}.{key}" for key in keys]
+    return draws[:, [FIELD_INDEX[f] for f in fields]] > np.array([FLAG_THRESHOLDS[f] for f in fields])
+
+
+def _numbers(draws, field):
+    """One simulated integer per row, as build_analysis() rounds it"""
+    low, high = INT_RANGES[field]
+    return low + np.floor(draws[:, FIELD_INDEX[field]] * (high - low + 1)).astype(np.int32)
+
+
+def simulated_columns(cryptos, seed=SCORING_SEED):
+    """Phase 1-4 inputs build_analysis() would simulate, as column arrays
+
+    Same keys as generate_columns(), minus the team flags, which do not
+    feed the tier.
+    """
+    draws = draw_columns(cryptos, seed)
+    checks = np.ones((len(cryptos), len(CHECK_KEYS)), dtype=bool)
+    drawn = [idx for idx, key in enumerate(CHECK_KEYS) if f"checks.{key}" in FLAG_THRESHOLDS]
+    checks[:, drawn] = _flags(draws, "checks", [CHECK_KEYS[idx] for idx in drawn])
+    return {
+        "checks": checks,
+        "tokenomics": np.column_stack([_numbers(draws, f"tokenomics.{key}") for key in TOKENOMICS_KEYS]).astype(np.int16),
+        "bullish": _flags(draws, "metrics", METRIC_KEYS),
+        "market_cap_musd": _numbers(draws, "market_cap_value"),
+        "daily_volume_musd": _numbers(draws, "daily_volume"),
+        "rsi": _numbers(draws, "rsi").astype(np.int16)
+    }
+
+
+def _millions(text):
+    """"$123M" -> 123"""
+    return int(text[1:-1])
+
+
+def _apply_signals(columns, row, values):
+    """Write one asset's collected values into the columns, as apply_signals() does to a dict"""
+    for name, value in values.items():
+        *group, key = SIGNALS[name].path
+        if tuple(group) in SIGNAL_GROUPS:
+            column, keys = SIGNAL_GROUPS[tuple(group)]
+            columns[column][row, keys.index(key)] = value == "bullish" if column == "bullish" else value
+        elif tuple(SIGNALS[name].path) in SIGNAL_MILLIONS:
+            columns[SIGNAL_MILLIONS[tuple(SIGNALS[name].path)]][row] = _millions(value)
+
+
+def analyze_all(cryptos, prices=None, seed=SCORING_SEED, timings=None, signals=None):
+    """Score every crypto and return a ranked table of columns
+
+    Every column is computed for the whole universe at once from the same
+    hashed per-symbol draws build_analysis() reads, with candle timing from
+    ``timings`` and collected signals from ``signals`` (both keyed by asset
+    id) written over them, so the batch ranking always agrees with the
+    single-asset view.
+    """
+    prices = prices or {}
+    timings = timings or {}
+    signals = signals or {}
+    columns = simulated_columns(cryptos, seed)
+    for row, crypto in enumerate(cryptos):
+        timing = timings.get(crypto["id"])
+        if timing and "rsi" in timing:
+            columns["rsi"][row] = timing["rsi"]
+        if signals.get(crypto["id"]) is not None:
+            _apply_signals(columns, row, signals[crypto["id"]]["values"])
+
+    phase1_pass = columns["checks"].sum(axis=1, dtype=np.int16)
+    tokenomics_score = columns["tokenomics"].sum(axis=1, dtype=np.int16)
+    bullish = columns["bullish"].sum(axis=1, dtype=np.int16)
+    tier = assign_tiers(phase1_pass, tokenomics_score, bullish, columns["rsi"])
+    tiers = np.array([t["confidence"] for t in CONFIDENCE_TIERS])
+    allocations = np.array([t["allocation"] for t in CONFIDENCE_TIERS])
+    recommendations = np.array([t["recommendation"] for t in CONFIDENCE_TIERS])
+    quotes = [prices.get(c["id"], NO_PRICE) for c in cryptos]
+
+    table = {
+        "name": np.array([c["name"] for c in cryptos], dtype=str),
+        "symbol": np.array([c["symbol"] for c in cryptos], dtype=str),
+        "price": np.array([q.get("usd", 0) or 0 for q in quotes], dtype=np.float64),
+        "change_24h": np.array([q.get("usd_24h_change", 0) or 0 for q in quotes], dtype=np.float64),
+        "confidence": tiers[tier],
+        "allocation": allocations[tier],
+        "recommendation": recommendations[tier],
+        "phase1_pass": phase1_pass,
+        "tokenomics_score": tokenomics_score,
+        "market_score": np.rint(bullish / METRIC_COUNT * 100).astype(np.int16),
+        "rsi": columns["rsi"],
+        "market_cap_musd": columns["market_cap_musd"],
+        "daily_volume_musd": columns["daily_volume_musd"],
+        "tier": tier
+    }
+    # Best tier first, ties broken by tokenomics then on-chain then pre-screening
+    order = np.lexsort((
+        -table["phase1_pass"],
+        -table["market_score"],
+        -table["tokenomics_score"],
+        -table["tier"].astype(np.int16)
+    ))
+    return sort_table(table, order)
+
+def sort_table(table, order):
+    """Reorder every column of a table by an index array"""
+    return {key: column[order] for key, column in table.items()}
+
+
+def sort_table_by(table, key, descending=True):
+    """Return the table sorted by one column"""
+    order = np.argsort(table[key], kind="stable")
+    if descending:
+        order = order[::-1]
+    return sort_table(table, order)
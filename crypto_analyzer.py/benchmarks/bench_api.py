@@ -0,0 +1,157 @@
+"""Load-test the analysis API against a local CoinGecko stub
+
+Starts the stub upstream and ``api_server.py`` (with throwaway history and
+candle stores), then keeps ``--connections`` keep-alive clients busy with a
+mix of analyze, batch, price and history requests for ``--duration``
+seconds. Reports requests per second and tail latency, overall and per
+endpoint. ``--url`` load-tests an already running server instead.
+
+Usage: python benchmarks/bench_api.py --workers 4 --connections 64 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from urllib.parse import urlparse
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from engine import CRYPTO_DATABASE
+from instrumentation import percentile
+from price_providers import StubPriceServer
+
+BATCH_SIZE = 10
+# Share of requests per endpoint
+MIX = {"analyze": 50, "batch": 10, "prices": 25, "history": 15}
+
+
+def make_request(kind, rng):
+    """(method, target, body) for one request of the given kind"""
+    symbols = [c["symbol"] for c in CRYPTO_DATABASE]
+    if kind == "analyze":
+        return "GET", f"/analyze?q={rng.choice(symbols)}", b""
+    if kind == "batch":
+        return "POST", "/analyze/batch", json.dumps({"symbols": rng.sample(symbols, BATCH_SIZE)}).encode()
+    if kind == "prices":
+        ids = ",".join(c["id"] for c in rng.sample(CRYPTO_DATABASE, 5))
+        return "GET", f"/prices?ids={ids}", b""
+    return "GET", f"/history?symbol={rng.choice(symbols)}&limit=10", b""
+
+
+async def client(host, port, deadline, rng, latencies, errors):
+    """One keep-alive connection sending requests back to back"""
+    kinds = list(MIX)
+    weights = [MIX[k] for k in kinds]
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            method, target, body = make_request(kind, rng)
+            start = time.perf_counter()
+            writer.write(
+                f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            latencies[kind].append(time.perf_counter() - start)
+            if status != 200:
+                errors[kind] += 1
+    finally:
+        writer.close()
+
+
+async def load(host, port, connections, duration, seed):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, deadline, random.Random(seed + i), latencies, errors) for i in range(connections)
+    ))
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(elapsed, latencies, errors):
+    rows = dict(latencies)
+    rows["all"] = [s for samples in latencies.values() for s in samples]
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'p99.9 ms':>9} {'max ms':>8}")
+    for name, samples in sorted(rows.items(), key=lambda kv: (kv[0] == "all", kv[0])):
+        samples.sort()
+        failed = sum(errors.values()) if name == "all" else errors[name]
+        print(f"{name:<10} {len(samples):>9} {failed:>7} {len(samples) / elapsed:>9.1f} "
+              f"{percentile(samples, 50) * 1000:>8.2f} {percentile(samples, 90) * 1000:>8.2f} "
+              f"{percentile(samples, 99) * 1000:>8.2f} {percentile(samples, 99.9) * 1000:>9.2f} "
+              f"{(samples[-1] if samples else 0) * 1000:>8.2f}")
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def start_server(port, workers, upstream, directory):
+    env = dict(
+        os.environ,
+        COINGECKO_API_URL=upstream,
+        PRICE_PROVIDER="coingecko",
+        HISTORY_DB_PATH=os.path.join(directory, "history.db"),
+        OHLCV_DATA_DIR=os.path.join(directory, "ohlcv")
+    )
+    return subprocess.Popen(
+        [sys.executable, os.path.join(APP_DIR, "api_server.py"), "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--price-snapshot", os.path.join(directory, "prices.json")],
+        env=env
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="load-test this running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=2, help="API server processes")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of load before measuring")
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="seconds the stub adds per response")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        stub = StubPriceServer(latency=args.upstream_latency).start()
+        server = start_server(args.port, args.workers, stub.url, tempfile.mkdtemp(prefix="bench-api-"))
+        url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_up(url)
+        target = urlparse(url)
+        if args.warmup:
+            # First requests per asset ingest a year of candles from the stub
+            asyncio.run(load(target.hostname, target.port, args.connections, args.warmup, args.seed))
+        elapsed, latencies, errors = asyncio.run(
+            load(target.hostname, target.port, args.connections, args.duration, args.seed)
+        )
+        print(f"{url}: {args.connections} connections for {elapsed:.1f} s"
+              + (f", {args.workers} worker(s)" if server else ""))
+        report(elapsed, latencies, errors)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
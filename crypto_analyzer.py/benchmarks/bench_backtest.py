@@ -0,0 +1,33 @@
+"""Time single backtests and a threshold sweep over a synthetic universe
+
+Usage: python benchmarks/bench_backtest.py [assets] [days] [workers]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest import run_backtest, sweep, synthetic_universe, threshold_grid
+
+
+if __name__ == "__main__":
+    assets = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 3 * 365
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    start = time.perf_counter()
+    universe = synthetic_universe(assets, days)
+    print(f"built {assets} assets x {days} days in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        run_backtest(universe)
+    print(f"single backtest: {(time.perf_counter() - start) / 20 * 1000:.1f} ms")
+
+    grid = threshold_grid(range(-2, 3), range(-4, 5), range(-2, 3), range(40, 85, 5))
+    start = time.perf_counter()
+    best = sweep(universe, grid, workers)[0]
+    elapsed = time.perf_counter() - start
+    print(f"sweep of {len(grid)} parameter sets on {workers} workers: {elapsed:.1f} s "
+          f"({len(grid) / elapsed:.0f} backtests/s), best Sharpe {best['result']['sharpe']:.2f}")
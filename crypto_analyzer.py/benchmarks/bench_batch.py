@@ -0,0 +1,42 @@
+"""Time Analyze All against looping build_analysis() over a universe
+
+Both score from the same hashed per-symbol draws; the batch computes each
+column for the whole universe at once instead of building a dict per asset.
+
+Usage: python benchmarks/bench_batch.py [size ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_analysis import analyze_all
+from engine import build_analysis
+
+
+def synthetic_universe(n):
+    """Build n fake CRYPTO_DATABASE entries"""
+    return [{"name": f"Token {i}", "symbol": f"T{i}", "id": f"token-{i}"} for i in range(n)]
+
+
+def bench(n):
+    cryptos = synthetic_universe(n)
+    prices = {c["id"]: {"usd": 1.0, "usd_24h_change": 0.5} for c in cryptos}
+
+    start = time.perf_counter()
+    for c in cryptos:
+        build_analysis(c, prices.get(c["id"], {"usd": 0, "usd_24h_change": 0}))
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyze_all(cryptos, prices)
+    batch_s = time.perf_counter() - start
+
+    print(f"{n:>9,} assets  loop {loop_s * 1000:9.1f} ms  batch {batch_s * 1000:8.1f} ms  speedup {loop_s / batch_s:6.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [30, 1000, 10000, 100000]
+    for size in sizes:
+        bench(size)
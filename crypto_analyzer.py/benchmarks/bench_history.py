@@ -0,0 +1,57 @@
+"""Time indexed history queries over a large synthetic store
+
+Usage: python benchmarks/bench_history.py [rows] [db path]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import CONFIDENCE_TIERS, CRYPTO_DATABASE, build_analysis
+from history_store import HistoryStore
+
+
+def timed(label, fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(f"{label:<40} p50 {samples[len(samples) // 2] * 1000:8.2f} ms  max {samples[-1] * 1000:8.2f} ms")
+    return result
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.mkdtemp(), "bench_history.db")
+    store = HistoryStore(path)
+
+    rng = random.Random(0)
+    now = time.time()
+    # A pool of analyses reused with random timestamps keeps generation cheap
+    samples = [build_analysis(rng.choice(CRYPTO_DATABASE), {"usd": 1.0}) for _ in range(1000)]
+    start = time.perf_counter()
+    for i in range(rows):
+        store.add(samples[i % len(samples)], created_at=now - rng.random() * 30 * 86400)
+        if i % 50000 == 49999:
+            store.flush()
+    store.flush()
+    print(f"wrote {rows:,} rows in {time.perf_counter() - start:.1f} s ({path})")
+
+    strong_buy = CONFIDENCE_TIERS[-1]["recommendation"]
+    timed("STRONG BUY in last 24h (first page)",
+          lambda: store.query(recommendation=strong_buy, since=now - 86400))
+    timed("BTC history (first page)", lambda: store.query(symbol="BTC"))
+    timed("latest page, all analyses", lambda: store.query())
+
+    cursor = None
+    for _ in range(100):
+        _, cursor = store.query(before=cursor)
+    timed("page 101 via cursor", lambda: store.query(before=cursor))
+    timed("count STRONG BUY in last 24h",
+          lambda: store.count(recommendation=strong_buy, since=now - 86400), repeat=5)
+    store.close()
@@ -0,0 +1,60 @@
+"""Compare memory and scoring cost of analysis dicts and AnalysisRecords
+
+Usage: python benchmarks/bench_records.py [analyses]
+"""
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_record import AnalysisRecord
+from engine import CRYPTO_DATABASE, build_analysis, calculate_market_score, calculate_tokenomics_score
+
+
+def allocated(build):
+    """Return what build() returns and the bytes it still holds"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(0)
+    # Serialized analyses stand in for history pages loaded from the store
+    payloads = [
+        json.dumps(build_analysis(random.choice(CRYPTO_DATABASE), {"usd": random.uniform(0.01, 1000), "usd_24h_change": random.uniform(-5, 5)}))
+        for _ in range(n)
+    ]
+
+    dicts, dict_bytes = allocated(lambda: [json.loads(p) for p in payloads])
+    records, record_bytes = allocated(lambda: [AnalysisRecord.from_json(p) for p in payloads])
+    per_100k = 100000 / n
+    print(f"{n:,} analyses")
+    print(f"{'dicts':<40} {dict_bytes * per_100k / 2 ** 20:8.1f} MiB per 100k  ({dict_bytes / n:6.0f} B each)")
+    print(f"{'records':<40} {record_bytes * per_100k / 2 ** 20:8.1f} MiB per 100k  ({record_bytes / n:6.0f} B each)")
+    print(f"{'ratio':<40} {dict_bytes / record_bytes:8.1f}x")
+
+    assert all(r.to_dict() == d for r, d in zip(records, dicts))
+    timed("scores from dicts", lambda: [
+        (calculate_tokenomics_score(d["phase2"]["tokenomics"]), calculate_market_score(d["phase3"]["metrics"]))
+        for d in dicts
+    ])
+    timed("scores from records", lambda: [(r.tokenomics_score, r.market_score) for r in records])
+    timed("records from dicts", lambda: [AnalysisRecord.from_dict(d) for d in dicts])
+    timed("dicts from records", lambda: [r.to_dict() for r in records])
@@ -0,0 +1,51 @@
+"""Time a dashboard rerun as the number of stored analyses grows
+
+Usage: python benchmarks/bench_render.py [count ...]
+"""
+import os
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from streamlit.testing.v1 import AppTest
+
+from synthetic import synthetic_records
+
+RERUNS = 5
+
+
+def count_elements(node):
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def bench(count):
+    projects = synthetic_records(count)
+
+    at = AppTest.from_file(os.path.join(APP_DIR, "crypto_analyzer.py.py"), default_timeout=60)
+    at.session_state["projects"] = projects
+    at.session_state["history_loaded"] = True
+    at.run()
+    # A rerun that raises finishes early; never report its time as a result
+    if at.exception:
+        raise SystemExit(f"dashboard raised with {count} analyses: {at.exception[0].message}")
+
+    samples = []
+    for _ in range(RERUNS):
+        start = time.perf_counter()
+        at.run()
+        if at.exception:
+            raise SystemExit(f"dashboard raised with {count} analyses: {at.exception[0].message}")
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(f"{count:>6} analyses  rerun p50 {samples[len(samples) // 2] * 1000:7.1f} ms  elements {count_elements(at._tree):>5}")
+
+
+if __name__ == "__main__":
+    counts = [int(a) for a in sys.argv[1:]] or [1, 10, 50, 200, 1000]
+    for count in counts:
+        bench(count)
@@ -0,0 +1,57 @@
+"""Time exact lookup and autocomplete against a large synthetic universe
+
+Usage: python benchmarks/bench_search.py [size]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+from synthetic import synthetic_cryptos
+
+
+def timed(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+    rng = random.Random(0)
+    cryptos = synthetic_cryptos(size)
+
+    start = time.perf_counter()
+    index = SearchIndex(cryptos)
+    print(f"build {size:,} assets: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    picks = [rng.choice(cryptos) for _ in range(2000)]
+    prefixes = [c["name"][:rng.randint(1, len(c["name"]))] for c in picks]
+    typos = [c["name"][:-2] + "zq" for c in picks[:200]]
+    infixes = [c["name"][1:rng.randint(4, len(c["name"]))] for c in picks[:200]]
+
+    def substring_scan(q):
+        q = q.lower()
+        return [c for c in cryptos if q in c["name"].lower() or q in c["symbol"].lower()][:10]
+
+    # Substring and typo lookups share a trigram index built on first use
+    start = time.perf_counter()
+    index.suggest("zzyzx")
+    print(f"trigram index: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for label, fn, queries in [
+        ("exact lookup", index.lookup, [c["symbol"] for c in picks]),
+        ("prefix suggest", index.suggest, prefixes),
+        ("substring suggest", index.suggest, infixes),
+        ("fuzzy suggest", index.suggest, typos),
+        ("linear substring scan", substring_scan, prefixes[:200])
+    ]:
+        p50, p99 = timed(fn, queries)
+        print(f"{label:<22} p50 {p50:9.1f} us  p99 {p99:9.1f} us")
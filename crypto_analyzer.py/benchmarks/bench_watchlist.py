@@ -0,0 +1,68 @@
+"""Compare incremental watchlist ticks against re-running the full analysis
+
+Usage: python benchmarks/bench_watchlist.py [symbols] [ticks]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import build_analysis
+from market_data import DAY, MarketData
+from ohlcv_store import OHLCVStore
+from watchlist import AlertDispatcher, QueueSink, Watchlist
+
+
+class RandomWalkSource:
+    """A year of synthetic daily candles per asset"""
+
+    def fetch(self, asset_id, since=None):
+        if since is not None:
+            return np.empty((0, 6))
+        rng = np.random.default_rng(abs(hash(asset_id)) % 2 ** 32)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.04, 365)))
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+        days = (np.arange(365) + 19000) * float(DAY)
+        return np.column_stack([days, opens, np.maximum(opens, closes), np.minimum(opens, closes), closes,
+                                rng.uniform(1e6, 1e7, 365)])
+
+
+if __name__ == "__main__":
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    cryptos = [{"name": f"Asset {i}", "symbol": f"A{i}", "id": f"asset-{i}"} for i in range(symbols)]
+    market_data = MarketData(OHLCVStore(tempfile.mkdtemp()), RandomWalkSource())
+
+    sink = QueueSink()
+    dispatcher = AlertDispatcher([sink])
+    watchlist = Watchlist(dispatcher, market_data)
+    start = time.perf_counter()
+    for crypto in cryptos:
+        watchlist.add(crypto)
+    print(f"watching {symbols} symbols, set up in {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(0)
+    last = {c["id"]: watchlist.state(c["id"]).indicators.last_close for c in cryptos}
+    stream = [(rng.choice(cryptos)["id"], rng.uniform(0.8, 1.2)) for _ in range(ticks)]
+
+    start = time.perf_counter()
+    for asset_id, move in stream:
+        watchlist.on_prices({asset_id: {"usd": last[asset_id] * move}})
+    elapsed = time.perf_counter() - start
+    dispatcher.flush()
+    print(f"incremental: {ticks / elapsed:,.0f} ticks/s ({elapsed / ticks * 1e6:.1f} us/tick), "
+          f"{sink.queue.qsize()} alerts, {dict(dispatcher.counts)}")
+
+    sample = stream[:min(ticks, 2000)]
+    by_id = {c["id"]: c for c in cryptos}
+    start = time.perf_counter()
+    for asset_id, move in sample:
+        timing = market_data.timing(asset_id)
+        build_analysis(by_id[asset_id], {"usd": last[asset_id] * move}, timing)
+    elapsed = time.perf_counter() - start
+    print(f"full analysis per tick: {len(sample) / elapsed:,.0f} ticks/s ({elapsed / len(sample) * 1e6:.1f} us/tick)")
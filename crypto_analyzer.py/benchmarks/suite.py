@@ -0,0 +1,305 @@
+"""Benchmark regression suite with stored baselines
+
+Scales the asset universe to each ``--sizes`` entry (10k, 100k and 1M by
+default) and times:
+- search: index build, suggestion filtering and exact lookup, through the
+  same ``suggest_cryptos`` / ``find_crypto`` calls main() and analyze_project() make
+- confidence: the phase 5 tier rules, one asset at a time and vectorized
+- format: ``format_price`` and ``calculate_market_score`` over every asset
+- prices: parsing a /simple/price map covering every asset
+- render: a dashboard rerun with ``--projects`` stored analyses
+
+Each metric is the best of ``--repeat`` runs, and lower is always better.
+Results are compared with ``baselines.json``. The run fails (exit status 1)
+when a metric is more than ``--threshold`` slower than its baseline. A fixed
+calibration workload is timed with every run, and baselines are scaled by
+how much faster or slower it ran, so a busy or throttled machine is not
+mistaken for a regression.
+Baselines are machine specific; refresh them with ``--update`` after an
+intended change or on new CI hardware.
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --sizes 10000 --only search,confidence
+    python benchmarks/suite.py --update
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_SIZES = [10000, 100000, 1000000]
+DEFAULT_PROJECTS = [10, 1000, 10000]
+DEFAULT_THRESHOLD = 0.25
+QUERIES = 5000
+RERUNS = 5
+CALIBRATION_REPEAT = 20
+
+# Keep the dashboard off the network and off the default ports and stores
+_scratch = tempfile.mkdtemp(prefix="bench-suite-")
+os.environ.update({
+    "PRICE_PROVIDER": f"file:{os.path.join(_scratch, 'prices.json')}",
+    "HISTORY_DB_PATH": os.path.join(_scratch, "history.db"),
+    "OHLCV_DATA_DIR": os.path.join(_scratch, "ohlcv"),
+    "OHLCV_FIXTURE_DIR": os.path.join(_scratch, "no-candles"),
+    "PRICE_STREAM_PORT": "0",
+    "METRICS_PORT": "0"
+})
+sys.path.insert(0, APP_DIR)
+
+import numpy as np
+
+import engine
+from batch_analysis import assign_tiers, generate_columns
+from engine import RSI_GATE, TIER_THRESHOLDS, calculate_market_score, find_crypto, score_confidence, suggest_cryptos
+from price_providers import FileProvider
+from synthetic import synthetic_cryptos, synthetic_price_map, synthetic_records, write_price_map
+
+
+def best_of(fn, repeat):
+    """Fastest wall time of fn() over repeat runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _calibration_work():
+    # Function calls, dict updates and string formatting, like the code under test
+    cache = {}
+    for i in range(20000):
+        cache[i % 1000] = f"${i / 7:,.2f}"
+    return cache
+
+
+def calibrate():
+    """Best time of a short fixed workload, in ms, to compare machine speed between runs"""
+    return best_of(_calibration_work, CALIBRATION_REPEAT) * 1000
+
+
+def size_label(n):
+    if n >= 1000000 and n % 1000000 == 0:
+        return f"{n // 1000000}m"
+    if n >= 1000 and n % 1000 == 0:
+        return f"{n // 1000}k"
+    return str(n)
+
+
+def load_app():
+    """Import the dashboard script for its helpers, without a Streamlit server"""
+    spec = importlib.util.spec_from_file_location("crypto_app", os.path.join(APP_DIR, "crypto_analyzer.py.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_search(cryptos, repeat):
+    rng = random.Random(1)
+    picks = [rng.choice(cryptos) for _ in range(QUERIES)]
+    prefixes = [c["name"][:rng.randint(1, len(c["name"]))] for c in picks]
+    symbols = [c["symbol"] for c in picks]
+    original = list(engine.CRYPTO_DATABASE)
+    # get_search_index() rebuilds whenever the database changes size
+    engine.CRYPTO_DATABASE[:] = cryptos
+    try:
+        def build():
+            engine._search_index = None
+            engine.get_search_index()
+
+        metrics = {"build_index_ms": best_of(build, repeat) * 1000}
+        metrics["suggest_us"] = best_of(lambda: [suggest_cryptos(q) for q in prefixes], repeat) / QUERIES * 1e6
+        metrics["lookup_us"] = best_of(lambda: [find_crypto(q) for q in symbols], repeat) / QUERIES * 1e6
+    finally:
+        engine.CRYPTO_DATABASE[:] = original
+        engine._search_index = None
+    return metrics
+
+
+def bench_confidence(n, repeat):
+    columns = generate_columns(n, np.random.default_rng(0))
+    phase1 = columns["checks"].sum(axis=1)
+    tokenomics = columns["tokenomics"].sum(axis=1)
+    bullish = columns["bullish"].sum(axis=1)
+    rsi = columns["rsi"]
+    rows = list(zip(phase1.tolist(), tokenomics.tolist(), bullish.tolist(), rsi.tolist()))
+    return {
+        "scalar_ms": best_of(lambda: [score_confidence(*row) for row in rows], repeat) * 1000,
+        "vectorized_ms": best_of(
+            lambda: assign_tiers(phase1, tokenomics, bullish, rsi, TIER_THRESHOLDS, RSI_GATE), repeat
+        ) * 1000
+    }
+
+
+def bench_format(cryptos, app, repeat):
+    prices = [quote["usd"] for quote in synthetic_price_map(cryptos).values()]
+    rng = random.Random(2)
+    statuses = ["bullish", "neutral", "bearish"]
+    # A fixed pool of metric dicts keeps 1M-asset runs within memory
+    metric_pool = [{f"m{i}": rng.choice(statuses) for i in range(7)} for _ in range(1000)]
+    metric_sets = [metric_pool[i % len(metric_pool)] for i in range(len(cryptos))]
+    return {
+        "format_price_ms": best_of(lambda: [app.format_price(p) for p in prices], repeat) * 1000,
+        "market_score_ms": best_of(lambda: [calculate_market_score(m) for m in metric_sets], repeat) * 1000
+    }
+
+
+def bench_prices(cryptos, repeat):
+    path = write_price_map(os.path.join(_scratch, f"prices-{len(cryptos)}.json"), cryptos)
+    provider = FileProvider(path)
+    ids = [c["id"] for c in cryptos]
+
+    def parse():
+        # Forget the mtime so every run re-reads and parses the file
+        provider._mtime = None
+        provider.fetch(ids)
+
+    return {"parse_ms": best_of(parse, repeat) * 1000}
+
+
+def bench_render(count, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(APP_DIR, "crypto_analyzer.py.py"), default_timeout=120)
+    at.session_state["projects"] = synthetic_records(count)
+    at.session_state["history_loaded"] = True
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"dashboard raised during the rerun benchmark: {at.exception[0].message}")
+    samples = []
+    for _ in range(max(repeat, RERUNS)):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+    # Reruns are noisier than the micro benchmarks, so use the median
+    samples.sort()
+    return {"rerun_ms": samples[len(samples) // 2] * 1000}
+
+
+def run_suite(sizes, projects, only, repeat):
+    """Return ({metric name: value}, calibration ms); names read group.measure.size"""
+    results = {}
+    # Machine speed drifts on shared hosts, so calibrate next to every group
+    calibrations = []
+    groups = set(only) if only else {"search", "confidence", "format", "prices", "render"}
+    app = load_app() if "format" in groups else None
+    write_price_map(os.environ["PRICE_PROVIDER"][len("file:"):], engine.CRYPTO_DATABASE)
+    for n in sizes:
+        label = size_label(n)
+        print(f"universe of {n:,} assets", file=sys.stderr)
+        cryptos = synthetic_cryptos(n) if groups & {"search", "format", "prices"} else None
+        for group, run in [
+            ("search", lambda: bench_search(cryptos, repeat)),
+            ("confidence", lambda: bench_confidence(n, repeat)),
+            ("format", lambda: bench_format(cryptos, app, repeat)),
+            ("prices", lambda: bench_prices(cryptos, repeat))
+        ]:
+            if group in groups:
+                calibrations.append(calibrate())
+                for measure, value in run().items():
+                    results[f"{group}.{measure}.{label}"] = value
+    if "render" in groups:
+        for count in projects:
+            print(f"rerun with {count:,} projects", file=sys.stderr)
+            calibrations.append(calibrate())
+            results[f"render.rerun_ms.{size_label(count)}_projects"] = bench_render(count, repeat)["rerun_ms"]
+    calibrations.sort()
+    return results, calibrations[len(calibrations) // 2] if calibrations else calibrate()
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+
+def compare(results, baseline, threshold, speed=1.0):
+    """Print a comparison table; returns the names of regressed metrics
+
+    Baselines are multiplied by speed, this run's calibration time over the
+    baseline's, before comparing.
+    """
+    regressions = []
+    print(f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<44} {'-':>12} {value:>12.3f} {'new':>8}")
+            continue
+        base *= speed
+        change = value / base - 1 if base else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<44} {base:>12.3f} {value:>12.3f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    """Run the suite and compare with, or update, the stored baselines"""
+    parser = argparse.ArgumentParser(description="Benchmark regression suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="asset universe sizes")
+    parser.add_argument("--projects", type=int, nargs="+", default=DEFAULT_PROJECTS,
+                        help="stored analyses for the rerun benchmark")
+    parser.add_argument("--only", help="comma separated groups: search,confidence,format,prices,render")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per metric; the best one counts")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing, as a fraction (default 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", help="also write this run's results as JSON here")
+    parser.add_argument("--update", action="store_true", help="merge this run into the baseline file")
+    args = parser.parse_args(argv)
+
+    only = [g.strip() for g in args.only.split(",")] if args.only else None
+    results, calibration = run_suite(args.sizes, args.projects, only, args.repeat)
+    run = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "calibration_ms": calibration,
+        "metrics": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    stored = {"metrics": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    if args.update:
+        # Metrics not measured this run (e.g. with --only) keep their old
+        # baseline, rescaled to this run's calibration like compare() does
+        speed = calibration / stored["calibration_ms"] if stored.get("calibration_ms") else 1.0
+        kept = {name: value * speed for name, value in stored["metrics"].items()}
+        stored = {**run, "metrics": {**kept, **results}}
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Updated {len(results)} baselines in {args.baseline}", file=sys.stderr)
+        return 0
+
+    if stored.get("machine") and stored["machine"] != machine_info():
+        print(f"Warning: baselines were recorded on {stored['machine']}", file=sys.stderr)
+    speed = calibration / stored["calibration_ms"] if stored.get("calibration_ms") else 1.0
+    print(f"calibration {calibration:.2f} ms, {speed:.2f}x the baseline machine's", file=sys.stderr)
+    regressions = compare(results, stored["metrics"], args.threshold, speed)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: "
+              + ", ".join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
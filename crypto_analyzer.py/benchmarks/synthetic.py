@@ -0,0 +1,52 @@
+"""Seeded synthetic assets, price maps and stored analyses for the benchmarks"""
+import json
+import os
+import random
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_record import AnalysisRecord
+from engine import CRYPTO_DATABASE, build_analysis
+
+# Distinct analyses behind synthetic records; more only repeats the same shapes
+ANALYSIS_POOL = 1000
+
+
+def synthetic_cryptos(n, seed=0):
+    """n fake assets with realistic name lengths and some duplicate tickers"""
+    rng = random.Random(seed)
+    cryptos = []
+    for i in range(n):
+        name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))).title()
+        if rng.random() < 0.3:
+            name += " " + rng.choice(["Protocol", "Network", "Finance", "Token", "Chain"])
+        symbol = name[:rng.randint(2, 5)].upper()
+        cryptos.append({"name": name, "symbol": symbol, "id": f"{name.lower().replace(' ', '-')}-{i}"})
+    return cryptos
+
+
+def synthetic_price_map(cryptos, seed=0):
+    """A /simple/price style map with a quote for every asset"""
+    rng = random.Random(seed)
+    return {
+        c["id"]: {"usd": 10 ** rng.uniform(-6, 5), "usd_24h_change": rng.uniform(-20, 20)}
+        for c in cryptos
+    }
+
+
+def write_price_map(path, cryptos, seed=0):
+    with open(path, "w") as f:
+        json.dump(synthetic_price_map(cryptos, seed), f)
+    return path
+
+
+def synthetic_records(count, seed=0):
+    """count stored analyses as session records, each with a distinct id"""
+    rng = random.Random(seed)
+    pool = [
+        build_analysis(rng.choice(CRYPTO_DATABASE), {"usd": 10 ** rng.uniform(-4, 4), "usd_24h_change": 1.0}, seed=i)
+        for i in range(min(count, ANALYSIS_POOL))
+    ]
+    return [AnalysisRecord.from_dict({**pool[i % len(pool)], "id": i}) for i in range(count)]
@@ -0,0 +1,271 @@
+"""Concurrent collection of phase 1-3 signals from pluggable sources
+
+Each signal (an exchange listing, a GitHub flag, an on-chain trend...) comes
+from one named source. A Collector fans out to every source an asset needs
+on its own asyncio loop, with a per-source concurrency limit and a timeout
+per signal. Signals that time out, fail or that no source provides are
+returned as missing, not simulated. Collected values are cached for as long
+as the signal is expected to stay current, and missing ones briefly, so a
+failing source is not asked again on every analysis.
+
+``COLLECTOR_SOURCES`` picks where signals come from:
+- unset (default) - no collection; every phase 1-3 value stays simulated
+- ``fixture:<dir>`` - JSON files at ``<dir>/<source>/<asset_id>.json``
+- an ``http://`` or ``https://`` base URL - ``GET <url>/<source>/<asset_id>``
+  returning the same JSON
+
+Fixture files map signal names to values shaped like the analysis fields,
+and may set ``"_latency"`` (seconds) to simulate a slow upstream:
+
+    python collectors.py --make-fixtures fixtures/signals
+    COLLECTOR_SOURCES=fixture:fixtures/signals python collectors.py bitcoin
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+from signals import SIGNALS, SOURCE_NAMES, signal_values
+
+COLLECTOR_SOURCES = os.environ.get("COLLECTOR_SOURCES", "")
+# Requests in flight per source, across every analysis in the process
+COLLECTOR_CONCURRENCY = int(os.environ.get("COLLECTOR_CONCURRENCY", 8))
+# Seconds a missing signal is reported without asking its source again
+MISSING_TTL = float(os.environ.get("COLLECTOR_MISSING_TTL", 60))
+
+
+class FixtureSource:
+    """Signals for one source from <directory>/<source>/<asset_id>.json"""
+
+    def __init__(self, directory, source):
+        self.path = os.path.join(directory, source)
+
+    def _read(self, asset_id):
+        path = os.path.join(self.path, f"{asset_id}.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    async def fetch(self, asset_id, names):
+        values = await asyncio.to_thread(self._read, asset_id)
+        latency = values.pop("_latency", 0)
+        if latency:
+            await asyncio.sleep(latency)
+        return {name: values[name] for name in names if name in values}
+
+
+class HTTPSource:
+    """Signals for one source from GET <base_url>/<source>/<asset_id>"""
+
+    def __init__(self, base_url, source, session=None):
+        import requests
+
+        self.url = f"{base_url.rstrip('/')}/{source}"
+        self.session = session or requests.Session()
+
+    def _get(self, asset_id):
+        response = self.session.get(f"{self.url}/{asset_id}", timeout=10)
+        if response.status_code == 404:
+            return {}
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch(self, asset_id, names):
+        values = await asyncio.to_thread(self._get, asset_id)
+        return {name: values[name] for name in names if name in values}
+
+
+def make_sources(spec=COLLECTOR_SOURCES):
+    """Build a source per name from a COLLECTOR_SOURCES style spec"""
+    if not spec:
+        return {}
+    if spec.startswith("fixture:"):
+        return {name: FixtureSource(spec[len("fixture:"):], name) for name in SOURCE_NAMES}
+    base_url = spec
+    if spec.startswith("http:") and urlparse(spec[len("http:"):]).scheme in ("http", "https"):
+        # The older http:<url> form
+        base_url = spec[len("http:"):]
+    url = urlparse(base_url)
+    if url.scheme in ("http", "https") and url.netloc:
+        import requests
+
+        session = requests.Session()
+        return {name: HTTPSource(base_url, name, session) for name in SOURCE_NAMES}
+    raise ValueError(f"Unknown collector sources: {spec}")
+
+
+class Collector:
+    """Fans signal requests out to sources on a background asyncio loop"""
+
+    def __init__(self, sources, signals=SIGNALS, concurrency=COLLECTOR_CONCURRENCY, clock=time.monotonic):
+        self.sources = sources
+        self.signals = signals
+        self.concurrency = concurrency
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}
+        self._semaphores = self._new_semaphores()
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the collector loop thread if it is not already running"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                # Semaphores bind to the first loop that waits on them
+                self._semaphores = self._new_semaphores()
+                threading.Thread(target=self._loop.run_forever, name="collector-loop", daemon=True).start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+    def collect(self, asset_id, names=None):
+        """Collect signals for one asset from any thread; see gather()"""
+        return self.collect_many([asset_id], names)[asset_id]
+
+    def collect_many(self, asset_ids, names=None):
+        """Collect signals for several assets at once, keyed by asset id"""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._gather_many(asset_ids, names), self._loop)
+        return future.result()
+
+    async def _gather_many(self, asset_ids, names):
+        results = await asyncio.gather(*(self.gather(asset_id, names) for asset_id in asset_ids))
+        return dict(zip(asset_ids, results))
+
+    async def gather(self, asset_id, names=None):
+        """Return {"values": {signal: value}, "missing": {signal: reason}}"""
+        values, missing, wanted = {}, {}, {}
+        now = self.clock()
+        for name in names or self.signals:
+            signal = self.signals[name]
+            cached = self._cache.get((asset_id, name))
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                if cached[2] is None:
+                    values[name] = cached[1]
+                else:
+                    missing[name] = cached[2]
+            elif signal.source not in self.sources:
+                missing[name] = "no source"
+            else:
+                self.misses += 1
+                wanted.setdefault(signal.source, []).append(signal)
+
+        # One request per source covers every signal wanted from it
+        fetches = {
+            source: asyncio.ensure_future(self._fetch(source, asset_id, [s.name for s in signals]))
+            for source, signals in wanted.items()
+        }
+        outcomes = await asyncio.gather(*(
+            self._await_signal(signal, fetches[source]) for source, signals in wanted.items() for signal in signals
+        ))
+        for fetch in fetches.values():
+            fetch.cancel()
+        now = self.clock()
+        for signal, value, reason in outcomes:
+            if reason is None:
+                values[signal.name] = value
+                self._cache[(asset_id, signal.name)] = (now + signal.ttl, value, None)
+            else:
+                missing[signal.name] = reason
+                # Back off from a failing source, but retry sooner than a value expires
+                self._cache[(asset_id, signal.name)] = (now + min(signal.ttl, MISSING_TTL), None, reason)
+        return {"values": values, "missing": missing}
+
+    def _new_semaphores(self):
+        return {source: asyncio.Semaphore(self.concurrency) for source in self.sources}
+
+    async def _fetch(self, source, asset_id, names):
+        async with self._semaphores[source]:
+            return await self.sources[source].fetch(asset_id, names)
+
+    async def _await_signal(self, signal, fetch):
+        try:
+            # Shielded so one signal timing out leaves the shared request running
+            values = await asyncio.wait_for(asyncio.shield(fetch), signal.timeout)
+        except asyncio.TimeoutError:
+            return signal, None, "timeout"
+        except Exception as e:
+            return signal, None, f"error: {e}"
+        if signal.name not in values:
+            return signal, None, "unavailable"
+        if not signal.valid(values[signal.name]):
+            return signal, None, "invalid value"
+        return signal, values[signal.name], None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def get_collector():
+    """Return the process-wide collector, or None when no sources are configured"""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            sources = make_sources()
+            if not sources:
+                return None
+            _collector = Collector(sources).start()
+        return _collector
+
+
+def write_fixtures(directory, seed=None):
+    """Write fixture files for CRYPTO_DATABASE from the seeded simulated values"""
+    from engine import CRYPTO_DATABASE, SCORING_SEED, build_analysis
+
+    for crypto in CRYPTO_DATABASE:
+        values = signal_values(build_analysis(crypto, {}, seed=SCORING_SEED if seed is None else seed))
+        for source in SOURCE_NAMES:
+            os.makedirs(os.path.join(directory, source), exist_ok=True)
+            with open(os.path.join(directory, source, f"{crypto['id']}.json"), "w") as f:
+                json.dump({n: v for n, v in values.items() if SIGNALS[n].source == source}, f, indent=2)
+    return len(CRYPTO_DATABASE)
+
+
+def main(argv=None):
+    """Collect signals for assets and print one JSON result per line"""
+    parser = argparse.ArgumentParser(description="Collect phase 1-3 signals from the configured sources")
+    parser.add_argument("asset_ids", nargs="*", help="CoinGecko ids, e.g. bitcoin")
+    parser.add_argument("--sources", default=COLLECTOR_SOURCES, help="fixture:<dir> or an http(s):// base URL")
+    parser.add_argument("--make-fixtures", metavar="DIR", help="write fixture files for every known asset")
+    args = parser.parse_args(argv)
+
+    if args.make_fixtures:
+        count = write_fixtures(args.make_fixtures)
+        print(f"Wrote fixtures for {count} assets to {args.make_fixtures}", file=sys.stderr)
+        return 0
+
+    collector = Collector(make_sources(args.sources))
+    start = time.perf_counter()
+    results = collector.collect_many(args.asset_ids)
+    for asset_id in args.asset_ids:
+        print(json.dumps({"id": asset_id, **results[asset_id]}))
+    print(f"Collected {len(args.asset_ids)} assets in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    collector.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,24 @@
 import streamlit as st
-import requests
-import random
-from datetime import datetime
+import streamlit.components.v1 as components
+import json
 import time
 
+from analysis_jobs import gather_inputs, get_job_pool, run_analyses
+from analysis_record import AnalysisRecord
+from batch_analysis import analyze_all
+from engine import (
+    CONFIDENCE_TIERS,
+    CRYPTO_DATABASE,
+    find_crypto,
+    resolve_crypto,
+    suggest_cryptos
+)
+from history_store import PAGE_SIZE, get_history_store
+from instrumentation import get_metrics, profiled_rerun, span, start_metrics_server, timed
+from price_cache import get_price_cache
+from price_stream import PRICE_STREAM_PUBLIC_URL, get_price_stream
+from score_cache import get_score_cache
+
 # Configure page
 st.set_page_config(
     page_title="Crypto AI Analyzer",
@@ -17,48 +32,28 @@ if 'projects' not in st.session_state:
     st.session_state.projects = []
 if 'search_query' not in st.session_state:
     st.session_state.search_query = ""
-if 'is_analyzing' not in st.session_state:
-    st.session_state.is_analyzing = False
+if 'pending_jobs' not in st.session_state:
+    st.session_state.pending_jobs = []
+if 'batch_results' not in st.session_state:
+    st.session_state.batch_results = None
+if 'batch_job' not in st.session_state:
+    st.session_state.batch_job = None
 if 'selected_project' not in st.session_state:
     st.session_state.selected_project = None
-if 'crypto_prices' not in st.session_state:
-    st.session_state.crypto_prices = {}
-if 'initialized' not in st.session_state:
-    st.session_state.initialized = False
+if 'history_loaded' not in st.session_state:
+    st.session_state.history_loaded = False
+if 'history_cursor' not in st.session_state:
+    st.session_state.history_cursor = None
+if 'history_filters' not in st.session_state:
+    st.session_state.history_filters = {"symbol": "", "recommendation": "", "last_24h": False}
+if 'results_page' not in st.session_state:
+    st.session_state.results_page = 0
+if 'render_cache' not in st.session_state:
+    st.session_state.render_cache = {}
 
-# Crypto database
-CRYPTO_DATABASE = [
-    {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"},
-    {"name": "Ethereum", "symbol": "ETH", "id": "ethereum"},
-    {"name": "Solana", "symbol": "SOL", "id": "solana"},
-    {"name": "Cardano", "symbol": "ADA", "id": "cardano"},
-    {"name": "Ripple", "symbol": "XRP", "id": "ripple"},
-    {"name": "Polkadot", "symbol": "DOT", "id": "polkadot"},
-    {"name": "Avalanche", "symbol": "AVAX", "id": "avalanche-2"},
-    {"name": "Polygon", "symbol": "MATIC", "id": "matic-network"},
-    {"name": "Chainlink", "symbol": "LINK", "id": "chainlink"},
-    {"name": "Uniswap", "symbol": "UNI", "id": "uniswap"},
-    {"name": "Litecoin", "symbol": "LTC", "id": "litecoin"},
-    {"name": "Cosmos", "symbol": "ATOM", "id": "cosmos"},
-    {"name": "Algorand", "symbol": "ALGO", "id": "algorand"},
-    {"name": "VeChain", "symbol": "VET", "id": "vechain"},
-    {"name": "Hedera", "symbol": "HBAR", "id": "hedera-hashgraph"},
-    {"name": "Internet Computer", "symbol": "ICP", "id": "internet-computer"},
-    {"name": "Filecoin", "symbol": "FIL", "id": "filecoin"},
-    {"name": "Arbitrum", "symbol": "ARB", "id": "arbitrum"},
-    {"name": "Optimism", "symbol": "OP", "id": "optimism"},
-    {"name": "Aptos", "symbol": "APT", "id": "aptos"},
-    {"name": "Sui", "symbol": "SUI", "id": "sui"},
-    {"name": "Stellar", "symbol": "XLM", "id": "stellar"},
-    {"name": "The Graph", "symbol": "GRT", "id": "the-graph"},
-    {"name": "Sandbox", "symbol": "SAND", "id": "the-sandbox"},
-    {"name": "Decentraland", "symbol": "MANA", "id": "decentraland"},
-    {"name": "Aave", "symbol": "AAVE", "id": "aave"},
-    {"name": "Maker", "symbol": "MKR", "id": "maker"},
-    {"name": "Injective", "symbol": "INJ", "id": "injective-protocol"},
-    {"name": "Near Protocol", "symbol": "NEAR", "id": "near"},
-    {"name": "Fantom", "symbol": "FTM", "id": "fantom"}
-]
+# Analysis Results paging and per-project view cache size
+RESULTS_PAGE_SIZE = 10
+RENDER_CACHE_SIZE = 200
 
 PHASES = [
     {"id": 1, "name": "Pre-Screening", "icon": "🔒", "color": "blue"},
@@ -68,16 +63,80 @@ PHASES = [
     {"id": 5, "name": "Portfolio", "icon": "💼", "color": "indigo"}
 ]
 
+@timed("fetch_crypto_prices")
 def fetch_crypto_prices():
-    """Fetch current crypto prices from CoinGecko"""
-    try:
-        ids = ",".join([c["id"] for c in CRYPTO_DATABASE])
-        url = f"https://api.coingecko.com/api/v3/simple/price?ids={ids}&vs_currencies=usd&include_24hr_change=true"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            st.session_state.crypto_prices = response.json()
-    except Exception as e:
-        st.error(f"Error fetching prices: {e}")
+    """Get current crypto prices from the shared process-wide cache"""
+    cache = get_price_cache([c["id"] for c in CRYPTO_DATABASE])
+    prices = cache.get()
+    if cache.last_error is not None and not cache.is_fresh():
+        st.error(f"Error fetching prices: {cache.last_error}")
+    # Streamed ticks are newer than the last cache refresh
+    live = get_price_stream(cache).table.snapshot()
+    return {**prices, **live} if live else prices
+
+def render_live_ticker():
+    """Embed a ticker strip that receives changed prices over SSE, without reruns"""
+    stream = get_price_stream(get_price_cache([c["id"] for c in CRYPTO_DATABASE]))
+    if stream.port is None:
+        return
+    # The markup never changes between reruns, so Streamlit keeps the same
+    # iframe and its open connection; prices arrive only through the stream
+    coins = json.dumps([{"id": c["id"], "symbol": c["symbol"]} for c in CRYPTO_DATABASE])
+    components.html(f"""
+    <style>
+    body {{ margin: 0; font-family: sans-serif; }}
+    .ticker {{ display: flex; gap: 8px; overflow-x: auto; white-space: nowrap; padding: 4px 0; }}
+    .chip {{ background: rgba(255,255,255,0.06); border: 1px solid rgba(255,255,255,0.1); border-radius: 8px;
+             padding: 6px 10px; color: #E5E7EB; font-size: 13px; transition: background 0.6s; }}
+    .chip b {{ color: white; margin-right: 6px; }}
+    .up {{ color: #34D399; }} .down {{ color: #F87171; }}
+    .flash-up {{ background: rgba(52,211,153,0.25); }} .flash-down {{ background: rgba(248,113,113,0.25); }}
+    </style>
+    <div class="ticker" id="ticker"></div>
+    <script>
+    const coins = {coins};
+    const ticker = document.getElementById("ticker");
+    const chips = {{}};
+    for (const c of coins) {{
+        const chip = document.createElement("span");
+        chip.className = "chip";
+        chip.innerHTML = `<b>${{c.symbol}}</b><span class="price">N/A</span> <span class="change"></span>`;
+        ticker.appendChild(chip);
+        chips[c.id] = {{el: chip, price: null}};
+    }}
+    function formatPrice(p) {{
+        if (!p) return "N/A";
+        if (p < 0.01) return "$" + p.toFixed(6);
+        if (p < 1) return "$" + p.toFixed(4);
+        return "$" + p.toLocaleString("en-US", {{minimumFractionDigits: 2, maximumFractionDigits: 2}});
+    }}
+    let base = {json.dumps(PRICE_STREAM_PUBLIC_URL)};
+    if (!base) {{
+        let loc = window.location;
+        try {{ loc = window.parent.location; }} catch (e) {{}}
+        base = `${{loc.protocol}}//${{loc.hostname || "localhost"}}:{stream.port}`;
+    }}
+    const source = new EventSource(`${{base}}/stream?ids=${{coins.map(c => c.id).join(",")}}`);
+    source.onmessage = (event) => {{
+        const changes = JSON.parse(event.data);
+        for (const [id, data] of Object.entries(changes)) {{
+            const chip = chips[id];
+            if (!chip) continue;
+            const change = data.usd_24h_change || 0;
+            chip.el.querySelector(".price").textContent = formatPrice(data.usd);
+            const changeEl = chip.el.querySelector(".change");
+            changeEl.textContent = `${{change >= 0 ? "+" : ""}}${{change.toFixed(2)}}%`;
+            changeEl.className = "change " + (change >= 0 ? "up" : "down");
+            if (chip.price !== null && data.usd !== chip.price) {{
+                const cls = data.usd > chip.price ? "flash-up" : "flash-down";
+                chip.el.classList.add(cls);
+                setTimeout(() => chip.el.classList.remove(cls), 600);
+            }}
+            chip.price = data.usd;
+        }}
+    }};
+    </script>
+    """, height=48)
 
 def format_price(price):
     """Format price nicely"""
@@ -95,15 +154,6 @@ def format_price_change(change):
         return "0.00"
     return f"{change:.2f}"
 
-def calculate_tokenomics_score(tokenomics):
-    """Calculate tokenomics score"""
-    return sum(tokenomics.values())
-
-def calculate_market_score(metrics):
-    """Calculate market health score"""
-    bullish = sum(1 for v in metrics.values() if v == "bullish")
-    return round((bullish / len(metrics)) * 100)
-
 def get_status_icon(status):
     """Get status emoji"""
     if status == "bullish":
@@ -112,168 +162,284 @@ def get_status_icon(status):
         return "📉"
     return "➖"
 
+@timed("analysis_job")
+def run_analysis_job(selected_crypto, price_data):
+    """Worker job: analyze a crypto and record it in the shared history"""
+    return run_analyses([selected_crypto], {selected_crypto["id"]: price_data})[0]
+
+@timed("batch_job")
+def run_batch_job(prices):
+    """Worker job: rank every crypto in the database"""
+    # Same candle timing and signals as a single analysis, so the verdicts match
+    timings, signals = gather_inputs(CRYPTO_DATABASE)
+    return analyze_all(CRYPTO_DATABASE, prices, timings=timings, signals=signals)
+
+def load_history_page(reset=False):
+    """Load the next page of stored analyses into this session"""
+    if reset:
+        st.session_state.projects = []
+        st.session_state.history_cursor = None
+    filters = st.session_state.history_filters
+    page, cursor = get_history_store().query(
+        symbol=filters["symbol"].strip() or None,
+        recommendation=filters["recommendation"] or None,
+        since=time.time() - 86400 if filters["last_24h"] else None,
+        before=st.session_state.history_cursor,
+        limit=PAGE_SIZE
+    )
+    # Sessions keep compact records; full dicts are only rebuilt for viewing
+    st.session_state.projects.extend(AnalysisRecord.from_dict(analysis) for analysis in page)
+    st.session_state.history_cursor = cursor
+    if reset:
+        st.session_state.results_page = 0
+        st.session_state.selected_project = None
+    st.session_state.history_loaded = True
+
+@timed("analyze_project")
 def analyze_project(crypto_data=None):
-    """Analyze a crypto project"""
+    """Queue a crypto project for analysis"""
     # Find crypto from search or selection
-    crypto = None
-    if crypto_data:
-        crypto = crypto_data
-    else:
-        search_lower = st.session_state.search_query.lower().strip()
-        for c in CRYPTO_DATABASE:
-            if c["name"].lower() == search_lower or c["symbol"].lower() == search_lower:
-                crypto = c
-                break
+    crypto = crypto_data or find_crypto(st.session_state.search_query)
     
     if not crypto and not st.session_state.search_query.strip():
         return
     
-    st.session_state.is_analyzing = True
+    selected_crypto = crypto or resolve_crypto(st.session_state.search_query)
+    price_data = fetch_crypto_prices().get(selected_crypto["id"], {"usd": 0, "usd_24h_change": 0})
     
-    # Show loading
-    with st.spinner(f"Analyzing {st.session_state.search_query or crypto['name']}... Running 5-phase analysis"):
-        time.sleep(3)  # Simulate analysis time
-        
-        selected_crypto = crypto or {
-            "name": st.session_state.search_query,
-            "symbol": st.session_state.search_query[:4].upper(),
-            "id": "unknown"
-        }
-        price_data = st.session_state.crypto_prices.get(selected_crypto["id"], {"usd": 0, "usd_24h_change": 0})
-        
-        # Generate analysis
-        analysis = {
-            "id": int(time.time() * 1000),
-            "name": selected_crypto["name"],
-            "symbol": selected_crypto["symbol"],
-            "crypto_id": selected_crypto["id"],
-            "current_price": price_data.get("usd", 0),
-            "price_change_24h": price_data.get("usd_24h_change", 0),
-            "timestamp": datetime.now().isoformat(),
-            
-            # Phase 1: Pre-Screening
-            "phase1": {
-                "market_cap": "Mid Cap" if random.random() > 0.3 else "Small Cap",
-                "market_cap_value": f"${random.randint(100, 600)}M",
-                "exchanges": "Binance, Coinbase, Kraken" if random.random() > 0.2 else "Binance, KuCoin",
-                "active_months": random.randint(6, 30),
-                "daily_volume": f"${random.randint(5, 55)}M",
-                "has_product": random.random() > 0.3,
-                "checks": {
-                    "exchanges": random.random() > 0.2,
-                    "active6months": True,
-                    "volume": random.random() > 0.3,
-                    "no_breach": random.random() > 0.4,
-                    "has_mainnet": random.random() > 0.3,
-                    "active_community": random.random() > 0.4,
-                    "documentation": random.random() > 0.3
-                }
-            },
+    job_id = get_job_pool().submit(run_analysis_job, selected_crypto, price_data)
+    if job_id is None:
+        st.warning("Analysis queue is full, please try again in a moment")
+        return
+    
+    st.session_state.pending_jobs.append({"job_id": job_id, "name": selected_crypto["name"]})
+    st.session_state.search_query = ""
+    
+    # Trigger rerun to update UI
+    st.rerun()
+
+def collect_finished_jobs():
+    """Move finished analyses from the job pool into this session's results"""
+    pool = get_job_pool()
+    still_pending = []
+    for pending in st.session_state.pending_jobs:
+        job = pool.pop(pending["job_id"])
+        if job is None:
+            if pool.status(pending["job_id"]) is not None:
+                still_pending.append(pending)
+            continue
+        if job["status"] == "failed":
+            st.error(f"Analysis of {pending['name']} failed: {job['error']}")
+            continue
+        project = AnalysisRecord.from_dict(job["result"])
+        st.session_state.projects.insert(0, project)
+        st.session_state.selected_project = project
+        st.session_state.results_page = 0
+    st.session_state.pending_jobs = still_pending
+    
+    if st.session_state.batch_job is not None:
+        job = pool.pop(st.session_state.batch_job)
+        if job is None:
+            if pool.status(st.session_state.batch_job) is None:
+                st.session_state.batch_job = None
+            return
+        st.session_state.batch_job = None
+        if job["status"] == "failed":
+            st.error(f"Analyze All failed: {job['error']}")
+            return
+        st.session_state.batch_results = job["result"]
+
+def analyze_all_projects():
+    """Queue a ranked screening of the whole database"""
+    job_id = get_job_pool().submit(run_batch_job, fetch_crypto_prices())
+    if job_id is None:
+        st.warning("Analysis queue is full, please try again in a moment")
+        return
+    st.session_state.batch_job = job_id
+
+def project_key(project):
+    """Stable cache key for a stored analysis"""
+    return f"{project.symbol}:{project.id}:{project.created_us}"
+
+def build_project_view(project):
+    """Precompute the header HTML and phase block contents for a project"""
+    analysis = project.to_dict()
+    return {
+        "analysis": analysis,
+        "header_html": f"""
+        <div style="background: linear-gradient(90deg, rgba(59,130,246,0.2), rgba(147,51,234,0.2), rgba(236,72,153,0.2)); 
+                    backdrop-filter: blur(20px); border: 1px solid rgba(255,255,255,0.1); 
+                    border-radius: 16px; padding: 24px;">
+            <h2 style="color: white; font-size: 32px; margin: 0;">{project.name}</h2>
+            <p style="color: #9CA3AF; font-size: 20px;">{project.symbol}</p>
+        </div>
+        """,
+        "price": format_price(project.current_price),
+        "price_change": f"{format_price_change(project.price_change_24h)}%",
+        "tokenomics_score": f"{project.tokenomics_score}/25",
+        "market_score": f"{project.market_score}%",
+        "checks": [
+            (check.replace('_', ' ').title(), passed)
+            for check, passed in analysis['phase1']['checks'].items()
+        ],
+        "tokenomics": [
+            (value / 5.0, f"{key.title()}: {value}/5")
+            for key, value in analysis['phase2']['tokenomics'].items()
+        ],
+        "team": [
+            (key.replace('_', ' ').title(), value)
+            for key, value in analysis['phase2']['team'].items()
+        ],
+        "metrics": [
+            (f"{get_status_icon(value)} {key.replace('_', ' ').title()}: {value}", value == "bullish")
+            for key, value in analysis['phase3']['metrics'].items()
+        ]
+    }
+
+def get_project_view(project):
+    """Return the cached view of a project, building it on first render"""
+    cache = st.session_state.render_cache
+    key = project_key(project)
+    view = cache.pop(key, None)
+    if view is None:
+        view = build_project_view(project)
+    # Re-insert so the dict stays ordered from least to most recently used
+    cache[key] = view
+    while len(cache) > RENDER_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    return view
+
+def render_project_list():
+    """Render one page of project summaries with buttons to select one"""
+    projects = st.session_state.projects
+    page_count = max(1, -(-len(projects) // RESULTS_PAGE_SIZE))
+    page = min(st.session_state.results_page, page_count - 1)
+    selected = st.session_state.selected_project
+    selected_key = project_key(selected) if selected is not None else None
+    
+    for project in projects[page * RESULTS_PAGE_SIZE:(page + 1) * RESULTS_PAGE_SIZE]:
+        key = project_key(project)
+        col1, col2, col3 = st.columns([3, 4, 1])
+        marker = "▶ " if key == selected_key else ""
+        col1.markdown(f"{marker}**{project.name}** ({project.symbol})")
+        col2.caption(f"{project.recommendation} • {project.timestamp[:16].replace('T', ' ')}")
+        if col3.button("View", key=f"view_{key}", use_container_width=True):
+            st.session_state.selected_project = project
+            st.rerun()
+    
+    has_older = page < page_count - 1 or st.session_state.history_cursor is not None
+    col1, col2, col3 = st.columns([1, 2, 1])
+    if col1.button("◀ Newer", key="results_newer", disabled=page == 0):
+        st.session_state.results_page = page - 1
+        st.rerun()
+    col2.caption(f"Page {page + 1} of {page_count}{'+' if st.session_state.history_cursor is not None else ''}")
+    if col3.button("Older ▶", key="results_older", disabled=not has_older):
+        # Older analyses are only fetched from the store on request
+        if page == page_count - 1:
+            load_history_page()
+        st.session_state.results_page = page + 1
+        st.rerun()
+
+def render_project_detail(project):
+    """Render the full 5-phase breakdown for one project"""
+    view = get_project_view(project)
+    project = view["analysis"]
+    
+    # Project Header
+    st.markdown(view["header_html"], unsafe_allow_html=True)
+    
+    # Price Display
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Current Price", view["price"], view["price_change"])
+    with col2:
+        # Recommendation
+        color = project["phase5"]["recommendation_color"]
+        if color == "green":
+            st.success(project["phase5"]["recommendation"])
+        elif color == "yellow":
+            st.warning(project["phase5"]["recommendation"])
+        else:
+            st.error(project["phase5"]["recommendation"])
+    
+    # Quick Stats
+    st.markdown("---")
+    st.subheader("Quick Stats")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Tokenomics Score", view["tokenomics_score"])
+    col2.metric("Market Health", view["market_score"])
+    col3.metric("Confidence", project["phase5"]["confidence"])
+    col4.metric("Allocation", project["phase5"]["allocation"])
+    
+    # Phases Analysis
+    st.markdown("---")
+    st.subheader("5-Phase Analysis")
+    if project.get("missing_signals"):
+        st.caption(f"⚠️ Not collected, simulated instead: {', '.join(project['missing_signals'])}")
+    
+    for phase in PHASES:
+        with st.expander(f"{phase['icon']} Phase {phase['id']}: {phase['name']}", expanded=True):
+            if phase['id'] == 1:
+                col1, col2 = st.columns(2)
+                col1.metric("Market Cap", project['phase1']['market_cap_value'])
+                col2.metric("Daily Volume", project['phase1']['daily_volume'])
+                
+                st.markdown("**Checks:**")
+                for label, passed in view["checks"]:
+                    if passed:
+                        st.success(f"✅ {label}")
+                    else:
+                        st.error(f"❌ {label}")
             
-            # Phase 2: Fundamentals
-            "phase2": {
-                "tokenomics": {
-                    "supply": random.randint(3, 5),
-                    "distribution": random.randint(3, 5),
-                    "utility": random.randint(3, 5),
-                    "value_accrual": random.randint(3, 5),
-                    "vesting": random.randint(3, 5)
-                },
-                "team": {
-                    "identifiable": random.random() > 0.3,
-                    "experience": random.random() > 0.4,
-                    "communication": random.random() > 0.3,
-                    "audited": random.random() > 0.4,
-                    "github_active": random.random() > 0.3,
-                    "open_source": random.random() > 0.5
-                }
-            },
+            elif phase['id'] == 2:
+                st.markdown("**Tokenomics:**")
+                for value, text in view["tokenomics"]:
+                    st.progress(value, text=text)
+                
+                st.markdown("**Team:**")
+                for label, value in view["team"]:
+                    if value:
+                        st.success(f"✅ {label}")
+                    else:
+                        st.error(f"❌ {label}")
             
-            # Phase 3: On-Chain
-            "phase3": {
-                "metrics": {
-                    "active_addresses": "bullish" if random.random() > 0.5 else "bearish",
-                    "tx_volume": "bullish" if random.random() > 0.5 else "bearish",
-                    "tvl": "bullish" if random.random() > 0.5 else "bearish",
-                    "dev_activity": "bullish" if random.random() > 0.5 else "bearish",
-                    "nvt_ratio": "bullish" if random.random() > 0.5 else "bearish",
-                    "token_velocity": "bullish" if random.random() > 0.5 else "bearish",
-                    "whale_activity": "bullish" if random.random() > 0.5 else "bearish"
-                },
-                "competitive_advantage": random.random() > 0.4
-            },
+            elif phase['id'] == 3:
+                st.markdown("**On-Chain Metrics:**")
+                for text, bullish in view["metrics"]:
+                    if bullish:
+                        st.success(text)
+                    else:
+                        st.error(text)
             
-            # Phase 4: Timing
-            "phase4": {
-                "rsi": random.randint(30, 70),
-                "trend": ["Uptrend", "Sideways", "Downtrend"][random.randint(0, 2)],
-                "fear_greed": random.randint(20, 80),
-                "macd": "Bullish" if random.random() > 0.5 else "Bearish",
-                "volume": "Above Average" if random.random() > 0.4 else "Below Average"
-            },
+            elif phase['id'] == 4:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("RSI", project['phase4']['rsi'])
+                col2.metric("Trend", project['phase4']['trend'])
+                col3.metric("MACD", project['phase4']['macd'])
+                
+                col4, col5 = st.columns(2)
+                col4.metric("Fear & Greed", project['phase4']['fear_greed'])
+                col5.metric("Volume", project['phase4']['volume'])
             
-            # Phase 5: Portfolio
-            "phase5": {
-                "confidence": "calculating...",
-                "allocation": "calculating...",
-                "recommendation": "calculating..."
-            }
-        }
-        
-        # Calculate overall confidence
-        phase1_pass = sum(1 for v in analysis["phase1"]["checks"].values() if v)
-        tokenomics_score = sum(analysis["phase2"]["tokenomics"].values())
-        market_bullish = sum(1 for v in analysis["phase3"]["metrics"].values() if v == "bullish")
-        
-        confidence = "Low"
-        allocation = "0.25-0.5%"
-        recommendation = "HIGH RISK - Not Recommended"
-        recommendation_color = "red"
-        
-        if phase1_pass >= 6 and tokenomics_score >= 23 and market_bullish >= 5 and analysis["phase4"]["rsi"] < 60:
-            confidence = "Very High"
-            allocation = "5-10%"
-            recommendation = "STRONG BUY - Core Holding"
-            recommendation_color = "green"
-        elif phase1_pass >= 5 and tokenomics_score >= 18 and market_bullish >= 4:
-            confidence = "High"
-            allocation = "2-5%"
-            recommendation = "BUY - Satellite Position"
-            recommendation_color = "green"
-        elif phase1_pass >= 4 and tokenomics_score >= 15 and market_bullish >= 3:
-            confidence = "Medium"
-            allocation = "1-2%"
-            recommendation = "SPECULATIVE - Small Position"
-            recommendation_color = "yellow"
-        
-        analysis["phase5"]["confidence"] = confidence
-        analysis["phase5"]["allocation"] = allocation
-        analysis["phase5"]["recommendation"] = recommendation
-        analysis["phase5"]["recommendation_color"] = recommendation_color
-        
-        # Update state
-        st.session_state.projects.insert(0, analysis)
-        st.session_state.selected_project = analysis
-        st.session_state.is_analyzing = False
-        st.session_state.search_query = ""
-        
-        # Trigger rerun to update UI
-        st.rerun()
+            elif phase['id'] == 5:
+                st.info(f"**Confidence:** {project['phase5']['confidence']}")
+                st.info(f"**Allocation:** {project['phase5']['allocation']}")
+                st.info(f"**Recommendation:** {project['phase5']['recommendation']}")
 
+@profiled_rerun()
 def main():
     """Main application"""
-    # Initialize on first load
-    if not st.session_state.initialized:
-        fetch_crypto_prices()
-        st.session_state.initialized = True
+    start_metrics_server()
     
-    # Auto-refresh prices every minute
-    if 'last_refresh' not in st.session_state:
-        st.session_state.last_refresh = time.time()
+    # Prices are refreshed in the background by the shared cache
+    fetch_crypto_prices()
     
-    if time.time() - st.session_state.last_refresh > 60:
-        fetch_crypto_prices()
-        st.session_state.last_refresh = time.time()
+    # First page of stored history is loaded once per session
+    if not st.session_state.history_loaded:
+        load_history_page()
+    
+    # Pick up analyses finished since the last rerun
+    collect_finished_jobs()
     
     # Header
     st.markdown("""
@@ -292,12 +458,15 @@ def main():
             st.markdown('<h1 class="title">Crypto AI Analyzer</h1>', unsafe_allow_html=True)
             st.markdown('<p class="subtitle">Powered by 5-Phase Framework • Live Prices</p>', unsafe_allow_html=True)
     
+    # Live prices
+    render_live_ticker()
+    
     st.markdown("---")
     
     # Search Section
     search_col1, search_col2 = st.columns([4, 1])
     
-    with search_col1:
+    with search_col1, span("search"):
         # Create a text input for search
         search_key = "search_input"
         st.session_state.search_query = st.text_input(
@@ -309,137 +478,106 @@ def main():
         
         # Show suggestions dropdown
         if st.session_state.search_query:
-            filtered = [
-                c for c in CRYPTO_DATABASE 
-                if st.session_state.search_query.lower() in c["name"].lower() or 
-                   st.session_state.search_query.lower() in c["symbol"].lower()
-            ]
+            filtered = suggest_cryptos(st.session_state.search_query)
             if filtered:
-                # Create a selectbox for suggestions
-                suggestion_names = [f"{c['name']} ({c['symbol']})" for c in filtered[:10]]
-                selected_suggestion = st.selectbox(
+                # Create a selectbox for suggestions; options are indexes so
+                # duplicate tickers stay distinguishable
+                suggestion_names = [f"{c['name']} ({c['symbol']})" for c in filtered]
+                selected_idx = st.selectbox(
                     "Suggestions",
-                    options=[""] + suggestion_names,
-                    format_func=lambda x: "Select from suggestions..." if x == "" else x,
+                    options=[-1] + list(range(len(filtered))),
+                    format_func=lambda i: "Select from suggestions..." if i < 0 else suggestion_names[i],
                     label_visibility="collapsed"
                 )
                 
-                if selected_suggestion:
-                    selected_name = selected_suggestion.split(" (")[0]
-                    selected_crypto = next(c for c in filtered if c["name"] == selected_name)
+                if selected_idx >= 0:
+                    selected_crypto = filtered[selected_idx]
                     if st.button("Select", key="select_suggestion"):
                         analyze_project(selected_crypto)
     
     with search_col2:
-        analyze_disabled = st.session_state.is_analyzing or not st.session_state.search_query.strip()
+        analyze_disabled = not st.session_state.search_query.strip()
         if st.button("🔍 Analyze", disabled=analyze_disabled, use_container_width=True):
             analyze_project()
     
+    # Batch screening of the whole database
+    # A callback runs once per click, so polling reruns never queue it again
+    st.button("📋 Analyze All", key="analyze_all", on_click=analyze_all_projects,
+              disabled=st.session_state.batch_job is not None)
+    
+    if st.session_state.batch_job is not None:
+        st.info(f"⏳ Screening all {len(CRYPTO_DATABASE)} coins...")
+    
+    if st.session_state.batch_results is not None:
+        with st.expander("📋 Ranked Screening Results", expanded=True):
+            table = st.session_state.batch_results
+            st.dataframe({
+                "Name": table["name"],
+                "Symbol": table["symbol"],
+                "Price": table["price"],
+                "24h %": table["change_24h"],
+                "Confidence": table["confidence"],
+                "Allocation": table["allocation"],
+                "Recommendation": table["recommendation"],
+                "Checks": table["phase1_pass"],
+                "Tokenomics": table["tokenomics_score"],
+                "Market Health %": table["market_score"],
+                "RSI": table["rsi"]
+            }, use_container_width=True, hide_index=True)
+    
+    # Analyses still running in the worker pool
+    for pending in st.session_state.pending_jobs:
+        st.info(f"⏳ Analyzing {pending['name']}... Running 5-phase analysis")
+    
+    # Pipeline metrics
+    with st.sidebar:
+        st.subheader("Analysis Pipeline")
+        metrics = get_job_pool().metrics()
+        st.metric("Workers", metrics["workers"])
+        st.metric("Queue Depth", metrics["queue_depth"])
+        st.metric("Running", metrics["running"])
+        st.metric("Job Latency (p50)", f"{metrics['latency_p50'] * 1000:.0f} ms")
+        st.metric("Job Latency (p95)", f"{metrics['latency_p95'] * 1000:.0f} ms")
+        cache_stats = get_score_cache().stats()
+        st.metric("Score Cache Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+        st.caption(f"{cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['size']} cached")
+        rerun = get_metrics().snapshot()["spans"].get("rerun")
+        if rerun:
+            st.caption(f"Rerun p50 {rerun['p50'] * 1000:.0f} ms • p99 {rerun['p99'] * 1000:.0f} ms over {rerun['count']} reruns")
+    
+    # History filters
+    with st.expander("🗂️ History"):
+        col1, col2, col3 = st.columns([2, 3, 1])
+        symbol = col1.text_input("Symbol", key="history_symbol")
+        recommendation = col2.selectbox(
+            "Recommendation",
+            options=["All recommendations"] + [t["recommendation"] for t in reversed(CONFIDENCE_TIERS)],
+            key="history_recommendation"
+        )
+        last_24h = col3.checkbox("Last 24h", key="history_last_24h")
+        filters = {
+            "symbol": symbol,
+            "recommendation": "" if recommendation == "All recommendations" else recommendation,
+            "last_24h": last_24h
+        }
+        if filters != st.session_state.history_filters:
+            st.session_state.history_filters = filters
+            load_history_page(reset=True)
+    
     # Display Projects
     if st.session_state.projects:
         st.markdown("---")
         st.subheader("📊 Analysis Results")
         
-        # Create tabs for each project
-        project_names = [f"{p['name']} ({p['symbol']})" for p in st.session_state.projects]
-        tabs = st.tabs(project_names)
+        if st.session_state.selected_project is None:
+            st.session_state.selected_project = st.session_state.projects[0]
         
-        for idx, project in enumerate(st.session_state.projects):
-            with tabs[idx]:
-                # Project Header
-                st.markdown(f"""
-                <div style="background: linear-gradient(90deg, rgba(59,130,246,0.2), rgba(147,51,234,0.2), rgba(236,72,153,0.2)); 
-                            backdrop-filter: blur(20px); border: 1px solid rgba(255,255,255,0.1); 
-                            border-radius: 16px; padding: 24px;">
-                    <h2 style="color: white; font-size: 32px; margin: 0;">{project['name']}</h2>
-                    <p style="color: #9CA3AF; font-size: 20px;">{project['symbol']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Price Display
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric(
-                        "Current Price",
-                        format_price(project["current_price"]),
-                        f"{format_price_change(project['price_change_24h'])}%"
-                    )
-                with col2:
-                    # Recommendation
-                    color = project["phase5"]["recommendation_color"]
-                    if color == "green":
-                        st.success(project["phase5"]["recommendation"])
-                    elif color == "yellow":
-                        st.warning(project["phase5"]["recommendation"])
-                    else:
-                        st.error(project["phase5"]["recommendation"])
-                
-                # Quick Stats
-                st.markdown("---")
-                st.subheader("Quick Stats")
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric("Tokenomics Score", f"{calculate_tokenomics_score(project['phase2']['tokenomics'])}/25")
-                col2.metric("Market Health", f"{calculate_market_score(project['phase3']['metrics'])}%")
-                col3.metric("Confidence", project["phase5"]["confidence"])
-                col4.metric("Allocation", project["phase5"]["allocation"])
-                
-                # Phases Analysis
-                st.markdown("---")
-                st.subheader("5-Phase Analysis")
-                
-                for phase in PHASES:
-                    with st.expander(f"{phase['icon']} Phase {phase['id']}: {phase['name']}", expanded=True):
-                        if phase['id'] == 1:
-                            col1, col2 = st.columns(2)
-                            col1.metric("Market Cap", project['phase1']['market_cap_value'])
-                            col2.metric("Daily Volume", project['phase1']['daily_volume'])
-                            
-                            st.markdown("**Checks:**")
-                            checks = project['phase1']['checks']
-                            for check, passed in checks.items():
-                                if passed:
-                                    st.success(f"✅ {check.replace('_', ' ').title()}")
-                                else:
-                                    st.error(f"❌ {check.replace('_', ' ').title()}")
-                        
-                        elif phase['id'] == 2:
-                            st.markdown("**Tokenomics:**")
-                            tokenomics = project['phase2']['tokenomics']
-                            for key, value in tokenomics.items():
-                                st.progress(value / 5.0, text=f"{key.title()}: {value}/5")
-                            
-                            st.markdown("**Team:**")
-                            team = project['phase2']['team']
-                            for key, value in team.items():
-                                if value:
-                                    st.success(f"✅ {key.replace('_', ' ').title()}")
-                                else:
-                                    st.error(f"❌ {key.replace('_', ' ').title()}")
-                        
-                        elif phase['id'] == 3:
-                            st.markdown("**On-Chain Metrics:**")
-                            metrics = project['phase3']['metrics']
-                            for key, value in metrics.items():
-                                icon = get_status_icon(value)
-                                if value == "bullish":
-                                    st.success(f"{icon} {key.replace('_', ' ').title()}: {value}")
-                                else:
-                                    st.error(f"{icon} {key.replace('_', ' ').title()}: {value}")
-                        
-                        elif phase['id'] == 4:
-                            col1, col2, col3 = st.columns(3)
-                            col1.metric("RSI", project['phase4']['rsi'])
-                            col2.metric("Trend", project['phase4']['trend'])
-                            col3.metric("MACD", project['phase4']['macd'])
-                            
-                            col4, col5 = st.columns(2)
-                            col4.metric("Fear & Greed", project['phase4']['fear_greed'])
-                            col5.metric("Volume", project['phase4']['volume'])
-                        
-                        elif phase['id'] == 5:
-                            st.info(f"**Confidence:** {project['phase5']['confidence']}")
-                            st.info(f"**Allocation:** {project['phase5']['allocation']}")
-                            st.info(f"**Recommendation:** {project['phase5']['recommendation']}")
+        with span("render_projects"):
+            render_project_list()
+            
+            # Only the selected project's detail is rendered
+            st.markdown("---")
+            render_project_detail(st.session_state.selected_project)
     
     else:
         # Welcome message
@@ -451,4 +589,10 @@ def main():
         """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    
+    # Poll the worker pool until pending analyses finish; kept out of main()
+    # so the wait does not count towards rerun latency
+    if st.session_state.pending_jobs or st.session_state.batch_job is not None:
+        time.sleep(0.5)
+        st.rerun()
\ No newline at end of file
@@ -0,0 +1,356 @@
+"""Headless 5-phase scoring engine shared by the dashboard, batch tools and CLI
+
+Run as a script to stream analyses as JSON lines:
+
+    python engine.py BTC ETH Solana
+    echo "BTC" | python engine.py --no-prices
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+
+from signals import apply_signals
+from score_cache import get_score_cache
+from search_index import SearchIndex
+
+# Bump whenever a change to build_analysis() alters results for the same
+# inputs, so memoized and stored analyses from older rules are not reused
+SCORING_VERSION = 2
+SCORING_SEED = int(os.environ.get("SCORING_SEED", 0))
+# Price data for assets the price map has no quote for
+NO_PRICE = {"usd": 0, "usd_24h_change": 0}
+
+# Crypto database
+CRYPTO_DATABASE = [
+    {"name": "Bitcoin", "symbol": "BTC", "id": "bitcoin"},
+    {"name": "Ethereum", "symbol": "ETH", "id": "ethereum"},
+    {"name": "Solana", "symbol": "SOL", "id": "solana"},
+    {"name": "Cardano", "symbol": "ADA", "id": "cardano"},
+    {"name": "Ripple", "symbol": "XRP", "id": "ripple"},
+    {"name": "Polkadot", "symbol": "DOT", "id": "polkadot"},
+    {"name": "Avalanche", "symbol": "AVAX", "id": "avalanche-2"},
+    {"name": "Polygon", "symbol": "MATIC", "id": "matic-network"},
+    {"name": "Chainlink", "symbol": "LINK", "id": "chainlink"},
+    {"name": "Uniswap", "symbol": "UNI", "id": "uniswap"},
+    {"name": "Litecoin", "symbol": "LTC", "id": "litecoin"},
+    {"name": "Cosmos", "symbol": "ATOM", "id": "cosmos"},
+    {"name": "Algorand", "symbol": "ALGO", "id": "algorand"},
+    {"name": "VeChain", "symbol": "VET", "id": "vechain"},
+    {"name": "Hedera", "symbol": "HBAR", "id": "hedera-hashgraph"},
+    {"name": "Internet Computer", "symbol": "ICP", "id": "internet-computer"},
+    {"name": "Filecoin", "symbol": "FIL", "id": "filecoin"},
+    {"name": "Arbitrum", "symbol": "ARB", "id": "arbitrum"},
+    {"name": "Optimism", "symbol": "OP", "id": "optimism"},
+    {"name": "Aptos", "symbol": "APT", "id": "aptos"},
+    {"name": "Sui", "symbol": "SUI", "id": "sui"},
+    {"name": "Stellar", "symbol": "XLM", "id": "stellar"},
+    {"name": "The Graph", "symbol": "GRT", "id": "the-graph"},
+    {"name": "Sandbox", "symbol": "SAND", "id": "the-sandbox"},
+    {"name": "Decentraland", "symbol": "MANA", "id": "decentraland"},
+    {"name": "Aave", "symbol": "AAVE", "id": "aave"},
+    {"name": "Maker", "symbol": "MKR", "id": "maker"},
+    {"name": "Injective", "symbol": "INJ", "id": "injective-protocol"},
+    {"name": "Near Protocol", "symbol": "NEAR", "id": "near"},
+    {"name": "Fantom", "symbol": "FTM", "id": "fantom"}
+]
+
+# Phase 5 tiers, lowest first; score_confidence() returns an index into this
+CONFIDENCE_TIERS = [
+    {"confidence": "Low", "allocation": "0.25-0.5%", "recommendation": "HIGH RISK - Not Recommended", "recommendation_color": "red"},
+    {"confidence": "Medium", "allocation": "1-2%", "recommendation": "SPECULATIVE - Small Position", "recommendation_color": "yellow"},
+    {"confidence": "High", "allocation": "2-5%", "recommendation": "BUY - Satellite Position", "recommendation_color": "green"},
+    {"confidence": "Very High", "allocation": "5-10%", "recommendation": "STRONG BUY - Core Holding", "recommendation_color": "green"}
+]
+
+# Minimum (phase1 checks passed, tokenomics score, bullish metrics) per tier
+TIER_THRESHOLDS = {
+    1: (4, 15, 3),
+    2: (5, 18, 4),
+    3: (6, 23, 5)
+}
+# Very High additionally requires RSI below this gate
+RSI_GATE = 60
+
+def calculate_tokenomics_score(tokenomics):
+    """Calculate tokenomics score"""
+    return sum(tokenomics.values())
+
+def calculate_market_score(metrics):
+    """Calculate market health score"""
+    bullish = sum(1 for v in metrics.values() if v == "bullish")
+    return round((bullish / len(metrics)) * 100)
+
+def score_confidence(phase1_pass, tokenomics_score, market_bullish, rsi):
+    """Return the phase 5 tier index for the given phase scores"""
+    checks, tokenomics, bullish = TIER_THRESHOLDS[3]
+    if phase1_pass >= checks and tokenomics_score >= tokenomics and market_bullish >= bullish and rsi < RSI_GATE:
+        return 3
+    for tier in (2, 1):
+        checks, tokenomics, bullish = TIER_THRESHOLDS[tier]
+        if phase1_pass >= checks and tokenomics_score >= tokenomics and market_bullish >= bullish:
+            return tier
+    return 0
+
+# Simulated fields in draw order. Draw i of an asset is the i-th 64-bit word
+# of SHAKE-256 over its scoring_key(), so batch_analysis can compute any
+# field for a whole universe as a column
+DRAW_FIELDS = (
+    "market_cap", "market_cap_value", "exchanges", "active_months", "daily_volume", "has_product",
+    "checks.exchanges", "checks.volume", "checks.no_breach", "checks.has_mainnet",
+    "checks.active_community", "checks.documentation",
+    "tokenomics.supply", "tokenomics.distribution", "tokenomics.utility", "tokenomics.value_accrual",
+    "tokenomics.vesting",
+    "team.identifiable", "team.experience", "team.communication", "team.audited", "team.github_active",
+    "team.open_source",
+    "metrics.active_addresses", "metrics.tx_volume", "metrics.tvl", "metrics.dev_activity",
+    "metrics.nvt_ratio", "metrics.token_velocity", "metrics.whale_activity", "competitive_advantage",
+    "rsi", "trend", "fear_greed", "macd", "volume"
+)
+# Simulated flags are True when their draw is above the threshold
+FLAG_THRESHOLDS = {
+    "market_cap": 0.3, "exchanges": 0.2, "has_product": 0.3,
+    "checks.exchanges": 0.2, "checks.volume": 0.3, "checks.no_breach": 0.4, "checks.has_mainnet": 0.3,
+    "checks.active_community": 0.4, "checks.documentation": 0.3,
+    "team.identifiable": 0.3, "team.experience": 0.4, "team.communication": 0.3, "team.audited": 0.4,
+    "team.github_active": 0.3, "team.open_source": 0.5,
+    "metrics.active_addresses": 0.5, "metrics.tx_volume": 0.5, "metrics.tvl": 0.5, "metrics.dev_activity": 0.5,
+    "metrics.nvt_ratio": 0.5, "metrics.token_velocity": 0.5, "metrics.whale_activity": 0.5,
+    "competitive_advantage": 0.4, "macd": 0.5, "volume": 0.4
+}
+# Simulated integers, low..high inclusive
+INT_RANGES = {
+    "market_cap_value": (100, 600), "active_months": (6, 30), "daily_volume": (5, 55),
+    "tokenomics.supply": (3, 5), "tokenomics.distribution": (3, 5), "tokenomics.utility": (3, 5),
+    "tokenomics.value_accrual": (3, 5), "tokenomics.vesting": (3, 5),
+    "rsi": (30, 70), "trend": (0, 2), "fear_greed": (20, 80)
+}
+DRAW_WORDS = struct.Struct(f"<{len(DRAW_FIELDS)}Q")
+# A draw keeps the top 53 bits of its word, scaled to [0, 1)
+DRAW_SHIFT = 11
+DRAW_UNIT = 2.0 ** -53
+
+def scoring_key(selected_crypto, seed=SCORING_SEED, version=SCORING_VERSION):
+    """Bytes the simulated draws of a crypto are hashed from"""
+    return f"{version}:{seed}:{selected_crypto['id']}:{selected_crypto['symbol']}:{selected_crypto['name']}".encode()
+
+def scoring_draws(selected_crypto, seed=SCORING_SEED, version=SCORING_VERSION):
+    """Uniform [0, 1) draws keyed by DRAW_FIELDS, fixed per (crypto, seed, version)"""
+    digest = hashlib.shake_256(scoring_key(selected_crypto, seed, version)).digest(DRAW_WORDS.size)
+    return {field: (word >> DRAW_SHIFT) * DRAW_UNIT for field, word in zip(DRAW_FIELDS, DRAW_WORDS.unpack(digest))}
+
+def build_analysis(selected_crypto, price_data, timing=None, seed=SCORING_SEED, signals=None):
+    """Run the 5-phase analysis for a crypto
+
+    ``timing`` holds indicators computed from real candles (rsi, trend, macd,
+    volume); any phase 4 field it lacks is simulated. ``signals`` is a
+    Collector result whose values replace simulated phase 1-3 fields; the
+    signals it could not collect are listed under ``missing_signals``.
+    Apart from ``id`` and ``timestamp`` the result depends only on the
+    arguments and SCORING_VERSION.
+    """
+    draws = scoring_draws(selected_crypto, seed)
+
+    def flag(field):
+        return draws[field] > FLAG_THRESHOLDS[field]
+
+    def number(field):
+        low, high = INT_RANGES[field]
+        return low + int(draws[field] * (high - low + 1))
+
+    analysis = {
+        "id": int(time.time() * 1000),
+        "name": selected_crypto["name"],
+        "symbol": selected_crypto["symbol"],
+        "crypto_id": selected_crypto["id"],
+        "current_price": price_data.get("usd", 0),
+        "price_change_24h": price_data.get("usd_24h_change", 0),
+        "timestamp": datetime.now().isoformat(),
+        
+        # Phase 1: Pre-Screening
+        "phase1": {
+            "market_cap": "Mid Cap" if flag("market_cap") else "Small Cap",
+            "market_cap_value": f"${number('market_cap_value')}M",
+            "exchanges": "Binance, Coinbase, Kraken" if flag("exchanges") else "Binance, KuCoin",
+            "active_months": number("active_months"),
+            "daily_volume": f"${number('daily_volume')}M",
+            "has_product": flag("has_product"),
+            "checks": {
+                "exchanges": flag("checks.exchanges"),
+                "active6months": True,
+                "volume": flag("checks.volume"),
+                "no_breach": flag("checks.no_breach"),
+                "has_mainnet": flag("checks.has_mainnet"),
+                "active_community": flag("checks.active_community"),
+                "documentation": flag("checks.documentation")
+            }
+        },
+        
+        # Phase 2: Fundamentals
+        "phase2": {
+            "tokenomics": {
+                "supply": number("tokenomics.supply"),
+                "distribution": number("tokenomics.distribution"),
+                "utility": number("tokenomics.utility"),
+                "value_accrual": number("tokenomics.value_accrual"),
+                "vesting": number("tokenomics.vesting")
+            },
+            "team": {
+                "identifiable": flag("team.identifiable"),
+                "experience": flag("team.experience"),
+                "communication": flag("team.communication"),
+                "audited": flag("team.audited"),
+                "github_active": flag("team.github_active"),
+                "open_source": flag("team.open_source")
+            }
+        },
+        
+        # Phase 3: On-Chain
+        "phase3": {
+            "metrics": {
+                "active_addresses": "bullish" if flag("metrics.active_addresses") else "bearish",
+                "tx_volume": "bullish" if flag("metrics.tx_volume") else "bearish",
+                "tvl": "bullish" if flag("metrics.tvl") else "bearish",
+                "dev_activity": "bullish" if flag("metrics.dev_activity") else "bearish",
+                "nvt_ratio": "bullish" if flag("metrics.nvt_ratio") else "bearish",
+                "token_velocity": "bullish" if flag("metrics.token_velocity") else "bearish",
+                "whale_activity": "bullish" if flag("metrics.whale_activity") else "bearish"
+            },
+            "competitive_advantage": flag("competitive_advantage")
+        },
+        
+        # Phase 4: Timing
+        "phase4": {
+            "rsi": number("rsi"),
+            "trend": ["Uptrend", "Sideways", "Downtrend"][number("trend")],
+            "fear_greed": number("fear_greed"),
+            "macd": "Bullish" if flag("macd") else "Bearish",
+            "volume": "Above Average" if flag("volume") else "Below Average"
+        },
+        
+        # Phase 5: Portfolio
+        "phase5": {
+            "confidence": "calculating...",
+            "allocation": "calculating...",
+            "recommendation": "calculating..."
+        }
+    }
+    
+    if timing:
+        analysis["phase4"].update(timing)
+    if signals is not None:
+        apply_signals(analysis, signals["values"])
+        analysis["missing_signals"] = sorted(signals["missing"])
+    
+    # Calculate overall confidence
+    phase1_pass = sum(1 for v in analysis["phase1"]["checks"].values() if v)
+    tokenomics_score = sum(analysis["phase2"]["tokenomics"].values())
+    market_bullish = sum(1 for v in analysis["phase3"]["metrics"].values() if v == "bullish")
+    tier = CONFIDENCE_TIERS[score_confidence(phase1_pass, tokenomics_score, market_bullish, analysis["phase4"]["rsi"])]
+    
+    analysis["phase5"]["confidence"] = tier["confidence"]
+    analysis["phase5"]["allocation"] = tier["allocation"]
+    analysis["phase5"]["recommendation"] = tier["recommendation"]
+    analysis["phase5"]["recommendation_color"] = tier["recommendation_color"]
+    
+    return analysis
+
+def snapshot_key(selected_crypto, price_data, timing=None, seed=SCORING_SEED, signals=None):
+    """Memoization key covering every input build_analysis() depends on"""
+    snapshot = json.dumps([price_data, timing, signals], sort_keys=True)
+    return (SCORING_VERSION, seed, selected_crypto["id"], selected_crypto["symbol"], selected_crypto["name"], snapshot)
+
+def cached_analysis(selected_crypto, price_data, timing=None, seed=SCORING_SEED, signals=None):
+    """build_analysis() memoized in the process-wide score cache
+
+    Repeat requests get the cached phases with a fresh id and timestamp. The
+    nested phase dicts are shared between callers and must not be mutated.
+    """
+    cache = get_score_cache()
+    key = snapshot_key(selected_crypto, price_data, timing, seed, signals)
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = build_analysis(selected_crypto, price_data, timing, seed, signals)
+        cache.put(key, analysis)
+        return analysis
+    return {**analysis, "id": int(time.time() * 1000), "timestamp": datetime.now().isoformat()}
+
+_search_index = None
+
+def get_search_index():
+    """Return the process-wide index over CRYPTO_DATABASE, building it once"""
+    global _search_index
+    if _search_index is None or len(_search_index) != len(CRYPTO_DATABASE):
+        _search_index = SearchIndex(CRYPTO_DATABASE)
+    return _search_index
+
+def find_crypto(query):
+    """Return the best ranked entry whose name or symbol exactly matches query"""
+    matches = get_search_index().lookup(query)
+    return matches[0] if matches else None
+
+def resolve_crypto(query):
+    """Return the matching database entry, or a placeholder for unknown projects"""
+    return find_crypto(query) or {
+        "name": query,
+        "symbol": query[:4].upper(),
+        "id": "unknown"
+    }
+
+def suggest_cryptos(query, limit=10):
+    """Return the top ranked autocomplete suggestions for a partial query"""
+    return get_search_index().suggest(query, k=limit)
+
+def analyze_symbol(query, prices=None, seed=SCORING_SEED, simulated=False):
+    """Resolve a symbol or name and run the 5-phase analysis on it
+
+    Candle timing and collected signals are gathered the same way the
+    dashboard and API gather them, unless ``simulated`` is set.
+    """
+    crypto = resolve_crypto(query)
+    price_data = (prices or {}).get(crypto["id"], NO_PRICE)
+    if simulated:
+        return build_analysis(crypto, price_data, seed=seed)
+    # Imported lazily so --simulated runs never load candles or collectors
+    from analysis_jobs import gather_inputs
+    timings, signals = gather_inputs([crypto])
+    return build_analysis(crypto, price_data, timings.get(crypto["id"]), seed, signals.get(crypto["id"]))
+
+def main(argv=None):
+    """Stream analyses for symbols given as arguments or on stdin"""
+    parser = argparse.ArgumentParser(description="Run the 5-phase analysis and print one JSON object per line")
+    parser.add_argument("symbols", nargs="*", help="symbols or names to analyze (read from stdin if omitted)")
+    parser.add_argument("--no-prices", action="store_true", help="skip the live price fetch")
+    parser.add_argument("--seed", type=int, default=SCORING_SEED, help="scoring seed (default SCORING_SEED or 0)")
+    parser.add_argument("--simulated", action="store_true",
+                        help="skip candle timing and collected signals; score phases 1-4 from seeded draws only")
+    args = parser.parse_args(argv)
+    
+    symbols = args.symbols or (line.strip() for line in sys.stdin)
+    
+    prices = {}
+    if not args.no_prices:
+        # Imported lazily so --no-prices runs never load the HTTP stack
+        from price_cache import fetch_prices
+        from price_providers import PartialFetchError
+        try:
+            prices = fetch_prices([c["id"] for c in CRYPTO_DATABASE])
+        except PartialFetchError as e:
+            print(f"Error fetching some prices: {e}", file=sys.stderr)
+            prices = e.prices
+        except Exception as e:
+            print(f"Error fetching prices: {e}", file=sys.stderr)
+    
+    for symbol in symbols:
+        if not symbol:
+            continue
+        sys.stdout.write(json.dumps(analyze_symbol(symbol, prices, args.seed, args.simulated)) + "\n")
+        sys.stdout.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Persistent analysis history in SQLite (WAL) with batched writes"""
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+HISTORY_DB_PATH = os.environ.get(
+    "HISTORY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_history.db")
+)
+# Pending analyses are written in one transaction once either limit is hit
+FLUSH_INTERVAL = 0.5
+FLUSH_BATCH_SIZE = 500
+PAGE_SIZE = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    name TEXT NOT NULL,
+    crypto_id TEXT NOT NULL,
+    confidence TEXT NOT NULL,
+    recommendation TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_symbol ON analyses (symbol, created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_recommendation ON analyses (recommendation, created_at);
+"""
+
+
+class HistoryStore:
+    """Append-mostly store of analyses, indexed by symbol, time and recommendation"""
+
+    def __init__(self, path=HISTORY_DB_PATH, flush_interval=FLUSH_INTERVAL,
+                 batch_size=FLUSH_BATCH_SIZE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = queue.Queue()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add(self, analysis, created_at=None):
+        """Queue an analysis to be written with the next batch"""
+        self._pending.put((
+            analysis["symbol"],
+            analysis["name"],
+            analysis.get("crypto_id", "unknown"),
+            analysis["phase5"]["confidence"],
+            analysis["phase5"]["recommendation"],
+            created_at if created_at is not None else time.time(),
+            json.dumps(analysis)
+        ))
+
+    def add_many(self, analyses):
+        for analysis in analyses:
+            self.add(analysis)
+
+    def flush(self):
+        """Write every queued analysis now; returns the number written"""
+        with self._flush_lock:
+            rows = []
+            while True:
+                try:
+                    rows.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            if not rows:
+                return 0
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO analyses (symbol, name, crypto_id, confidence, recommendation, created_at, payload) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+            except sqlite3.Error:
+                # Put the batch back so the next flush retries it
+                for row in rows:
+                    self._pending.put(row)
+                raise
+            finally:
+                conn.close()
+            return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            deadline = time.time() + self.flush_interval
+            while self._pending.qsize() < self.batch_size and time.time() < deadline:
+                if self._stop.wait(0.05):
+                    break
+            try:
+                self.flush()
+            except sqlite3.Error:
+                self._stop.wait(self.flush_interval)
+
+    def close(self):
+        self._stop.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+    def query(self, symbol=None, recommendation=None, since=None, before=None,
+              limit=PAGE_SIZE):
+        """Return one page of analyses, newest first
+
+        ``before`` is the cursor returned with the previous page, so paging
+        stays an index seek however deep the history goes.
+        """
+        where, params = _filters(symbol, recommendation, since)
+        if before is not None:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        sql = "SELECT id, created_at, payload FROM analyses"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        analyses = [json.loads(payload) for _, _, payload in rows]
+        cursor = (rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        return analyses, cursor
+
+    def count(self, symbol=None, recommendation=None, since=None):
+        """Count analyses matching the same filters as query()"""
+        where, params = _filters(symbol, recommendation, since)
+        sql = "SELECT COUNT(*) FROM analyses"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchone()[0]
+        finally:
+            conn.close()
+
+
+def _filters(symbol, recommendation, since):
+    where = []
+    params = []
+    if symbol:
+        where.append("symbol = ?")
+        params.append(symbol.upper())
+    if recommendation:
+        where.append("recommendation = ?")
+        params.append(recommendation)
+    if since is not None:
+        where.append("created_at >= ?")
+        params.append(since)
+    return where, params
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the process-wide history store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+            # Don't drop the last unflushed batch on interpreter exit
+            atexit.register(_store.close)
+        return _store
@@ -0,0 +1,160 @@
+"""Vectorized, incrementally updatable phase 4 timing indicators
+
+IndicatorState keeps just enough running state (EMA values, Wilder
+averages, last close) to fold in new candles without revisiting old ones.
+"""
+import numpy as np
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+TREND_FAST = 20
+TREND_SLOW = 50
+VOLUME_PERIOD = 20
+
+# Chunk length for the closed-form EMA; keeps the decay powers well inside float64
+EMA_CHUNK = 128
+
+
+def ema(values, alpha, prev=None):
+    """Exponential moving average of values, continuing from ``prev``
+
+    Evaluated in closed form per chunk, so there is no Python loop per
+    element. Without ``prev`` the series is seeded with its first value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+    if prev is None:
+        prev = values[0]
+    decay = 1.0 - alpha
+    for start in range(0, len(values), EMA_CHUNK):
+        chunk = values[start:start + EMA_CHUNK]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        # ema_k = decay^k * prev + alpha * sum_{j<=k} decay^(k-j) * x_j
+        weighted = np.cumsum(chunk / powers * alpha)
+        out[start:start + len(chunk)] = powers * (prev + weighted)
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def rsi_series(closes, period=RSI_PERIOD):
+    """Wilder RSI after every close, NaN until ``period`` changes are seen
+
+    Matches the value IndicatorState reports after the same closes.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    out = np.full(len(closes), np.nan)
+    changes = np.diff(closes)
+    if len(changes) < period:
+        return out
+    averages = []
+    for moves in (np.clip(changes, 0, None), np.clip(-changes, 0, None)):
+        seed = moves[:period].mean()
+        averages.append(np.concatenate([[seed], ema(moves[period:], 1 / period, seed)]))
+    avg_gain, avg_loss = averages
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[period:] = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    return out
+
+
+class IndicatorState:
+    """Running RSI, MACD, trend and volume state for one asset"""
+
+    def __init__(self):
+        self.processed = 0
+        self.last_close = None
+        self.rsi_seed = []
+        self.avg_gain = None
+        self.avg_loss = None
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_signal = None
+        self.trend_fast = None
+        self.trend_slow = None
+        self.volume_avg = None
+        self.last_volume = None
+        self.rsi = None
+        self.macd = None
+
+    def update(self, closes, volumes):
+        """Fold in candles not seen yet; returns the number processed"""
+        closes = np.asarray(closes, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if not len(closes):
+            return 0
+
+        self._update_rsi(closes)
+
+        fast = ema(closes, 2 / (MACD_FAST + 1), self.ema_fast)
+        slow = ema(closes, 2 / (MACD_SLOW + 1), self.ema_slow)
+        signal = ema(fast - slow, 2 / (MACD_SIGNAL + 1), self.macd_signal)
+        self.ema_fast, self.ema_slow, self.macd_signal = fast[-1], slow[-1], signal[-1]
+        self.macd = self.ema_fast - self.ema_slow
+
+        self.trend_fast = ema(closes, 2 / (TREND_FAST + 1), self.trend_fast)[-1]
+        self.trend_slow = ema(closes, 2 / (TREND_SLOW + 1), self.trend_slow)[-1]
+        # The average covers every volume before the newest one, which is
+        # what it gets compared against
+        earlier = volumes[:-1] if self.last_volume is None else np.concatenate([[self.last_volume], volumes[:-1]])
+        if len(earlier):
+            self.volume_avg = ema(earlier, 2 / (VOLUME_PERIOD + 1), self.volume_avg)[-1]
+        self.last_volume = volumes[-1]
+
+        self.last_close = closes[-1]
+        self.processed += len(closes)
+        return len(closes)
+
+    def _update_rsi(self, closes):
+        prev = [self.last_close] if self.last_close is not None else []
+        changes = np.diff(np.concatenate([prev, closes]))
+        if self.avg_gain is None:
+            # Wilder seeds the averages with a simple mean of the first period
+            need = RSI_PERIOD - len(self.rsi_seed)
+            self.rsi_seed.extend(changes[:need].tolist())
+            changes = changes[need:]
+            if len(self.rsi_seed) < RSI_PERIOD:
+                return
+            seed = np.array(self.rsi_seed)
+            self.avg_gain = np.clip(seed, 0, None).mean()
+            self.avg_loss = np.clip(-seed, 0, None).mean()
+            self.rsi_seed = []
+        if len(changes):
+            alpha = 1 / RSI_PERIOD
+            self.avg_gain = ema(np.clip(changes, 0, None), alpha, self.avg_gain)[-1]
+            self.avg_loss = ema(np.clip(-changes, 0, None), alpha, self.avg_loss)[-1]
+        if self.avg_loss == 0:
+            self.rsi = 100.0
+        else:
+            self.rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+    def peek_rsi(self, close):
+        """RSI as if ``close`` ended the next candle, without folding it in"""
+        if self.avg_gain is None:
+            return self.rsi
+        alpha = 1 / RSI_PERIOD
+        change = close - self.last_close
+        avg_gain = self.avg_gain + alpha * (max(change, 0.0) - self.avg_gain)
+        avg_loss = self.avg_loss + alpha * (max(-change, 0.0) - self.avg_loss)
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def timing(self):
+        """Phase 4 fields in the shape build_analysis() produces"""
+        if self.rsi is None:
+            return None
+        if self.last_close > self.trend_fast > self.trend_slow:
+            trend = "Uptrend"
+        elif self.last_close < self.trend_fast < self.trend_slow:
+            trend = "Downtrend"
+        else:
+            trend = "Sideways"
+        return {
+            "rsi": int(round(self.rsi)),
+            "trend": trend,
+            "macd": "Bullish" if self.macd > self.macd_signal else "Bearish",
+            "volume": "Above Average" if self.volume_avg is not None and self.last_volume > self.volume_avg else "Below Average"
+        }
@@ -0,0 +1,193 @@
+"""Latency spans, gauges and an opt-in sampling profiler for the dashboard
+
+Code is timed with ``span("name")`` blocks or the ``@timed("name")``
+decorator. Each span keeps a count, an error count and a window of recent
+latencies. Singletons register gauges (queue depth, upstream errors...) with
+``add_gauges``. Everything is served as Prometheus text on
+``/metrics`` and as JSON on ``/metrics.json``.
+
+With ``PROFILE_SLOW_RERUN_MS`` set, every rerun is sampled and the stacks of
+reruns slower than that are written in folded format (one
+``frame;frame;frame count`` line per stack) to ``PROFILE_DIR``. They open in
+speedscope or flamegraph.pl.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Loopback unless set otherwise; the endpoint has no authentication
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 8503))
+LATENCY_WINDOW = 1024
+PROFILE_SLOW_RERUN_MS = float(os.environ.get("PROFILE_SLOW_RERUN_MS", 0))
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+)
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class Metrics:
+    """Span latencies and error counts plus registered gauge callbacks"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._spans = {}
+        self._gauges = []
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                span = self._spans[name] = {"count": 0, "errors": 0, "sum": 0.0, "latencies": deque(maxlen=self.window)}
+            span["count"] += 1
+            span["errors"] += error
+            span["sum"] += seconds
+            span["latencies"].append(seconds)
+
+    def add_gauges(self, fn):
+        """Include fn()'s {name: number} in every snapshot"""
+        with self._lock:
+            self._gauges.append(fn)
+
+    def snapshot(self):
+        with self._lock:
+            spans = {name: dict(span, latencies=sorted(span["latencies"])) for name, span in self._spans.items()}
+            gauge_fns = list(self._gauges)
+        gauges = {}
+        for fn in gauge_fns:
+            try:
+                gauges.update(fn())
+            except Exception:
+                # A broken gauge must not take the whole endpoint down
+                continue
+        return {
+            "spans": {
+                name: {
+                    "count": span["count"],
+                    "errors": span["errors"],
+                    "error_rate": span["errors"] / span["count"],
+                    "sum": span["sum"],
+                    "p50": percentile(span["latencies"], 50),
+                    "p99": percentile(span["latencies"], 99)
+                }
+                for name, span in sorted(spans.items())
+            },
+            "gauges": dict(sorted(gauges.items()))
+        }
+
+    def prometheus(self):
+        """The snapshot in Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP crypto_span_seconds Latency of instrumented code paths",
+            "# TYPE crypto_span_seconds summary"
+        ]
+        for name, span in snapshot["spans"].items():
+            lines.append(f'crypto_span_seconds{{span="{name}",quantile="0.5"}} {span["p50"]:.6f}')
+            lines.append(f'crypto_span_seconds{{span="{name}",quantile="0.99"}} {span["p99"]:.6f}')
+            lines.append(f'crypto_span_seconds_sum{{span="{name}"}} {span["sum"]:.6f}')
+            lines.append(f'crypto_span_seconds_count{{span="{name}"}} {span["count"]}')
+        lines.append("# TYPE crypto_span_errors_total counter")
+        for name, span in snapshot["spans"].items():
+            lines.append(f'crypto_span_errors_total{{span="{name}"}} {span["errors"]}')
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"# TYPE crypto_{name} gauge")
+            lines.append(f"crypto_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry"""
+    return _metrics
+
+
+@contextmanager
+def span(name, metrics=None):
+    """Time a block; exceptions count as errors, Streamlit reruns do not"""
+    metrics = metrics or _metrics
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        metrics.observe(name, time.perf_counter() - start, error)
+
+
+def timed(name):
+    """Decorator form of span()"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profiled_rerun(name="rerun", slow_ms=PROFILE_SLOW_RERUN_MS, directory=PROFILE_DIR):
+    """Time a whole rerun; when slow_ms is set, sample it and keep slow ones"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not slow_ms:
+                with span(name):
+                    return fn(*args, **kwargs)
+            from profiler import SamplingProfiler
+
+            profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL).start()
+            start = time.perf_counter()
+            try:
+                with span(name):
+                    return fn(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                profiler.stop()
+                if elapsed_ms >= slow_ms and profiler.stacks:
+                    os.makedirs(directory, exist_ok=True)
+                    profiler.write_folded(os.path.join(
+                        directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{elapsed_ms:.0f}ms.folded"
+                    ))
+        return wrapper
+    return decorate
+
+
+_server = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server():
+    """Serve the process-wide metrics once; returns None if the port is taken"""
+    global _server, _server_started
+    with _server_lock:
+        if not _server_started:
+            _server_started = True
+            # The HTTP stack is only loaded by processes that serve metrics
+            from metrics_server import MetricsServer
+
+            try:
+                _server = MetricsServer(_metrics, METRICS_HOST, METRICS_PORT)
+                threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            except OSError as e:
+                print(f"Metrics server disabled: {e}", file=sys.stderr)
+        return _server
@@ -0,0 +1,226 @@
+"""Historical candle ingestion feeding real phase 4 indicators
+
+Daily candles are pulled from CoinGecko (or replayed from recorded responses
+when ``OHLCV_FIXTURE_DIR`` is set), appended to memory-mapped files and
+folded into per-asset IndicatorState objects. Each refresh only fetches and
+processes candles newer than the last stored one.
+
+    python market_data.py bitcoin ethereum
+    python market_data.py --record fixtures/ bitcoin
+    OHLCV_FIXTURE_DIR=fixtures/ python market_data.py bitcoin
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from indicators import IndicatorState
+from ohlcv_store import OHLCVStore
+
+COINGECKO_API_URL = os.environ.get("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+OHLCV_DATA_DIR = os.environ.get(
+    "OHLCV_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ohlcv_data")
+)
+OHLCV_FIXTURE_DIR = os.environ.get("OHLCV_FIXTURE_DIR")
+# Days of history fetched for an asset seen for the first time
+HISTORY_DAYS = 365
+# Seconds between refreshes of the same asset; candles are daily
+REFRESH_INTERVAL = 900
+# Seconds between full-history fetches, so ingesting a whole universe for
+# the first time stays under CoinGecko's public rate limit (~30 calls/min)
+HISTORY_FETCH_INTERVAL = float(os.environ.get("OHLCV_HISTORY_INTERVAL", 2.0))
+
+
+class HistoryThrottled(Exception):
+    """Raised when a full-history fetch comes before its slot is free"""
+DAY = 86400
+
+
+def parse_market_chart(payload):
+    """Turn a /market_chart response into an (n, 6) array of daily candles
+
+    The endpoint only reports one price per day, so each candle opens at the
+    previous close. A trailing intraday point is dropped so only completed
+    days are stored.
+    """
+    prices = payload.get("prices") or []
+    volumes = {int(ts): v for ts, v in payload.get("total_volumes") or []}
+    rows = []
+    prev_close = None
+    for ts, close in prices:
+        ts = int(ts)
+        if (ts // 1000) % DAY:
+            continue
+        open_ = close if prev_close is None else prev_close
+        rows.append((ts / 1000, open_, max(open_, close), min(open_, close), close, volumes.get(ts, 0.0)))
+        prev_close = close
+    return np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+
+class CoinGeckoCandleSource:
+    """Daily candles from CoinGecko, optionally recording raw responses
+
+    Shares the price provider's pooled session, retry policy and circuit
+    breaker. Full-history fetches are spaced ``history_interval`` seconds
+    apart; one that comes early raises HistoryThrottled instead of waiting,
+    so callers never block on the rate limit.
+    """
+
+    def __init__(self, base_url=COINGECKO_API_URL, timeout=10, record_dir=None,
+                 history_interval=HISTORY_FETCH_INTERVAL, breaker=None):
+        # Imported here so fixture replays never load the HTTP stack
+        from price_providers import CircuitBreaker, pooled_session
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.record_dir = record_dir
+        self.history_interval = history_interval
+        self.breaker = breaker or CircuitBreaker()
+        self.session = pooled_session(4)
+        self._next_history_at = 0.0
+        self._history_lock = threading.Lock()
+
+    def fetch(self, asset_id, since=None):
+        if since is not None:
+            return self._fetch(asset_id, max(1, math.ceil((time.time() - since) / DAY) + 1))
+        with self._history_lock:
+            now = time.monotonic()
+            if now < self._next_history_at:
+                raise HistoryThrottled(f"next full-history fetch in {self._next_history_at - now:.1f}s")
+            self._next_history_at = now + self.history_interval
+        return self._fetch(asset_id, HISTORY_DAYS)
+
+    def _fetch(self, asset_id, days):
+        from price_providers import CircuitOpenError, get_with_retries
+
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.base_url} is failing, not retrying for {self.breaker.reset_timeout:.0f}s")
+        try:
+            payload = get_with_retries(
+                self.session,
+                f"{self.base_url}/coins/{asset_id}/market_chart",
+                {"vs_currency": "usd", "days": days, "interval": "daily"},
+                self.timeout
+            )
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(os.path.join(self.record_dir, f"{asset_id}.json"), "w") as f:
+                json.dump(payload, f)
+        return parse_market_chart(payload)
+
+
+class FileCandleSource:
+    """Replays recorded /market_chart responses from <directory>/<asset_id>.json"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, asset_id, since=None):
+        path = os.path.join(self.directory, f"{asset_id}.json")
+        if not os.path.exists(path):
+            return np.empty((0, 6))
+        with open(path) as f:
+            candles = parse_market_chart(json.load(f))
+        if since is not None:
+            candles = candles[candles[:, 0] > since]
+        return candles
+
+
+class MarketData:
+    """Keeps candle files and indicator state in step for every asset"""
+
+    def __init__(self, store, source, refresh_interval=REFRESH_INTERVAL):
+        self.store = store
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self._states = {}
+        self._refreshed_at = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, asset_id):
+        with self._locks_lock:
+            return self._locks.setdefault(asset_id, threading.Lock())
+
+    def ingest(self, asset_id):
+        """Fetch and store candles newer than the last stored one"""
+        with self._lock(asset_id):
+            candles = self.store.get(asset_id)
+            added = candles.append(self.source.fetch(asset_id, since=candles.last_timestamp()))
+            self._refreshed_at[asset_id] = time.time()
+            self._update_state(asset_id)
+            return added
+
+    def _update_state(self, asset_id):
+        state = self._states.setdefault(asset_id, IndicatorState())
+        candles = self.store.get(asset_id)
+        state.update(candles.column("close", state.processed), candles.column("volume", state.processed))
+        return state
+
+    def state(self, asset_id):
+        """IndicatorState for an asset, ingesting new candles when due"""
+        if time.time() - self._refreshed_at.get(asset_id, 0) > self.refresh_interval:
+            try:
+                self.ingest(asset_id)
+            except HistoryThrottled:
+                # Not fetched at all; try again on the next call
+                pass
+            except Exception:
+                # Fall back to whatever history is already stored
+                self._refreshed_at[asset_id] = time.time()
+        with self._lock(asset_id):
+            return self._update_state(asset_id)
+
+    def timing(self, asset_id):
+        """Phase 4 indicators for an asset, or None when there is no history"""
+        if asset_id == "unknown":
+            return None
+        return self.state(asset_id).timing()
+
+
+_market_data = None
+_market_data_lock = threading.Lock()
+
+
+def get_market_data():
+    """Return the process-wide MarketData"""
+    global _market_data
+    with _market_data_lock:
+        if _market_data is None:
+            source = FileCandleSource(OHLCV_FIXTURE_DIR) if OHLCV_FIXTURE_DIR else CoinGeckoCandleSource()
+            _market_data = MarketData(OHLCVStore(OHLCV_DATA_DIR), source)
+        return _market_data
+
+
+def main(argv=None):
+    """Ingest candles for the given assets and print their phase 4 indicators"""
+    parser = argparse.ArgumentParser(description="Ingest daily candles and compute phase 4 indicators")
+    parser.add_argument("asset_ids", nargs="+", help="CoinGecko ids, e.g. bitcoin")
+    parser.add_argument("--fixtures", help="replay recorded responses from this directory")
+    parser.add_argument("--record", help="save raw CoinGecko responses to this directory")
+    parser.add_argument("--data-dir", default=OHLCV_DATA_DIR, help="where candle files are stored")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        source = FileCandleSource(args.fixtures)
+    else:
+        source = CoinGeckoCandleSource(record_dir=args.record)
+    market_data = MarketData(OHLCVStore(args.data_dir), source)
+    for asset_id in args.asset_ids:
+        added = market_data.ingest(asset_id)
+        print(json.dumps({"id": asset_id, "added": added, "phase4": market_data.timing(asset_id)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""HTTP endpoint for the metrics registry
+
+Loaded by start_metrics_server() when a process serves its metrics, so
+code that only records spans never imports the HTTP stack.
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics for Prometheus, GET /metrics.json for everything else"""
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send(self.server.metrics.prometheus().encode(), "text/plain; version=0.0.4")
+        elif self.path == "/metrics.json":
+            self._send(json.dumps(self.server.metrics.snapshot()).encode(), "application/json")
+        else:
+            self.send_error(404)
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, metrics, host, port):
+        super().__init__((host, port), MetricsHandler)
+        self.metrics = metrics
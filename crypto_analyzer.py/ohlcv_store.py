@@ -0,0 +1,145 @@
+"""Memory-mapped columnar candle files, one per asset
+
+Each file holds a small header followed by one contiguous float64 block per
+column (timestamp, open, high, low, close, volume), sized for ``capacity``
+rows. Appends write into the spare capacity in place; the file is only
+rewritten when it has to grow. Appends take a lock file, so several
+processes (e.g. API workers) can keep the same directory up to date.
+"""
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows; there a directory must have a single writer process
+    fcntl = None
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+MAGIC = b"OHLCV001"
+HEADER = struct.Struct("<8sQQ")  # magic, capacity, length
+HEADER_SIZE = 64
+INITIAL_CAPACITY = 1024
+
+
+class OHLCVFile:
+    """One asset's candles, readable as zero-copy column arrays"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._file_lock():
+            if not os.path.exists(path):
+                self._create(INITIAL_CAPACITY)
+        self._open()
+
+    def _create(self, capacity, columns=None, length=0):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, capacity, length).ljust(HEADER_SIZE, b"\0"))
+            f.truncate(HEADER_SIZE + capacity * len(COLUMNS) * 8)
+        if columns is not None:
+            data = np.memmap(tmp_path, dtype=np.float64, mode="r+", offset=HEADER_SIZE,
+                             shape=(len(COLUMNS), capacity))
+            data[:, :length] = columns[:, :length]
+            data.flush()
+            del data
+        os.replace(tmp_path, self.path)
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            magic, capacity, length = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an OHLCV file")
+        self.capacity = capacity
+        self.length = length
+        self._data = np.memmap(self.path, dtype=np.float64, mode="r+", offset=HEADER_SIZE,
+                               shape=(len(COLUMNS), capacity))
+
+    def _sync(self):
+        """Pick up rows appended, or a file regrown, by another process"""
+        with open(self.path, "rb") as f:
+            _, capacity, length = HEADER.unpack(f.read(HEADER.size))
+        if capacity != self.capacity:
+            del self._data
+            self._open()
+        else:
+            self.length = length
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        # The data file is replaced when it grows, so lock a sidecar instead
+        with open(self.path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return self.length
+
+    def column(self, name, start=0):
+        """Return a read-only view of one column from row ``start`` on"""
+        view = self._data[COLUMNS.index(name), start:self.length]
+        view.flags.writeable = False
+        return view
+
+    def last_timestamp(self):
+        return float(self._data[0, self.length - 1]) if self.length else None
+
+    def append(self, candles):
+        """Append candles newer than the last stored one; returns rows added
+
+        ``candles`` is an (n, 6) array-like in COLUMNS order, sorted by time.
+        """
+        candles = np.asarray(candles, dtype=np.float64).reshape(-1, len(COLUMNS))
+        with self._lock, self._file_lock():
+            self._sync()
+            last = self.last_timestamp()
+            if last is not None:
+                candles = candles[candles[:, 0] > last]
+            if not len(candles):
+                return 0
+            new_length = self.length + len(candles)
+            if new_length > self.capacity:
+                capacity = self.capacity
+                while capacity < new_length:
+                    capacity *= 2
+                columns = np.array(self._data[:, :self.length])
+                del self._data
+                self._create(capacity, columns, self.length)
+                self._open()
+            self._data[:, self.length:new_length] = candles.T
+            self._data.flush()
+            self.length = new_length
+            with open(self.path, "r+b") as f:
+                f.write(HEADER.pack(MAGIC, self.capacity, self.length))
+            return len(candles)
+
+
+class OHLCVStore:
+    """Directory of OHLCVFile objects keyed by asset id"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def get(self, asset_id):
+        with self._lock:
+            if asset_id not in self._files:
+                path = os.path.join(self.directory, f"{asset_id}.ohlcv")
+                self._files[asset_id] = OHLCVFile(path)
+            return self._files[asset_id]
+
+    def append(self, asset_id, candles):
+        return self.get(asset_id).append(candles)
@@ -0,0 +1,157 @@
+"""Process-wide price cache shared by every dashboard session"""
+import os
+import threading
+import time
+
+from instrumentation import get_metrics
+from price_providers import PartialFetchError, get_price_provider
+
+# Seconds a price map is served as fresh
+PRICE_TTL = float(os.environ.get("PRICE_CACHE_TTL", 60))
+# Seconds a stale price map may still be served while a refresh runs
+PRICE_STALE_TTL = float(os.environ.get("PRICE_CACHE_STALE_TTL", 600))
+# Seconds to wait before retrying after an upstream failure
+PRICE_RETRY_AFTER = float(os.environ.get("PRICE_CACHE_RETRY_AFTER", 10))
+
+
+def fetch_prices(ids):
+    """Fetch current USD prices and 24h change from the configured provider"""
+    return get_price_provider().fetch(ids)
+
+
+class PriceCache:
+    """Price map filled by a single refresher and read by every session"""
+
+    def __init__(self, ids, fetcher=fetch_prices, ttl=PRICE_TTL,
+                 stale_ttl=PRICE_STALE_TTL, retry_after=PRICE_RETRY_AFTER):
+        self.ids = list(ids)
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.retry_after = retry_after
+        self.prices = {}
+        self.fetched_at = 0.0
+        self.failed_at = 0.0
+        self.last_error = None
+        self.fetch_count = 0
+        self.error_count = 0
+        self.partial_count = 0
+        self._listeners = []
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def age(self):
+        """Seconds since the last successful fetch"""
+        if not self.fetched_at:
+            return float("inf")
+        return time.time() - self.fetched_at
+
+    def is_fresh(self):
+        return self.age() < self.ttl
+
+    def get(self):
+        """Return the current price map without stampeding the upstream"""
+        age = self.age()
+        if age < self.ttl:
+            return self.prices
+        if self.prices and age < self.stale_ttl and self.running():
+            # Stale-while-revalidate: serve what we have, nudge the refresher
+            self._wake.set()
+            return self.prices
+        self.refresh()
+        return self.prices
+
+    def refresh(self, force=False):
+        """Fetch prices upstream; concurrent callers share a single fetch"""
+        with self._refresh_lock:
+            now = time.time()
+            if not force:
+                if self.is_fresh():
+                    return True
+                if self.failed_at and now - self.failed_at < self.retry_after:
+                    return False
+            partial = None
+            try:
+                prices = self.fetcher(self.ids)
+            except PartialFetchError as e:
+                # Assets in the failed chunks keep their last good price
+                prices = {**self.prices, **e.prices}
+                partial = e
+                self.partial_count += 1
+            except Exception as e:
+                self.last_error = e
+                self.error_count += 1
+                self.failed_at = time.time()
+                return False
+            self.fetch_count += 1
+            self.prices = prices
+            self.fetched_at = time.time()
+            self.failed_at = 0.0
+            self.last_error = partial
+        for listener in list(self._listeners):
+            listener(prices)
+        return True
+
+    def gauges(self):
+        """Upstream fetch counts and error rate for the metrics endpoint"""
+        attempts = self.fetch_count + self.error_count
+        return {
+            "price_upstream_fetches": self.fetch_count,
+            "price_upstream_errors": self.error_count,
+            "price_upstream_partial_fetches": self.partial_count,
+            "price_upstream_error_rate": self.error_count / attempts if attempts else 0.0,
+            "price_age_seconds": min(self.age(), 1e9)
+        }
+
+    def add_listener(self, fn):
+        """Call fn(prices) after every successful refresh"""
+        self._listeners.append(fn)
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background refresher if it is not already running"""
+        with self._refresh_lock:
+            if self.running():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="price-cache-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            # Sleep until the map goes stale, a reader nudges us, or we stop
+            if self.failed_at:
+                wait = self.retry_after - (time.time() - self.failed_at)
+            else:
+                wait = self.ttl - self.age()
+            self._wake.wait(timeout=max(wait, 0.5))
+            self._wake.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_price_cache(ids):
+    """Return the process-wide price cache, starting its refresher on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PriceCache(ids)
+            _cache.start()
+            get_metrics().add_gauges(_cache.gauges)
+        return _cache
@@ -0,0 +1,319 @@
+"""Pluggable price sources for the shared price cache
+
+``PRICE_PROVIDER`` picks the source:
+- ``coingecko`` (default) - the CoinGecko API at ``COINGECKO_API_URL``
+- ``file:<path>`` - a JSON price map on disk, re-read when it changes
+
+A local CoinGecko-compatible stub (``/simple/price`` and daily
+``/coins/<id>/market_chart``) lets load tests and CI run the real HTTP path
+without network access:
+
+    python price_providers.py serve --port 8765 --file prices.json
+    COINGECKO_API_URL=http://127.0.0.1:8765 streamlit run crypto_analyzer.py.py
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+COINGECKO_API_URL = os.environ.get("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+PRICE_PROVIDER = os.environ.get("PRICE_PROVIDER", "coingecko")
+
+# CoinGecko accepts long id lists, but URLs over ~8KB get rejected
+CHUNK_SIZE = 250
+CHUNK_WORKERS = 4
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that keeps failing"""
+
+
+class PartialFetchError(Exception):
+    """Raised when some chunks of a fetch failed; prices holds the rest"""
+
+    def __init__(self, prices, errors, chunks):
+        super().__init__(f"{len(errors)} of {chunks} price chunks failed: {errors[0]}")
+        self.prices = prices
+        self.errors = errors
+
+
+class CircuitBreaker:
+    """Stops calls after repeated failures, then lets one probe through"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may go through right now"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+            self._probing = False
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff for the given retry attempt"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def pooled_session(pool_size):
+    """A keep-alive session holding up to pool_size connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_with_retries(session, url, params, timeout, max_retries=MAX_RETRIES):
+    """GET a JSON response, backing off on connection errors, 429 and 5xx"""
+    for attempt in range(max_retries + 1):
+        delay = backoff_delay(attempt)
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+            if response.status_code not in RETRY_STATUSES:
+                # Other 4xx errors will not go away on retry
+                response.raise_for_status()
+                return response.json()
+            error = requests.HTTPError(f"{response.status_code} from {url}", response=response)
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = min(float(retry_after), BACKOFF_MAX)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt < max_retries:
+            time.sleep(delay)
+    raise error
+
+
+class CoinGeckoProvider:
+    """/simple/price over a pooled keep-alive session with retries"""
+
+    def __init__(self, base_url=COINGECKO_API_URL, timeout=10, chunk_size=CHUNK_SIZE,
+                 max_workers=CHUNK_WORKERS, max_retries=MAX_RETRIES, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.session = pooled_session(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="price-chunk")
+
+    def fetch(self, ids):
+        """Fetch USD prices and 24h change, splitting long id lists into concurrent chunks"""
+        ids = list(ids)
+        chunks = [ids[i:i + self.chunk_size] for i in range(0, len(ids), self.chunk_size)]
+        if len(chunks) <= 1:
+            return self._fetch_chunk(ids) if ids else {}
+
+        prices = {}
+        errors = []
+        for future in [self._executor.submit(self._fetch_chunk, chunk) for chunk in chunks]:
+            try:
+                prices.update(future.result())
+            except Exception as e:
+                errors.append(e)
+        if len(errors) == len(chunks):
+            raise errors[0]
+        if errors:
+            # Partial maps are still useful; callers decide what to keep for the rest
+            raise PartialFetchError(prices, errors, len(chunks))
+        return prices
+
+    def _fetch_chunk(self, ids):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.base_url} is failing, not retrying for {self.breaker.reset_timeout:.0f}s")
+        try:
+            prices = self._get_with_retries({
+                "ids": ",".join(ids),
+                "vs_currencies": "usd",
+                "include_24hr_change": "true"
+            })
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return prices
+
+    def _get_with_retries(self, params):
+        return get_with_retries(self.session, f"{self.base_url}/simple/price", params, self.timeout, self.max_retries)
+
+class FileProvider:
+    """Serves prices from a JSON file shaped like a /simple/price response"""
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._prices = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, ids):
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            if mtime != self._mtime:
+                with open(self.path) as f:
+                    self._prices = json.load(f)
+                self._mtime = mtime
+            return {i: self._prices[i] for i in ids if i in self._prices}
+
+
+def make_provider(spec=PRICE_PROVIDER):
+    """Build a provider from a PRICE_PROVIDER style spec"""
+    if spec.startswith("file:"):
+        return FileProvider(spec[len("file:"):])
+    if spec == "coingecko":
+        return CoinGeckoProvider()
+    raise ValueError(f"Unknown price provider: {spec}")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_price_provider():
+    """Return the process-wide price provider"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = make_provider()
+        return _provider
+
+
+class StubPriceHandler(BaseHTTPRequestHandler):
+    """Answers /simple/price and /market_chart like CoinGecko"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        if url.path.endswith("/simple/price"):
+            payload = self.server.quote(query.get("ids", [""])[0].split(","))
+        elif len(parts) >= 3 and parts[-3] == "coins" and parts[-1] == "market_chart":
+            days = query.get("days", ["365"])[0]
+            payload = self.server.market_chart(parts[-2], int(days) if days.isdigit() else 365)
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubPriceServer(ThreadingHTTPServer):
+    """Local CoinGecko stand-in; prices come from a file or a random walk"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, path=None, latency=0.0):
+        super().__init__(("127.0.0.1", port), StubPriceHandler)
+        self.provider = FileProvider(path) if path else None
+        self.latency = latency
+        self._walk = {}
+        self._walk_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def quote(self, ids):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.provider is not None:
+            return self.provider.fetch(ids)
+        with self._walk_lock:
+            for i in ids:
+                price = self._walk.get(i, random.uniform(0.01, 1000))
+                self._walk[i] = price * random.uniform(0.995, 1.005)
+            return {i: {"usd": self._walk[i], "usd_24h_change": random.uniform(-5, 5)} for i in ids}
+
+    def market_chart(self, asset_id, days):
+        """Daily closes ending today, the same random walk on every call"""
+        if self.latency:
+            time.sleep(self.latency)
+        rng = random.Random(asset_id)
+        today = int(time.time()) // 86400
+        price = rng.uniform(0.01, 1000)
+        prices, volumes = [], []
+        for day in range(today - 365, today + 1):
+            price *= rng.uniform(0.95, 1.05)
+            volume = rng.uniform(1e6, 1e9)
+            if day > today - days:
+                prices.append([day * 86400000, price])
+                volumes.append([day * 86400000, volume])
+        return {"prices": prices, "total_volumes": volumes}
+
+    def start(self):
+        """Serve from a daemon thread; returns self for chaining"""
+        threading.Thread(target=self.serve_forever, name="stub-price-server", daemon=True).start()
+        return self
+
+
+def main(argv=None):
+    """Run the stub price server"""
+    parser = argparse.ArgumentParser(description="Local CoinGecko /simple/price stub")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file", help="JSON price map to serve (random walk if omitted)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args(argv)
+
+    server = StubPriceServer(args.port, args.file, args.latency)
+    print(f"Serving stub prices on {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
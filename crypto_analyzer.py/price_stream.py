@@ -0,0 +1,249 @@
+"""Live price push channel shared by every open dashboard
+
+One process-wide feed applies price updates to a shared PriceTable. Only
+entries that actually changed are passed on to subscribers. Dashboards
+subscribe over Server-Sent Events, so a tick reaches the page without a
+Streamlit rerun.
+
+The feed is the shared price cache (pushed on every refresh) by default,
+or a recorded tick file when ``PRICE_STREAM_REPLAY`` points at one. Each
+line of that file is a JSON object like
+``{"t": 0.25, "id": "bitcoin", "usd": 65000.1, "usd_24h_change": 1.3}``
+where ``t`` is seconds from the start of the recording.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Loopback unless set otherwise, like the metrics endpoint
+PRICE_STREAM_HOST = os.environ.get("PRICE_STREAM_HOST", "127.0.0.1")
+PRICE_STREAM_PORT = int(os.environ.get("PRICE_STREAM_PORT", 8502))
+# Page origins allowed to read the stream cross-origin ("*" for any);
+# the default is a local Streamlit dashboard
+PRICE_STREAM_ALLOW_ORIGIN = [
+    origin.strip() for origin in
+    os.environ.get("PRICE_STREAM_ALLOW_ORIGIN", "http://localhost:8501,http://127.0.0.1:8501").split(",")
+    if origin.strip()
+]
+# Browser-facing base URL when the stream sits behind a proxy
+PRICE_STREAM_PUBLIC_URL = os.environ.get("PRICE_STREAM_PUBLIC_URL")
+PRICE_STREAM_REPLAY = os.environ.get("PRICE_STREAM_REPLAY")
+PRICE_STREAM_REPLAY_SPEED = float(os.environ.get("PRICE_STREAM_REPLAY_SPEED", 1.0))
+HEARTBEAT_INTERVAL = 15
+
+
+class Subscription:
+    """Changed prices waiting for one subscriber, coalesced per ticker"""
+
+    def __init__(self, ids=None):
+        self.ids = set(ids) if ids else None
+        self._pending = {}
+        self._cond = threading.Condition()
+
+    def push(self, changes):
+        if self.ids is not None:
+            changes = {k: v for k, v in changes.items() if k in self.ids}
+        if not changes:
+            return
+        with self._cond:
+            self._pending.update(changes)
+            self._cond.notify()
+
+    def next(self, timeout=None):
+        """Wait for changes and return them, or {} on timeout"""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            changes, self._pending = self._pending, {}
+            return changes
+
+
+class PriceTable:
+    """In-memory price map that publishes only the entries that changed"""
+
+    def __init__(self):
+        self._prices = {}
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def apply(self, prices):
+        """Merge a full or partial price map; returns the changed entries"""
+        with self._lock:
+            changed = {k: v for k, v in prices.items() if self._prices.get(k) != v}
+            self._prices.update(changed)
+            subscriptions = list(self._subscriptions)
+            if changed:
+                self.updates += 1
+        for subscription in subscriptions:
+            subscription.push(changed)
+        return changed
+
+    def snapshot(self, ids=None):
+        with self._lock:
+            if ids is None:
+                return dict(self._prices)
+            return {k: self._prices[k] for k in ids if k in self._prices}
+
+    def subscribe(self, ids=None):
+        subscription = Subscription(ids)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+
+def replay_ticks(table, path, speed=1.0, loop=True, stop=None):
+    """Feed a recorded tick file into the table at its original pace"""
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        start = time.time()
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                tick = json.loads(line)
+                delay = start + tick.get("t", 0) / speed - time.time()
+                if delay > 0 and stop.wait(delay):
+                    return
+                table.apply({tick["id"]: {"usd": tick["usd"], "usd_24h_change": tick.get("usd_24h_change", 0)}})
+        if not loop:
+            return
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """GET /stream?ids=a,b for SSE updates, GET /snapshot for the current map"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        ids = [i for i in parse_qs(url.query).get("ids", [""])[0].split(",") if i] or None
+        table = self.server.table
+        if url.path == "/snapshot":
+            self._send_json(table.snapshot(ids))
+        elif url.path == "/stream":
+            self._stream(table, ids)
+        else:
+            self.send_error(404)
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self._send_cors_headers()
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, table, ids):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self._send_cors_headers()
+        self.end_headers()
+        subscription = table.subscribe(ids)
+        try:
+            self._write_event(table.snapshot(ids))
+            while True:
+                changes = subscription.next(timeout=HEARTBEAT_INTERVAL)
+                if changes:
+                    self._write_event(changes)
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            table.unsubscribe(subscription)
+
+    def _send_cors_headers(self):
+        """Let allowed page origins read the response; others get no CORS headers"""
+        allowed = self.server.allow_origins
+        origin = self.headers.get("Origin")
+        if "*" in allowed:
+            self.send_header("Access-Control-Allow-Origin", "*")
+            return
+        self.send_header("Vary", "Origin")
+        if origin in allowed:
+            self.send_header("Access-Control-Allow-Origin", origin)
+
+    def _write_event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, table, host=PRICE_STREAM_HOST, port=PRICE_STREAM_PORT, allow_origins=PRICE_STREAM_ALLOW_ORIGIN):
+        super().__init__((host, port), StreamHandler)
+        self.table = table
+        self.allow_origins = set(allow_origins)
+
+
+class PriceStream:
+    """The process-wide table, its feed and its SSE server"""
+
+    def __init__(self, table, server=None):
+        self.table = table
+        self.server = server
+        self._stop = threading.Event()
+
+    @property
+    def port(self):
+        return self.server.server_address[1] if self.server else None
+
+    def start_replay(self, path, speed=1.0):
+        threading.Thread(
+            target=replay_ticks, args=(self.table, path, speed, True, self._stop),
+            name="price-stream-replay", daemon=True
+        ).start()
+
+    def follow_cache(self, cache):
+        """Push every refresh of a PriceCache into the table"""
+        cache.add_listener(self.table.apply)
+        if cache.prices:
+            self.table.apply(cache.prices)
+
+    def stop(self):
+        self._stop.set()
+        if self.server:
+            self.server.shutdown()
+
+
+_stream = None
+_stream_lock = threading.Lock()
+
+
+def get_price_stream(cache=None):
+    """Return the process-wide price stream, starting its feed and server once"""
+    global _stream
+    with _stream_lock:
+        if _stream is None:
+            table = PriceTable()
+            try:
+                server = StreamServer(table)
+                threading.Thread(target=server.serve_forever, name="price-stream-server", daemon=True).start()
+            except OSError as e:
+                # Another process owns the port; the dashboard falls back to polled prices
+                print(f"Price stream server disabled: {e}", file=sys.stderr)
+                server = None
+            _stream = PriceStream(table, server)
+            if PRICE_STREAM_REPLAY:
+                _stream.start_replay(PRICE_STREAM_REPLAY, PRICE_STREAM_REPLAY_SPEED)
+            elif cache is not None:
+                _stream.follow_cache(cache)
+        return _stream
@@ -0,0 +1,85 @@
+"""Process-wide LRU memo of analyses keyed by their scoring inputs"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from instrumentation import get_metrics
+
+SCORE_CACHE_SIZE = int(os.environ.get("SCORE_CACHE_SIZE", 10000))
+# Seconds an entry is reused; inputs include live prices, so keep it short
+SCORE_CACHE_TTL = float(os.environ.get("SCORE_CACHE_TTL", 300))
+
+
+class ScoreCache:
+    """LRU cache with per-entry expiry and hit/miss counters"""
+
+    def __init__(self, maxsize=SCORE_CACHE_SIZE, ttl=SCORE_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters and hit rate since the cache was created"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "miss_rate": self.misses / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_score_cache():
+    """Return the process-wide score cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScoreCache()
+            get_metrics().add_gauges(lambda: {f"score_cache_{k}": v for k, v in _cache.stats().items()})
+        return _cache
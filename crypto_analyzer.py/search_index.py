@@ -0,0 +1,170 @@
+"""Prebuilt symbol/name index for exact lookup and search-box autocomplete"""
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from difflib import SequenceMatcher
+from itertools import islice
+
+# Key kinds, in the order matches of equal quality are ranked
+KIND_SYMBOL = 0
+KIND_NAME = 1
+KIND_WORD = 2
+
+# Short prefixes match many assets, so their results are memoized
+MEMO_MAX_LEN = 2
+# Longer queries are kept in a small LRU, as the box re-asks while typing
+RECENT_QUERIES = 256
+FUZZY_CANDIDATES = 20
+FUZZY_MIN_RATIO = 0.6
+# Trigrams shared by more assets than this ("  b", "coi"...) say little
+# about a typo and dominate the cost of counting hits, so they are skipped
+FUZZY_MAX_POSTINGS = 256
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Hash maps for exact matches plus a sorted key list for prefix search
+
+    Assets are ranked by their position in the source list, so the
+    database order (roughly market cap) breaks ties, and duplicate
+    tickers are all kept, best ranked first.
+    """
+
+    def __init__(self, cryptos):
+        self.cryptos = list(cryptos)
+        self._by_symbol = defaultdict(list)
+        self._by_name = defaultdict(list)
+        self._trigrams = None
+        self._lowered = None
+        keys = []
+        for idx, c in enumerate(self.cryptos):
+            symbol = c["symbol"].lower()
+            name = c["name"].lower()
+            self._by_symbol[symbol].append(idx)
+            self._by_name[name].append(idx)
+            keys.append((symbol, KIND_SYMBOL, idx))
+            keys.append((name, KIND_NAME, idx))
+            for word in name.split()[1:]:
+                keys.append((word, KIND_WORD, idx))
+        keys.sort()
+        self._keys = keys
+        self._key_strs = [k[0] for k in keys]
+        self._memo = {}
+        self._recent = OrderedDict()
+        # Single characters have the widest ranges; answer them up front
+        for char in {key[0] for key in self._key_strs if key}:
+            self.suggest(char)
+
+    def __len__(self):
+        return len(self.cryptos)
+
+    def lookup(self, query):
+        """Return every asset whose symbol or name exactly matches query"""
+        query = query.lower().strip()
+        seen = self._by_symbol.get(query, []) + self._by_name.get(query, [])
+        return [self.cryptos[idx] for idx in dict.fromkeys(seen)]
+
+    def suggest(self, query, k=10, fuzzy=True):
+        """Return the top-k assets for a partially typed symbol or name"""
+        query = query.lower().strip()
+        if not query:
+            return []
+        memo_key = (query, k, fuzzy)
+        if len(query) <= MEMO_MAX_LEN and memo_key in self._memo:
+            return list(self._memo[memo_key])
+        if memo_key in self._recent:
+            self._recent.move_to_end(memo_key)
+            return list(self._recent[memo_key])
+
+        best = {}
+        lo = bisect_left(self._key_strs, query)
+        hi = bisect_left(self._key_strs, query + "\uffff", lo)
+        for key, kind, idx in self._keys[lo:hi]:
+            rank = (key != query, kind, idx)
+            if idx not in best or rank < best[idx]:
+                best[idx] = rank
+        top = heapq.nsmallest(k, best, key=best.__getitem__)
+        if len(top) < k:
+            # Matches inside a name or symbol ("coin" in "bitcoin") follow prefix matches
+            top += self._substrings(query, k - len(top), best)
+
+        if fuzzy and not top:
+            top = self._fuzzy(query, k)
+
+        results = [self.cryptos[idx] for idx in top]
+        if len(query) <= MEMO_MAX_LEN:
+            self._memo[memo_key] = list(results)
+        else:
+            self._recent[memo_key] = list(results)
+            if len(self._recent) > RECENT_QUERIES:
+                self._recent.popitem(last=False)
+        return results
+
+    def _substrings(self, query, k, exclude):
+        """Best ranked assets containing query anywhere in their symbol or name"""
+        texts = self._texts()
+        if len(query) < 3:
+            # Too short for trigrams; the scan stops at k and the result is memoized
+            candidates = range(len(texts))
+        else:
+            grams = self._trigram_index()
+            postings = [grams.get(query[i:i + 3]) for i in range(len(query) - 2)]
+            if None in postings:
+                return []
+            postings.sort(key=len)
+            candidates = sorted(postings[0].intersection(*postings[1:]))
+        matches = (idx for idx in candidates if idx not in exclude and query in texts[idx])
+        return list(islice(matches, k))
+
+    def _texts(self):
+        if self._lowered is None:
+            # Symbol and name in one string; the separator keeps matches from spanning both
+            self._lowered = [f'{c["symbol"].lower()}\n{c["name"].lower()}' for c in self.cryptos]
+        return self._lowered
+
+    def _trigram_index(self):
+        if self._trigrams is None:
+            # Only substring and typo'd queries need this, so it is built on first use
+            grams = defaultdict(set)
+            for idx, c in enumerate(self.cryptos):
+                for gram in _trigrams(c["symbol"].lower()) | _trigrams(c["name"].lower()):
+                    grams[gram].add(idx)
+            self._trigrams = grams
+        return self._trigrams
+
+    def _fuzzy(self, query, k):
+        """Rank assets sharing trigrams with query by similarity"""
+        grams = self._trigram_index()
+        postings = sorted((grams[gram] for gram in _trigrams(query) if gram in grams), key=len)
+        # Keep the rarest trigram even when every one is common
+        postings = postings[:1] + [p for p in postings[1:] if len(p) <= FUZZY_MAX_POSTINGS]
+        hits = defaultdict(int)
+        for posting in postings:
+            for idx in posting:
+                hits[idx] += 1
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, hits, key=hits.__getitem__)
+
+        # SequenceMatcher caches its second sequence, so the query goes there,
+        # and the cheap upper bounds skip most full ratio() calls
+        matcher = SequenceMatcher(None, "", query)
+        scored = []
+        for idx in candidates:
+            c = self.cryptos[idx]
+            cutoff = max(FUZZY_MIN_RATIO, scored[0][0]) if len(scored) == k else FUZZY_MIN_RATIO
+            best = 0.0
+            for text in (c["symbol"].lower(), c["name"].lower()):
+                matcher.set_seq1(text)
+                if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                    best = max(best, matcher.ratio())
+            if best < cutoff:
+                continue
+            # Min-heap of the k best so far; better ranked assets win ties
+            if len(scored) < k:
+                heapq.heappush(scored, (best, -idx))
+            elif (best, -idx) > scored[0]:
+                heapq.heapreplace(scored, (best, -idx))
+        return [-neg for _, neg in sorted(scored, reverse=True)]
@@ -0,0 +1,110 @@
+"""The phase 1-3 signals a Collector can fill in, and where each one lives
+
+Each Signal names its path in an analysis dict, the source that provides it,
+how long a collected value stays current and how to validate it. Kept apart
+from the collector so the engine can apply collected values without loading
+asyncio.
+"""
+import re
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+
+def _is_bool(value):
+    return value is True or value is False
+
+
+def _is_trend(value):
+    return value in ("bullish", "bearish")
+
+
+def _is_rating(value):
+    return type(value) is int and 0 <= value <= 5
+
+
+def _is_count(value):
+    return type(value) is int and value >= 0
+
+
+def _is_millions(value):
+    return isinstance(value, str) and re.fullmatch(r"\$(0|[1-9]\d*)M", value) is not None
+
+
+def _is_text(value):
+    return isinstance(value, str) and bool(value)
+
+
+class Signal:
+    """One collected value: where it goes in an analysis and how long it lasts"""
+
+    def __init__(self, name, path, source, ttl, timeout, valid):
+        self.name = name
+        self.path = path
+        self.source = source
+        self.ttl = ttl
+        self.timeout = timeout
+        self.valid = valid
+
+
+# TTLs follow how often each upstream changes: market and on-chain data
+# move within minutes, repositories hourly, listings and audits daily
+SIGNALS = {s.name: s for s in [
+    # Phase 1: Pre-Screening
+    Signal("exchanges", ("phase1", "checks", "exchanges"), "exchanges", 6 * HOUR, 2.0, _is_bool),
+    Signal("exchange_list", ("phase1", "exchanges"), "exchanges", 6 * HOUR, 2.0, _is_text),
+    Signal("active_months", ("phase1", "active_months"), "exchanges", DAY, 2.0, _is_count),
+    Signal("active6months", ("phase1", "checks", "active6months"), "exchanges", DAY, 2.0, _is_bool),
+    Signal("market_cap_value", ("phase1", "market_cap_value"), "market", 5 * MINUTE, 1.5, _is_millions),
+    Signal("daily_volume", ("phase1", "daily_volume"), "market", 5 * MINUTE, 1.5, _is_millions),
+    Signal("volume", ("phase1", "checks", "volume"), "market", 5 * MINUTE, 1.5, _is_bool),
+    Signal("no_breach", ("phase1", "checks", "no_breach"), "security", DAY, 3.0, _is_bool),
+    Signal("has_mainnet", ("phase1", "checks", "has_mainnet"), "project", DAY, 3.0, _is_bool),
+    Signal("has_product", ("phase1", "has_product"), "project", DAY, 3.0, _is_bool),
+    Signal("documentation", ("phase1", "checks", "documentation"), "project", DAY, 3.0, _is_bool),
+    Signal("active_community", ("phase1", "checks", "active_community"), "social", HOUR, 2.0, _is_bool),
+    # Phase 2: Fundamentals
+    Signal("supply", ("phase2", "tokenomics", "supply"), "tokenomics", DAY, 3.0, _is_rating),
+    Signal("distribution", ("phase2", "tokenomics", "distribution"), "tokenomics", DAY, 3.0, _is_rating),
+    Signal("utility", ("phase2", "tokenomics", "utility"), "tokenomics", DAY, 3.0, _is_rating),
+    Signal("value_accrual", ("phase2", "tokenomics", "value_accrual"), "tokenomics", DAY, 3.0, _is_rating),
+    Signal("vesting", ("phase2", "tokenomics", "vesting"), "tokenomics", DAY, 3.0, _is_rating),
+    Signal("identifiable", ("phase2", "team", "identifiable"), "team", DAY, 3.0, _is_bool),
+    Signal("experience", ("phase2", "team", "experience"), "team", DAY, 3.0, _is_bool),
+    Signal("communication", ("phase2", "team", "communication"), "social", HOUR, 2.0, _is_bool),
+    Signal("audited", ("phase2", "team", "audited"), "security", DAY, 3.0, _is_bool),
+    Signal("github_active", ("phase2", "team", "github_active"), "github", HOUR, 3.0, _is_bool),
+    Signal("open_source", ("phase2", "team", "open_source"), "github", DAY, 3.0, _is_bool),
+    # Phase 3: On-Chain
+    Signal("active_addresses", ("phase3", "metrics", "active_addresses"), "onchain", 10 * MINUTE, 2.0, _is_trend),
+    Signal("tx_volume", ("phase3", "metrics", "tx_volume"), "onchain", 10 * MINUTE, 2.0, _is_trend),
+    Signal("nvt_ratio", ("phase3", "metrics", "nvt_ratio"), "onchain", 10 * MINUTE, 2.0, _is_trend),
+    Signal("token_velocity", ("phase3", "metrics", "token_velocity"), "onchain", 10 * MINUTE, 2.0, _is_trend),
+    Signal("whale_activity", ("phase3", "metrics", "whale_activity"), "onchain", 10 * MINUTE, 2.0, _is_trend),
+    Signal("tvl", ("phase3", "metrics", "tvl"), "defi", 10 * MINUTE, 2.0, _is_trend),
+    Signal("dev_activity", ("phase3", "metrics", "dev_activity"), "github", HOUR, 3.0, _is_trend),
+    Signal("competitive_advantage", ("phase3", "competitive_advantage"), "project", DAY, 3.0, _is_bool),
+]}
+SOURCE_NAMES = sorted({s.source for s in SIGNALS.values()})
+
+
+def apply_signals(analysis, values):
+    """Write collected values into an analysis dict in place"""
+    for name, value in values.items():
+        *parents, key = SIGNALS[name].path
+        target = analysis
+        for parent in parents:
+            target = target[parent]
+        target[key] = value
+
+
+def signal_values(analysis):
+    """Read every signal out of an analysis dict"""
+    values = {}
+    for name, signal in SIGNALS.items():
+        value = analysis
+        for key in signal.path:
+            value = value[key]
+        values[name] = value
+    return values
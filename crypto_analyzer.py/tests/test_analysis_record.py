@@ -0,0 +1,106 @@
+import copy
+import json
+
+import pytest
+
+from analysis_record import AnalysisRecord
+from engine import CRYPTO_DATABASE, build_analysis, calculate_market_score
+
+PRICE = {"usd": 1234.5678, "usd_24h_change": -3.25}
+
+
+def sample(crypto=CRYPTO_DATABASE[0], seed=0, signals=None):
+    return build_analysis(crypto, PRICE, seed=seed, signals=signals)
+
+
+@pytest.mark.parametrize("crypto", CRYPTO_DATABASE, ids=lambda c: c["symbol"])
+def test_dict_round_trip(crypto):
+    analysis = sample(crypto)
+    record = AnalysisRecord.from_dict(analysis)
+    assert record.to_dict() == analysis
+    assert AnalysisRecord.from_dict(record.to_dict()) == record
+
+
+def test_json_round_trip():
+    record = AnalysisRecord.from_dict(sample())
+    text = record.to_json()
+    assert json.loads(text) == record.to_dict()
+    assert AnalysisRecord.from_json(text) == record
+
+
+def test_missing_signals_round_trip():
+    analysis = sample(signals={"values": {}, "missing": {"tvl": "timeout", "audited": "no source"}})
+    assert analysis["missing_signals"] == ["audited", "tvl"]
+    record = AnalysisRecord.from_json(json.dumps(analysis))
+    assert record.missing_signals == ("audited", "tvl")
+    assert record.to_dict() == analysis
+
+
+def test_scores_match_the_analysis():
+    analysis = sample(seed=7)
+    record = AnalysisRecord.from_dict(analysis)
+    assert record.phase1_pass == sum(analysis["phase1"]["checks"].values())
+    assert record.tokenomics_score == sum(analysis["phase2"]["tokenomics"].values())
+    assert record.market_score == calculate_market_score(analysis["phase3"]["metrics"])
+    assert record.confidence == analysis["phase5"]["confidence"]
+    assert record.recommendation == analysis["phase5"]["recommendation"]
+
+
+def _without_first_check(analysis):
+    del analysis["phase1"]["checks"]["exchanges"]
+
+
+def _reordered_checks(analysis):
+    checks = analysis["phase1"]["checks"]
+    analysis["phase1"]["checks"] = dict(reversed(list(checks.items())))
+
+
+def _reordered_tokenomics(analysis):
+    tokenomics = analysis["phase2"]["tokenomics"]
+    analysis["phase2"]["tokenomics"] = dict(reversed(list(tokenomics.items())))
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda a: a.update(extra=1),
+    lambda a: a.pop("symbol"),
+    lambda a: a["phase4"].update(extra=1),
+    _without_first_check,
+    _reordered_checks,
+    _reordered_tokenomics,
+    lambda a: a["phase1"]["checks"].update(volume=1),
+    lambda a: a["phase1"].update(has_product="yes"),
+    lambda a: a["phase2"]["team"].update(audited=None),
+    lambda a: a["phase3"]["metrics"].update(tvl="neutral"),
+    lambda a: a["phase2"]["tokenomics"].update(supply=16),
+    lambda a: a["phase2"]["tokenomics"].update(supply=2.0),
+    lambda a: a["phase1"].update(market_cap_value="$1.5M"),
+    lambda a: a["phase1"].update(daily_volume="12M"),
+    lambda a: a.update(timestamp="yesterday"),
+    lambda a: a.update(timestamp="2024-01-02T03:04:05+00:00"),
+    lambda a: a.update(timestamp="2024-01-02 03:04:05"),
+    lambda a: a["phase5"].update(confidence="Extreme"),
+    lambda a: a.update(missing_signals="tvl"),
+    lambda a: a.update(missing_signals=[1]),
+], ids=[
+    "extra-key", "missing-key", "extra-phase-key", "missing-check", "checks-out-of-order",
+    "tokenomics-out-of-order", "check-not-bool", "has-product-not-bool", "team-flag-not-bool",
+    "unknown-metric-value", "rating-too-large", "rating-not-int", "fractional-millions",
+    "millions-without-dollar", "timestamp-not-iso", "timestamp-with-timezone",
+    "timestamp-not-round-trip", "unknown-tier", "missing-signals-not-list", "missing-signals-not-names"
+])
+def test_rejects_what_cannot_round_trip(corrupt):
+    analysis = copy.deepcopy(sample())
+    corrupt(analysis)
+    with pytest.raises(ValueError):
+        AnalysisRecord.from_dict(analysis)
+
+
+@pytest.mark.parametrize("value", [None, [], "not an analysis"])
+def test_rejects_non_dicts(value):
+    with pytest.raises(ValueError):
+        AnalysisRecord.from_dict(value)
+
+
+def test_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        AnalysisRecord.from_json("{not json")
@@ -0,0 +1,74 @@
+import pytest
+
+from batch_analysis import analyze_all, draw_columns
+from engine import CRYPTO_DATABASE, DRAW_FIELDS, NO_PRICE, build_analysis, scoring_draws
+
+PRICES = {"bitcoin": {"usd": 65000.0, "usd_24h_change": 1.5}}
+UNIVERSE = [{"name": f"Token {i}", "symbol": f"T{i}", "id": f"token-{i}"} for i in range(500)]
+
+
+def single(crypto, seed=0, timing=None, signals=None):
+    return build_analysis(crypto, PRICES.get(crypto["id"], NO_PRICE), timing, seed, signals)
+
+
+def assert_matches_single(cryptos, seed=0, timings=None, signals=None):
+    timings = timings or {}
+    signals = signals or {}
+    table = analyze_all(cryptos, PRICES, seed, timings, signals)
+    assert sorted(table["symbol"]) == sorted(c["symbol"] for c in cryptos)
+    rows = {symbol: idx for idx, symbol in enumerate(table["symbol"])}
+    for crypto in cryptos:
+        analysis = single(crypto, seed, timings.get(crypto["id"]), signals.get(crypto["id"]))
+        row = rows[crypto["symbol"]]
+        phase1 = analysis["phase1"]
+        assert table["confidence"][row] == analysis["phase5"]["confidence"], crypto["symbol"]
+        assert table["recommendation"][row] == analysis["phase5"]["recommendation"]
+        assert table["phase1_pass"][row] == sum(phase1["checks"].values())
+        assert table["tokenomics_score"][row] == sum(analysis["phase2"]["tokenomics"].values())
+        assert table["rsi"][row] == analysis["phase4"]["rsi"]
+        assert f"${table['market_cap_musd'][row]}M" == phase1["market_cap_value"]
+        assert f"${table['daily_volume_musd'][row]}M" == phase1["daily_volume"]
+        assert table["price"][row] == (analysis["current_price"] or 0)
+
+
+@pytest.mark.parametrize("seed", [0, 7])
+def test_tiers_match_single_analysis(seed):
+    assert_matches_single(CRYPTO_DATABASE, seed)
+
+
+def test_tiers_match_over_a_large_universe():
+    assert_matches_single(UNIVERSE)
+
+
+def test_draw_columns_match_scoring_draws():
+    columns = draw_columns(UNIVERSE[:50], 3)
+    for crypto, row in zip(UNIVERSE, columns):
+        draws = scoring_draws(crypto, 3)
+        assert list(row) == [draws[field] for field in DRAW_FIELDS]
+
+
+def test_timing_and_signals_override_draws():
+    timings = {c["id"]: {"rsi": 45 + i % 30, "trend": "Sideways"} for i, c in enumerate(CRYPTO_DATABASE[::2])}
+    signals = {
+        c["id"]: {
+            "values": {
+                "no_breach": i % 2 == 0,
+                "active6months": False,
+                "supply": i % 6,
+                "vesting": 5,
+                "tvl": "bullish",
+                "whale_activity": "bearish",
+                "market_cap_value": f"${1000 + i}M",
+                "daily_volume": "$0M",
+                "audited": True
+            },
+            "missing": {}
+        }
+        for i, c in enumerate(CRYPTO_DATABASE[::3])
+    }
+    assert_matches_single(CRYPTO_DATABASE, 0, timings, signals)
+
+
+def test_empty_universe():
+    table = analyze_all([])
+    assert all(len(column) == 0 for column in table.values())
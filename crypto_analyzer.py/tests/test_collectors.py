@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from collectors import MISSING_TTL, Collector, make_sources
+from signals import SIGNALS
+
+
+class FakeSource:
+    """Returns fixed values after a delay, or raises"""
+
+    def __init__(self, values, delay=0.0, error=None):
+        self.values = values
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch(self, asset_id, names):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            return {name: self.values[name] for name in names if name in self.values}
+        finally:
+            self.in_flight -= 1
+
+
+def gather(collector, asset_id="bitcoin", names=None):
+    return asyncio.run(collector.gather(asset_id, names))
+
+
+def test_slow_source_times_out_per_signal():
+    # market signals allow 1.5 s, exchanges signals 2 s
+    names = ["daily_volume", "exchanges"]
+    sources = {
+        "market": FakeSource({"daily_volume": "$12M"}, delay=1.7),
+        "exchanges": FakeSource({"exchanges": True}, delay=0.01)
+    }
+    result = gather(Collector(sources), names=names)
+    assert result == {"values": {"exchanges": True}, "missing": {"daily_volume": "timeout"}}
+
+
+def test_timeout_leaves_the_shared_request_running():
+    # market_cap_value and volume share one request; both time out at 1.5 s
+    source = FakeSource({"market_cap_value": "$5M", "volume": True}, delay=0.05)
+    result = gather(Collector({"market": source}), names=["market_cap_value", "volume"])
+    assert result["values"] == {"market_cap_value": "$5M", "volume": True}
+    assert source.calls == 1
+
+
+def test_missing_signals_are_reported_not_simulated():
+    sources = {
+        "security": FakeSource({}, error=RuntimeError("boom")),
+        "tokenomics": FakeSource({"supply": 9}),
+        "github": FakeSource({})
+    }
+    result = gather(Collector(sources), names=["no_breach", "supply", "github_active", "tvl"])
+    assert result["values"] == {}
+    assert result["missing"] == {
+        "no_breach": "error: boom",
+        "supply": "invalid value",
+        "github_active": "unavailable",
+        "tvl": "no source"
+    }
+
+
+def test_timed_out_signals_are_retried_after_the_missing_ttl(clock):
+    source = FakeSource({"daily_volume": "$12M"}, delay=1.6)
+    collector = Collector({"market": source}, clock=clock)
+    assert gather(collector, names=["daily_volume"])["missing"] == {"daily_volume": "timeout"}
+    assert gather(collector, names=["daily_volume"])["missing"] == {"daily_volume": "timeout"}
+    assert source.calls == 1
+
+    source.delay = 0
+    clock.now += min(SIGNALS["daily_volume"].ttl, MISSING_TTL)
+    assert gather(collector, names=["daily_volume"])["values"] == {"daily_volume": "$12M"}
+    assert source.calls == 2
+
+
+def test_concurrency_is_limited_per_source():
+    source = FakeSource({"daily_volume": "$1M"}, delay=0.02)
+    collector = Collector({"market": source}, concurrency=2)
+
+    async def many():
+        return await asyncio.gather(*(collector.gather(f"asset-{i}", ["daily_volume"]) for i in range(6)))
+
+    results = asyncio.run(many())
+    assert all(r["values"] == {"daily_volume": "$1M"} for r in results)
+    assert source.max_in_flight == 2
+
+
+@pytest.mark.parametrize("spec, url", [
+    ("http://127.0.0.1:8080", "http://127.0.0.1:8080/market"),
+    ("https://signals.example/v1/", "https://signals.example/v1/market"),
+    ("http:http://127.0.0.1:8080", "http://127.0.0.1:8080/market")
+])
+def test_http_specs(spec, url):
+    assert make_sources(spec)["market"].url == url
+
+
+@pytest.mark.parametrize("spec", ["http:", "http:host", "ftp://host", "signals"])
+def test_unknown_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        make_sources(spec)
@@ -0,0 +1,178 @@
+import pytest
+
+import price_providers
+from price_cache import PriceCache
+from price_providers import CircuitBreaker, CircuitOpenError, CoinGeckoProvider, PartialFetchError, get_with_retries
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(price_providers.time, "time", clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 29.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def _provider(monkeypatch, respond, **kwargs):
+    provider = CoinGeckoProvider(base_url="http://upstream.invalid", max_retries=0, **kwargs)
+    monkeypatch.setattr(provider, "_get_with_retries", lambda params: respond(params["ids"].split(",")))
+    return provider
+
+
+def test_open_breaker_skips_the_upstream(monkeypatch, clock):
+    calls = []
+
+    def respond(ids):
+        calls.append(ids)
+        raise ConnectionError("down")
+
+    provider = _provider(monkeypatch, respond, breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            provider.fetch(["bitcoin"])
+    with pytest.raises(CircuitOpenError):
+        provider.fetch(["bitcoin"])
+    assert len(calls) == 2
+
+
+def test_failed_chunks_raise_partial_results(monkeypatch):
+    def respond(ids):
+        if "b" in ids:
+            raise ConnectionError("down")
+        return {i: {"usd": 1.0} for i in ids}
+
+    provider = _provider(monkeypatch, respond, chunk_size=1, breaker=CircuitBreaker(failure_threshold=100))
+    with pytest.raises(PartialFetchError) as raised:
+        provider.fetch(["a", "b", "c"])
+    assert raised.value.prices == {"a": {"usd": 1.0}, "c": {"usd": 1.0}}
+    assert len(raised.value.errors) == 1
+
+
+def test_every_chunk_failing_raises_the_first_error(monkeypatch):
+    def respond(ids):
+        raise ConnectionError(f"down for {ids[0]}")
+
+    provider = _provider(monkeypatch, respond, chunk_size=1, breaker=CircuitBreaker(failure_threshold=100))
+    with pytest.raises(ConnectionError, match="down for a"):
+        provider.fetch(["a", "b"])
+
+
+def test_cache_keeps_last_good_prices_for_failed_chunks():
+    responses = [
+        {"a": {"usd": 1.0}, "b": {"usd": 2.0}},
+        PartialFetchError({"a": {"usd": 1.5}}, [ConnectionError("down")], 2),
+        ConnectionError("down")
+    ]
+
+    def fetcher(ids):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    cache = PriceCache(["a", "b"], fetcher, ttl=0, retry_after=0)
+    assert cache.refresh()
+    assert cache.refresh(force=True)
+    assert cache.prices == {"a": {"usd": 1.5}, "b": {"usd": 2.0}}
+    assert cache.partial_count == 1
+    assert not cache.refresh(force=True)
+    assert cache.prices == {"a": {"usd": 1.5}, "b": {"usd": 2.0}}
+    assert cache.error_count == 1
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise price_providers.requests.HTTPError(str(self.status_code), response=self)
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def test_retries_honour_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(price_providers.time, "sleep", sleeps.append)
+    session = FakeSession([FakeResponse(429, headers={"Retry-After": "3"}), FakeResponse(200, {"ok": True})])
+    assert get_with_retries(session, "http://upstream/x", {}, timeout=1) == {"ok": True}
+    assert sleeps == [3.0]
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    monkeypatch.setattr(price_providers.time, "sleep", lambda delay: None)
+    session = FakeSession([FakeResponse(404)])
+    with pytest.raises(price_providers.requests.HTTPError):
+        get_with_retries(session, "http://upstream/x", {}, timeout=1)
+    assert session.calls == 1
+
+
+def test_retries_give_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(price_providers.time, "sleep", lambda delay: None)
+    session = FakeSession([FakeResponse(503) for _ in range(3)])
+    with pytest.raises(price_providers.requests.HTTPError):
+        get_with_retries(session, "http://upstream/x", {}, timeout=1, max_retries=2)
+    assert session.calls == 3
@@ -0,0 +1,367 @@
+"""Incremental re-scoring of watched symbols with alerting
+
+Each watched asset keeps its phase 1-3 scores, its indicator state and its
+current tier. A price tick only recomputes phase 4, as the RSI the day's
+candle would have if it closed at the tick price. A candle refresh folds the
+new candles into the indicator state, and a signal refresh recomputes phases
+1-3. The tier is then re-evaluated from the stored scores. Alerts fire when
+the recommendation changes or RSI crosses the phase 5 gate. They are
+deduplicated and throttled per symbol before being handed to the sinks.
+
+    python watchlist.py BTC ETH SOL --sink file:alerts.jsonl
+    python watchlist.py --all --replay ticks.jsonl --speed 20 --duration 60
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from engine import CONFIDENCE_TIERS, CRYPTO_DATABASE, RSI_GATE, SCORING_SEED, build_analysis, find_crypto, score_confidence
+
+# Identical alerts for a symbol within this many seconds are dropped
+ALERT_DEDUP_WINDOW = float(os.environ.get("ALERT_DEDUP_WINDOW", 300))
+# At most ALERT_THROTTLE_COUNT alerts per symbol every ALERT_THROTTLE_WINDOW seconds
+ALERT_THROTTLE_COUNT = int(os.environ.get("ALERT_THROTTLE_COUNT", 3))
+ALERT_THROTTLE_WINDOW = float(os.environ.get("ALERT_THROTTLE_WINDOW", 60))
+# Seconds between candle and signal refreshes in the CLI
+REFRESH_INTERVAL = float(os.environ.get("WATCHLIST_REFRESH_INTERVAL", 3600))
+
+
+class FileSink:
+    """Appends alerts to a file as JSON lines"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, alert):
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    """POSTs each alert as JSON to a URL"""
+
+    def __init__(self, url, timeout=5):
+        import requests
+
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alert):
+        self.session.post(self.url, json=alert, timeout=self.timeout).raise_for_status()
+
+
+class QueueSink:
+    """Puts alerts on a queue.Queue for in-process consumers"""
+
+    def __init__(self, q=None):
+        self.queue = q if q is not None else queue.Queue()
+
+    def send(self, alert):
+        self.queue.put(alert)
+
+
+def make_sink(spec):
+    """Build a sink from ``file:<path>``, ``webhook:<url>`` or ``queue``"""
+    if spec.startswith("file:"):
+        return FileSink(spec[len("file:"):])
+    if spec.startswith("webhook:"):
+        return WebhookSink(spec[len("webhook:"):])
+    if spec == "queue":
+        return QueueSink()
+    raise ValueError(f"Unknown alert sink: {spec}")
+
+
+class AlertDispatcher:
+    """Drops duplicate and excess alerts, then delivers the rest off-thread"""
+
+    def __init__(self, sinks, dedup_window=ALERT_DEDUP_WINDOW, throttle_count=ALERT_THROTTLE_COUNT,
+                 throttle_window=ALERT_THROTTLE_WINDOW, clock=time.monotonic):
+        self.sinks = list(sinks)
+        self.dedup_window = dedup_window
+        self.throttle_count = throttle_count
+        self.throttle_window = throttle_window
+        self.clock = clock
+        self.counts = Counter()
+        self._last_seen = {}
+        self._recent = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="alert-dispatcher", daemon=True).start()
+
+    def emit(self, alert):
+        """Queue an alert for delivery; returns False if it was dropped"""
+        now = self.clock()
+        key = (alert["id"], alert["type"], alert["from"], alert["to"])
+        with self._lock:
+            seen = self._last_seen.get(key)
+            if seen is not None and now - seen < self.dedup_window:
+                self.counts["deduplicated"] += 1
+                return False
+            recent = self._recent.setdefault(alert["id"], deque())
+            while recent and now - recent[0] >= self.throttle_window:
+                recent.popleft()
+            if len(recent) >= self.throttle_count:
+                self.counts["throttled"] += 1
+                return False
+            self._last_seen[key] = now
+            recent.append(now)
+            self.counts["queued"] += 1
+        self._queue.put(alert)
+        return True
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            for sink in self.sinks:
+                try:
+                    sink.send(alert)
+                    self.counts["delivered"] += 1
+                except Exception as e:
+                    self.counts["errors"] += 1
+                    print(f"Alert sink {type(sink).__name__} failed: {e}", file=sys.stderr)
+            self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued alert has been handed to the sinks"""
+        self._queue.join()
+
+
+class WatchState:
+    """Scores and inputs kept between updates for one watched asset"""
+
+    __slots__ = ("crypto", "phase1_pass", "tokenomics_score", "market_bullish", "indicators", "price", "rsi", "tier")
+
+    def __init__(self, crypto, phase1_pass, tokenomics_score, market_bullish, rsi, tier):
+        self.crypto = crypto
+        self.phase1_pass = phase1_pass
+        self.tokenomics_score = tokenomics_score
+        self.market_bullish = market_bullish
+        self.indicators = None
+        self.price = None
+        self.rsi = rsi
+        self.tier = tier
+
+
+def phase_scores(analysis):
+    """Phase 1, 2 and 3 scores of an analysis dict"""
+    return (
+        sum(1 for v in analysis["phase1"]["checks"].values() if v),
+        sum(analysis["phase2"]["tokenomics"].values()),
+        sum(1 for v in analysis["phase3"]["metrics"].values() if v == "bullish")
+    )
+
+
+class Watchlist:
+    """Watched assets, re-scored only as far as each update requires"""
+
+    def __init__(self, dispatcher, market_data=None, collector=None, seed=SCORING_SEED, rsi_gate=RSI_GATE):
+        self.dispatcher = dispatcher
+        self.market_data = market_data
+        self.collector = collector
+        self.seed = seed
+        self.rsi_gate = rsi_gate
+        # How often each phase was recomputed, to check updates stay incremental
+        self.recomputed = Counter()
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def add(self, crypto):
+        """Start watching a CRYPTO_DATABASE entry; its first scores raise no alert"""
+        signals = self.collector.collect(crypto["id"]) if self.collector else None
+        analysis = build_analysis(crypto, {}, seed=self.seed, signals=signals)
+        rsi = analysis["phase4"]["rsi"]
+        indicators = self.market_data.state(crypto["id"]) if self.market_data is not None else None
+        if indicators is not None and indicators.rsi is None:
+            # No candle history: phase 4 keeps its simulated RSI
+            indicators = None
+        if indicators is not None:
+            # Rounded like IndicatorState.timing(), so tiers match build_analysis()
+            rsi = int(round(indicators.rsi))
+        scores = phase_scores(analysis)
+        state = WatchState(crypto, *scores, rsi, score_confidence(*scores, rsi))
+        state.indicators = indicators
+        with self._lock:
+            self._states[crypto["id"]] = state
+        return state
+
+    def remove(self, asset_id):
+        with self._lock:
+            self._states.pop(asset_id, None)
+
+    def state(self, asset_id):
+        return self._states.get(asset_id)
+
+    def on_prices(self, prices):
+        """Apply a price map (or just its changed entries); returns alerts raised"""
+        alerts = []
+        for asset_id, quote in prices.items():
+            state = self._states.get(asset_id)
+            if state is None:
+                continue
+            price = quote.get("usd")
+            with self._lock:
+                if price is None or price == state.price:
+                    continue
+                state.price = price
+                indicators = state.indicators
+            if indicators is None:
+                # Without candles phase 4 does not depend on price
+                continue
+            alerts += self._rescore(state, rsi=indicators.peek_rsi(price), phase="phase4")
+        return alerts
+
+    def refresh_candles(self, asset_ids=None):
+        """Fold newly stored candles into phase 4 for the given assets"""
+        if self.market_data is None:
+            return []
+        alerts = []
+        for asset_id in asset_ids or list(self._states):
+            state = self._states.get(asset_id)
+            if state is None:
+                continue
+            indicators = self.market_data.state(asset_id)
+            if indicators.rsi is None:
+                continue
+            with self._lock:
+                state.indicators = indicators
+                price = state.price
+            rsi = indicators.peek_rsi(price) if price is not None else indicators.rsi
+            alerts += self._rescore(state, rsi=rsi, phase="phase4")
+        return alerts
+
+    def refresh_signals(self, asset_ids=None):
+        """Recompute phases 1-3 from freshly collected signals"""
+        if self.collector is None:
+            return []
+        asset_ids = [a for a in (asset_ids or list(self._states)) if a in self._states]
+        alerts = []
+        for asset_id, signals in self.collector.collect_many(asset_ids).items():
+            state = self._states.get(asset_id)
+            if state is None:
+                continue
+            analysis = build_analysis(state.crypto, {}, seed=self.seed, signals=signals)
+            alerts += self._rescore(state, scores=phase_scores(analysis), phase="phase1-3")
+        return alerts
+
+    def _rescore(self, state, rsi=None, scores=None, phase=None):
+        # Price ticks, candle and signal refreshes can arrive from different threads
+        with self._lock:
+            old_tier, old_rsi = state.tier, state.rsi
+            if scores is not None:
+                state.phase1_pass, state.tokenomics_score, state.market_bullish = scores
+            if rsi is not None:
+                state.rsi = int(round(rsi))
+            state.tier = score_confidence(state.phase1_pass, state.tokenomics_score, state.market_bullish, state.rsi)
+            if phase is not None:
+                self.recomputed[phase] += 1
+            self.recomputed["phase5"] += 1
+
+            alerts = []
+            if state.tier != old_tier:
+                alerts.append(self._alert(state, "recommendation_change",
+                                          CONFIDENCE_TIERS[old_tier]["recommendation"],
+                                          CONFIDENCE_TIERS[state.tier]["recommendation"]))
+            was_above, is_above = old_rsi >= self.rsi_gate, state.rsi >= self.rsi_gate
+            if was_above != is_above:
+                alerts.append(self._alert(state, "rsi_cross", "above" if was_above else "below",
+                                          "above" if is_above else "below"))
+        return [alert for alert in alerts if self.dispatcher.emit(alert)]
+
+    def _alert(self, state, kind, old, new):
+        return {
+            "type": kind,
+            "id": state.crypto["id"],
+            "symbol": state.crypto["symbol"],
+            "from": old,
+            "to": new,
+            "rsi": state.rsi,
+            "price": state.price,
+            "confidence": CONFIDENCE_TIERS[state.tier]["confidence"],
+            "at": time.time()
+        }
+
+    def follow(self, table, stop=None):
+        """Apply only the changed prices published by a PriceTable until stopped"""
+        stop = stop or threading.Event()
+        subscription = table.subscribe(list(self._states))
+        try:
+            while not stop.is_set():
+                changes = subscription.next(timeout=1)
+                if changes:
+                    self.on_prices(changes)
+        finally:
+            table.unsubscribe(subscription)
+
+
+def main(argv=None):
+    """Watch symbols and write alerts to the chosen sink"""
+    parser = argparse.ArgumentParser(description="Alert on recommendation changes and RSI gate crossings")
+    parser.add_argument("symbols", nargs="*", help="symbols or names to watch")
+    parser.add_argument("--all", action="store_true", help="watch every asset in the database")
+    parser.add_argument("--sink", action="append", default=[], help="file:<path>, webhook:<url> or queue (repeatable)")
+    parser.add_argument("--replay", help="feed prices from a recorded tick file instead of the live cache")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--no-candles", action="store_true", help="skip candle history (phase 4 stays simulated)")
+    parser.add_argument("--refresh", type=float, default=REFRESH_INTERVAL,
+                        help="seconds between candle and signal refreshes (signals need COLLECTOR_SOURCES)")
+    args = parser.parse_args(argv)
+
+    from collectors import get_collector
+    from market_data import get_market_data
+    from price_stream import PriceTable, replay_ticks
+
+    cryptos = CRYPTO_DATABASE if args.all else [c for c in map(find_crypto, args.symbols) if c]
+    if not cryptos:
+        parser.error("no known symbols to watch")
+    sinks = [make_sink(spec) for spec in args.sink or ["file:/dev/stdout"]]
+    dispatcher = AlertDispatcher(sinks)
+    watchlist = Watchlist(dispatcher, None if args.no_candles else get_market_data(), get_collector())
+    for crypto in cryptos:
+        watchlist.add(crypto)
+    print(f"Watching {len(watchlist)} assets", file=sys.stderr)
+
+    table = PriceTable()
+    stop = threading.Event()
+    if args.replay:
+        def replay():
+            replay_ticks(table, args.replay, args.speed, False, stop)
+            stop.set()
+        threading.Thread(target=replay, daemon=True).start()
+    else:
+        from price_cache import get_price_cache
+
+        cache = get_price_cache([c["id"] for c in cryptos])
+        cache.add_listener(table.apply)
+        table.apply(cache.get())
+    follower = threading.Thread(target=watchlist.follow, args=(table, stop), daemon=True)
+    follower.start()
+
+    def refresh():
+        while not stop.wait(args.refresh):
+            watchlist.refresh_candles()
+            watchlist.refresh_signals()
+    threading.Thread(target=refresh, name="watchlist-refresh", daemon=True).start()
+    try:
+        stop.wait(args.duration)
+    except KeyboardInterrupt:
+        pass
+    stop.set()
+    follower.join()
+    dispatcher.flush()
+    print(json.dumps({"recomputed": watchlist.recomputed, "alerts": dispatcher.counts}), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())